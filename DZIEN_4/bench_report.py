@@ -0,0 +1,26 @@
+"""
+bench_report.py
+
+Szkielet raportów benchmarków dla skryptów z DZIEN_4 (format_bench.py).
+
+Implementacja leży w streamlit/bench_report.py - katalog streamlit/ musi
+działać samodzielnie, więc wspólny moduł jest w nim, a tutaj ładujemy go
+po jawnej ścieżce pliku (bez zmiany sys.path).
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_NAME = "streamlit_bench_report"
+_spec = importlib.util.spec_from_file_location(_NAME, Path(__file__).resolve().parent / "streamlit" / "bench_report.py")
+_impl = sys.modules[_NAME] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_impl)
+
+DEFAULT_THRESHOLD = _impl.DEFAULT_THRESHOLD
+add_report_args = _impl.add_report_args
+check_baseline = _impl.check_baseline
+compare = _impl.compare
+write_report = _impl.write_report
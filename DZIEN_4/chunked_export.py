@@ -0,0 +1,198 @@
+"""
+chunked_export.py
+
+Eksport ramek dowolnej wielkości partiami - pamięć ograniczona rozmiarem partii.
+
+generate_big_df() buduje całą ramkę przed eksportem, co przy ok. 5 mln
+wierszy kończy się na granicy RAM runnera. Tutaj źródłem jest iterator
+partii (genpandas.iter_big_df_chunks), a każdy format dopisuje kolejne
+partie do jednego pliku:
+    - CSV / CSV.GZ: nagłówek tylko w pierwszej partii, reszta dopisywana
+      (dla .gz przez jeden strumień gzip); format dat jeden dla całego
+      pliku (csv_date_format) - to_csv wybiera go osobno dla każdej partii,
+    - JSONL:        każda partia to kolejne linie,
+    - Parquet:      każda partia to osobna grupa wierszy (ParquetWriter),
+    - Feather:      każda partia to osobny rekord-batch pliku Arrow IPC
+                    (Feather v2), czytelny przez pd.read_feather.
+Pickle nie da się dopisywać partiami - nie ma go na liście.
+
+Uruchomienie (czas + szczyt RSS na format względem rozmiaru partii):
+    python chunked_export.py --rows 100000000 --chunk-rows 1000000 --formats CSV.GZ Parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import importlib.util
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from genpandas import CHUNK_ROWS, generate_chunk, iter_big_df_chunks
+from mem_probe import MB, MemoryProbe, frame_bytes
+
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATETIME_US_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def csv_date_format(df: pd.DataFrame, dates_only: bool = True) -> str | None:
+    """
+    Jeden date_format dla to_csv całej ramki (None = brak kolumn datetime).
+
+    to_csv wybiera format dla każdego wywołania osobno: partia z samymi
+    północami dostaje "2024-01-01", pozostałe "2024-01-01 00:00:00". Format
+    wybrany raz z całości i podany każdej partii / shardowi daje to samo co
+    to_csv całej ramki (poza ułamkami sekund: zawsze 6 cyfr, %f).
+    dates_only=False: bez samej daty (gdy ramka to tylko pierwsza partia).
+    """
+    columns = [df[c] for c in df.columns if isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind == "M"]
+    if not columns:
+        return None
+    if any(((s.dt.microsecond != 0) | (s.dt.nanosecond != 0)).any() for s in columns):
+        return DATETIME_US_FORMAT
+    if dates_only and all((s.isna() | (s.dt.normalize() == s)).all() for s in columns):
+        return DATE_FORMAT
+    return DATETIME_FORMAT
+
+
+def generated_date_format(n_rows: int, seed: int = 42) -> str | None:
+    """
+    csv_date_format całej ramki z generate_chunk bez jej budowania: ts to
+    kolejne minuty od północy START, więc wystarczą pierwsze dwa wiersze.
+    """
+    return csv_date_format(generate_chunk(0, 0, min(n_rows, 2), seed))
+
+
+def write_csv_chunks(
+    chunks: Iterable[pd.DataFrame],
+    path: Path,
+    compression: str | None = None,
+    date_format: str | None = None,
+) -> int:
+    """
+    CSV (opcjonalnie gzip) z kolejnych partii; zwraca liczbę wierszy.
+    Bez date_format format dat wybiera pierwsza partia (csv_date_format bez
+    samej daty); partia, która potrzebuje ułamków sekund, których ten format
+    nie ma, kończy się ValueError zamiast cichego obcięcia.
+    """
+    opener = gzip.open if compression == "gzip" else open
+    explicit = date_format is not None
+    n = 0
+    with opener(path, "wt", encoding="utf-8", newline="") as out:
+        for chunk in chunks:
+            if not explicit:
+                needed = csv_date_format(chunk, dates_only=False)
+                if n == 0:
+                    date_format = needed
+                elif needed == DATETIME_US_FORMAT and date_format != DATETIME_US_FORMAT:
+                    raise ValueError("partia z ułamkami sekund po partiach bez nich - podaj date_format")
+            chunk.to_csv(out, index=False, header=(n == 0), date_format=date_format)
+            n += len(chunk)
+    return n
+
+
+def write_jsonl_chunks(chunks: Iterable[pd.DataFrame], path: Path) -> int:
+    n = 0
+    with open(path, "w", encoding="utf-8") as out:
+        for chunk in chunks:
+            chunk.to_json(out, orient="records", lines=True, force_ascii=False, date_format="iso")
+            n += len(chunk)
+    return n
+
+
+def write_parquet_chunks(chunks: Iterable[pd.DataFrame], path: Path, compression: str = "snappy") -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    n = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression=compression)
+            writer.write_table(table)
+            n += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+
+def write_feather_chunks(chunks: Iterable[pd.DataFrame], path: Path, compression: str | None = "lz4") -> int:
+    import pyarrow as pa
+
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    writer = None
+    n = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(path, table.schema, options=options)
+            writer.write_table(table)
+            n += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+
+# nazwa -> (plik, zapis z partii, czy wymaga pyarrow)
+WRITERS: dict[str, tuple[str, Callable[[Iterable[pd.DataFrame], Path], int], bool]] = {
+    "CSV": ("data.csv", write_csv_chunks, False),
+    "CSV.GZ": ("data.csv.gz", partial(write_csv_chunks, compression="gzip"), False),
+    "JSONL": ("data.jsonl", write_jsonl_chunks, False),
+    "Parquet": ("data.parquet", write_parquet_chunks, True),
+    "Feather": ("data.feather", write_feather_chunks, True),
+}
+
+
+def available_writers() -> list[str]:
+    return [name for name, (_file, _write, needs_arrow) in WRITERS.items() if ARROW_AVAILABLE or not needs_arrow]
+
+
+def export_chunked(fmt: str, out_dir: Path, n_rows: int, chunk_rows: int = CHUNK_ROWS, seed: int = 42) -> Path:
+    file_name, write, _needs_arrow = WRITERS[fmt]
+    path = out_dir / file_name
+    if fmt.startswith("CSV"):
+        # format dat z całej ramki, nie z pierwszej partii (jak df.to_csv na generate_big_df)
+        write = partial(write, date_format=generated_date_format(n_rows, seed))
+    write(iter_big_df_chunks(n_rows, chunk_rows, seed), path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generowanie i eksport dużych ramek partiami.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--formats", nargs="+", choices=list(WRITERS), default=available_writers())
+    parser.add_argument("--out-dir", default="pandas_exports_chunked")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(exist_ok=True)
+    chunk_mb = frame_bytes(generate_chunk(0, 0, min(args.chunk_rows, args.rows), args.seed)) / MB
+    print(f"{args.rows:,} wierszy w partiach po {args.chunk_rows:,} (partia ok. {chunk_mb:.1f} MB w pamięci)")
+
+    for fmt in args.formats:
+        with MemoryProbe(trace=False) as probe:
+            path = export_chunked(fmt, out_dir, args.rows, args.chunk_rows, args.seed)
+        rss = "n/d" if probe.rss_peak_delta is None else f"{probe.rss_peak_delta / MB:.1f} MB"
+        ratio = "" if probe.rss_peak_delta is None else f" (x{probe.rss_peak_delta / MB / chunk_mb:.1f} partii)"
+        print(
+            f"{fmt:8s} -> {probe.seconds:7.2f}s  plik {path.stat().st_size / MB:9.1f} MB  "
+            f"szczyt RSS +{rss}{ratio}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Magazyn rekordów XML z dopisywaniem i indeksem offsetów.
+
+Problem: dopisywanie całego dokumentu w trybie "a" daje plik z wieloma
+korzeniami (<autokomis>...</autokomis><autokomis>...), którego nie da się
+już sparsować ani przeszukać.
+
+Rozwiązanie:
+    - plik danych (np. autokomis.records) to ciąg poprawnych fragmentów
+      <samochod>...</samochod>, dopisywanych na końcu (tryb "ab"),
+    - plik indeksu (autokomis.records.idx) to linie "id<TAB>offset<TAB>długość",
+      też tylko dopisywane; po otwarciu trzymamy go jako dict -> O(1),
+    - get()/read_raw() czytają z dysku TYLKO bajty jednego rekordu (seek + read),
+    - compact() tworzy poprawny dokument z jednym korzeniem: nagłówek + <root>
+      + aktualne wersje fragmentów + </root> (kopiowanie bajtów, bez parsowania),
+      a przy okazji przepisuje magazyn: plik danych i indeks zostają tylko
+      z aktualnymi wersjami (nowe pliki podmieniane przez os.replace).
+
+Fragmenty są zapisywane z wcięciem pierwszego poziomu, więc wynik compact()
+wygląda tak samo jak pretty() / PrettyXmlWriter dla tych samych rekordów.
+Ponowne dopisanie rekordu o tym samym <id> zastępuje poprzednią wersję;
+rekord identyczny bajt w bajt z aktualną wersją nie jest dopisywany wcale.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from xml.etree import ElementTree
+
+from xmlstream import XML_HEADER, record_lines
+
+
+class XmlRecordStore:
+    def __init__(self, path: str | Path, record_tag: str = "samochod", key: str = "id", indent: str = "  "):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.record_tag = record_tag
+        self.key = key
+        self.indent = indent
+        # id -> (offset, długość) najnowszej wersji rekordu
+        self.index: dict[str, tuple[int, int]] = {}
+
+        self.path.touch(exist_ok=True)
+        self._load_index()
+
+    # ------------------------------------------------------------
+    # Indeks
+    # ------------------------------------------------------------
+    def _load_index(self) -> None:
+        data_size = self.path.stat().st_size
+        end = 0
+        if self.index_path.exists():
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 3:
+                        break  # urwana ostatnia linia (np. po awarii)
+                    key, offset, length = parts[0], int(parts[1]), int(parts[2])
+                    self.index[key] = (offset, length)
+                    end = max(end, offset + length)
+
+        # indeks nie pokrywa całego pliku danych -> odbudowa
+        if end != data_size:
+            self.rebuild_index()
+
+    def rebuild_index(self) -> None:
+        """Odtwarza indeks skanując plik danych (linie otwierające/zamykające rekord)."""
+        open_line = f"{self.indent}<{self.record_tag}>\n".encode("utf-8")
+        close_line = f"{self.indent}</{self.record_tag}>\n".encode("utf-8")
+
+        self.index.clear()
+        entries: list[str] = []
+        offset = 0
+        start = None
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line == open_line:
+                    start = offset
+                offset += len(line)
+                if line == close_line and start is not None:
+                    f_pos = f.tell()
+                    f.seek(start)
+                    raw = f.read(offset - start)
+                    f.seek(f_pos)
+                    key = self._key_of(raw)
+                    self.index[key] = (start, offset - start)
+                    entries.append(f"{key}\t{start}\t{offset - start}\n")
+                    start = None
+
+        tmp = self.index_path.with_suffix(".idx.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(entries)
+        os.replace(tmp, self.index_path)
+
+    def _key_of(self, raw: bytes) -> str:
+        return ElementTree.fromstring(raw).findtext(self.key) or ""
+
+    # ------------------------------------------------------------
+    # Zapis
+    # ------------------------------------------------------------
+    def append(self, record: dict) -> bool:
+        """
+        Dopisuje rekord na końcu pliku danych i jego offset do indeksu.
+        Zwraca False (i nic nie zapisuje), gdy aktualna wersja ma te same bajty.
+        """
+        key = str(record[self.key])
+        raw = "".join(record_lines(self.record_tag, record, 1, self.indent)).encode("utf-8")
+        if key in self.index and self.index[key][1] == len(raw) and self.read_raw(key) == raw:
+            return False
+
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(raw)
+        # najpierw dane, potem indeks: po awarii indeks najwyżej nie obejmie ogona (-> rebuild)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(f"{key}\t{offset}\t{len(raw)}\n")
+        self.index[key] = (offset, len(raw))
+        return True
+
+    # ------------------------------------------------------------
+    # Odczyt
+    # ------------------------------------------------------------
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def keys(self) -> list[str]:
+        return list(self.index)
+
+    def read_raw(self, key: str) -> bytes:
+        """Surowy fragment XML jednego rekordu - czytamy tylko jego bajty."""
+        offset, length = self.index[key]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def get_element(self, key: str) -> ElementTree.Element:
+        return ElementTree.fromstring(self.read_raw(key))
+
+    def get(self, key: str) -> dict:
+        """Rekord jako dict (odwrotność formatu z xmlstream)."""
+        return _element_to_dict(self.get_element(key))
+
+    # ------------------------------------------------------------
+    # Kompakcja
+    # ------------------------------------------------------------
+    def compact(self, out_path: str | Path, root_tag: str = "autokomis") -> int:
+        """
+        Zapisuje poprawny dokument z jednym korzeniem (najnowsze wersje rekordów,
+        w kolejności ich zapisu). Zwraca liczbę rekordów.
+        """
+        self.rewrite()
+        entries = sorted(self.index.values())
+        with open(self.path, "rb") as src, open(out_path, "wb") as out:
+            out.write(XML_HEADER.encode("utf-8"))
+            if not entries:
+                out.write(f"<{root_tag}/>\n".encode("utf-8"))
+                return 0
+            out.write(f"<{root_tag}>\n".encode("utf-8"))
+            for offset, length in entries:
+                src.seek(offset)
+                out.write(src.read(length))
+            out.write(f"</{root_tag}>\n".encode("utf-8"))
+        return len(entries)
+
+    def rewrite(self) -> None:
+        """
+        Przepisuje magazyn tak, by zawierał tylko aktualne wersje rekordów.
+
+        Nowy plik danych i nowy indeks powstają obok i są podmieniane przez
+        os.replace - najpierw dane, potem indeks. Awaria pomiędzy zostawia stary
+        indeks, który nie pokrywa nowego pliku, więc __init__ go odbuduje.
+        """
+        live = sorted((offset, length, key) for key, (offset, length) in self.index.items())
+        if sum(length for _offset, length, _key in live) == self.path.stat().st_size:
+            return  # nic do usunięcia
+
+        tmp_data = self.path.with_name(self.path.name + ".tmp")
+        new_index: dict[str, tuple[int, int]] = {}
+        with open(self.path, "rb") as src, open(tmp_data, "wb") as out:
+            for offset, length, key in live:
+                src.seek(offset)
+                new_index[key] = (out.tell(), length)
+                out.write(src.read(length))
+        os.replace(tmp_data, self.path)
+
+        tmp_index = self.index_path.with_suffix(".idx.tmp")
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            f.writelines(f"{key}\t{offset}\t{length}\n" for key, (offset, length) in new_index.items())
+        os.replace(tmp_index, self.index_path)
+        self.index = new_index
+
+
+def _element_to_dict(elem: ElementTree.Element) -> dict:
+    return {
+        child.tag: _element_to_dict(child) if len(child) else (child.text or "")
+        for child in elem
+    }
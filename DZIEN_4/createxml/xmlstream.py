@@ -0,0 +1,105 @@
+"""
+Strumieniowy zapis "ładnego" (wciętego) XML.
+
+prettyfy.pretty() buduje całe drzewo Element, serializuje je do stringa
+i jeszcze raz parsuje przez minidom tylko po to, żeby dodać wcięcia -
+cały dokument jest w pamięci trzy razy.
+
+Tutaj piszemy XML od razu z rekordów (dict), element po elemencie:
+    - str/liczba -> <tag>tekst</tag>
+    - dict       -> element z podelementami (rekurencyjnie)
+    - None / ""  -> pusty element <tag/>
+
+Wynik jest bajt w bajt taki sam jak pretty() dla tego samego drzewa,
+a w pamięci jest tylko bieżący rekord.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Iterable, TextIO
+
+XML_HEADER = '<?xml version="1.0" ?>\n'
+
+
+def escape(text: str) -> str:
+    """Escapowanie jak w minidom (tekst i atrybuty)."""
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+def record_lines(tag: str, value, level: int, indent: str = "  ") -> Iterable[str]:
+    """Linie wciętego XML dla jednego elementu (i jego dzieci)."""
+    pad = indent * level
+    if isinstance(value, dict):
+        if not value:
+            yield f"{pad}<{tag}/>\n"
+            return
+        yield f"{pad}<{tag}>\n"
+        for child_tag, child_value in value.items():
+            yield from record_lines(child_tag, child_value, level + 1, indent)
+        yield f"{pad}</{tag}>\n"
+    elif value is None or value == "":
+        yield f"{pad}<{tag}/>\n"
+    else:
+        yield f"{pad}<{tag}>{escape(str(value))}</{tag}>\n"
+
+
+class PrettyXmlWriter:
+    """
+    Zapisuje dokument <root_tag> z rekordami, po jednym na wywołanie write().
+
+    Użycie:
+        with open("plik.xml", "w", encoding="utf-8") as f, PrettyXmlWriter(f, "autokomis") as xml:
+            for rec in rekordy:
+                xml.write("samochod", rec)
+    """
+
+    def __init__(self, out: TextIO, root_tag: str, indent: str = "  ", header: bool = True):
+        self.out = out
+        self.root_tag = root_tag
+        self.indent = indent
+        self.header = header
+        self.count = 0
+
+    def write(self, tag: str, record: dict) -> None:
+        if self.count == 0:
+            # korzeń otwieramy dopiero przy pierwszym rekordzie (pusty dokument to <root/>)
+            if self.header:
+                self.out.write(XML_HEADER)
+            self.out.write(f"<{self.root_tag}>\n")
+        self.out.writelines(record_lines(tag, record, 1, self.indent))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.count == 0:
+            if self.header:
+                self.out.write(XML_HEADER)
+            self.out.write(f"<{self.root_tag}/>\n")
+        else:
+            self.out.write(f"</{self.root_tag}>\n")
+
+    def __enter__(self) -> "PrettyXmlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_pretty_xml(out: TextIO, root_tag: str, record_tag: str, records: Iterable[dict]) -> int:
+    """Zapisuje wszystkie rekordy jako jeden dokument. Zwraca liczbę rekordów."""
+    with PrettyXmlWriter(out, root_tag) as writer:
+        for record in records:
+            writer.write(record_tag, record)
+    return writer.count
+
+
+def pretty_records(root_tag: str, record_tag: str, records: Iterable[dict]) -> str:
+    """Wersja "do stringa" - odpowiednik pretty() dla małych danych."""
+    buf = io.StringIO()
+    write_pretty_xml(buf, root_tag, record_tag, records)
+    return buf.getvalue()
@@ -0,0 +1,46 @@
+"""
+dtype_optimizer.py
+
+Automatyczne zmniejszanie typów kolumn (downcasting) z raportem oszczędności
+dla skryptów z DZIEN_4 (genpandas.py).
+
+Implementacja leży w streamlit/dtype_optimizer.py - katalog streamlit/ musi
+działać samodzielnie (csv_ingest.py), więc wspólny moduł jest w nim, a tutaj
+ładujemy go po jawnej ścieżce pliku (bez zmiany sys.path).
+
+Uruchomienie (CSV z genpandas: typy po read_csv i po optymalizacji):
+    python dtype_optimizer.py [plik.csv]
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+_NAME = "streamlit_dtype_optimizer"
+_spec = importlib.util.spec_from_file_location(_NAME, Path(__file__).resolve().parent / "streamlit" / "dtype_optimizer.py")
+_impl = sys.modules[_NAME] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_impl)
+
+CATEGORY_MAX_RATIO = _impl.CATEGORY_MAX_RATIO
+ColumnChange = _impl.ColumnChange
+format_report = _impl.format_report
+optimize_dtypes = _impl.optimize_dtypes
+read_csv_optimized = _impl.read_csv_optimized
+smallest_int_type = _impl.smallest_int_type
+suggest_dtype = _impl.suggest_dtype
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        raw = pd.read_csv(sys.argv[1])
+    else:
+        from genpandas import generate_big_df
+
+        raw = generate_big_df(500_000)
+        raw["category"] = raw["category"].astype(object)  # jak po read_csv
+    optimized, report = optimize_dtypes(raw)
+    print(format_report(report, raw))
@@ -0,0 +1,217 @@
+"""
+format_bench.py
+
+Macierz pomiarów formatów zapisu/odczytu dla ramek z genpandas.
+
+timed_save() w genpandas.py mierzy jeden zapis na format. Tutaj dla każdej
+kombinacji (liczba wierszy, format, kodek) robimy --repeats przebiegów i
+zapisujemy:
+    - write:      zapis całej ramki,
+    - read:       odczyt całego pliku,
+    - read_proj:  odczyt tylko PROJECTION (id, amount) - Parquet / Feather / CSV
+                  czytają wybrane kolumny, JSONL / Pickle muszą wczytać wszystko,
+    - size_bytes: rozmiar pliku,
+dla czasów: mediana, min, max i rozrzut (IQR). Formaty / kodeki wymagające
+brakujących bibliotek są pomijane (z adnotacją w raporcie).
+
+Wynik to plik JSON (porównywalny między uruchomieniami), z --baseline
+oznaczamy pomiary wolniejsze niż --threshold względem poprzedniego raportu
+(wspólny szkielet raportu: bench_report.py).
+
+Uruchomienie:
+    python format_bench.py --rows 100000 1000000 --repeats 5 --out format_report.json
+    python format_bench.py --formats Parquet Feather --baseline format_report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from bench_report import add_report_args, check_baseline, write_report
+from genpandas import generate_big_df
+
+PROJECTION = ["id", "amount"]
+DEFAULT_ROWS = (100_000, 1_000_000)
+
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _arrow_codec(name: str) -> bool:
+    if not _has("pyarrow"):
+        return False
+    import pyarrow as pa
+
+    return pa.Codec.is_available(name)
+
+
+@dataclass(frozen=True)
+class FormatSpec:
+    suffix: str
+    write: Callable[[pd.DataFrame, Path, str | None], None]
+    read: Callable[[Path, list[str] | None, str | None], pd.DataFrame]
+    codecs: tuple[str | None, ...]
+    available: Callable[[str | None], bool]
+
+
+def _read_csv(path: Path, columns: list[str] | None, codec: str | None) -> pd.DataFrame:
+    parse_dates = ["ts"] if columns is None or "ts" in columns else None
+    return pd.read_csv(path, usecols=columns, parse_dates=parse_dates, compression=codec)
+
+
+def _csv_codec_available(codec: str | None) -> bool:
+    return codec != "zstd" or _has("zstandard")
+
+
+def _read_jsonl(path: Path, columns: list[str] | None, codec: str | None) -> pd.DataFrame:
+    df = pd.read_json(path, lines=True, compression=codec)
+    return df if columns is None else df[columns]
+
+
+def _read_pickle(path: Path, columns: list[str] | None, codec: str | None) -> pd.DataFrame:
+    df = pd.read_pickle(path, compression=codec)
+    return df if columns is None else df[columns]
+
+
+FORMATS: dict[str, FormatSpec] = {
+    "CSV": FormatSpec(
+        ".csv",
+        lambda df, p, c: df.to_csv(p, index=False, compression=c),
+        _read_csv,
+        (None, "gzip", "bz2", "xz", "zstd"),
+        _csv_codec_available,
+    ),
+    "Parquet": FormatSpec(
+        ".parquet",
+        lambda df, p, c: df.to_parquet(p, index=False, compression=c),
+        lambda p, cols, c: pd.read_parquet(p, columns=cols),
+        ("snappy", "zstd", "gzip", "brotli", "lz4", None),
+        lambda c: _has("pyarrow") and (c is None or _arrow_codec(c)),
+    ),
+    "Feather": FormatSpec(
+        ".feather",
+        lambda df, p, c: df.to_feather(p, compression=c or "uncompressed"),
+        lambda p, cols, c: pd.read_feather(p, columns=cols),
+        ("lz4", "zstd", None),
+        lambda c: _has("pyarrow") and (c is None or _arrow_codec(c)),
+    ),
+    "Pickle": FormatSpec(
+        ".pkl",
+        lambda df, p, c: df.to_pickle(p, compression=c),
+        _read_pickle,
+        (None, "gzip"),
+        lambda c: True,
+    ),
+    "JSONL": FormatSpec(
+        ".jsonl",
+        lambda df, p, c: df.to_json(p, orient="records", lines=True, force_ascii=False, date_format="iso", compression=c),
+        _read_jsonl,
+        (None, "gzip"),
+        lambda c: True,
+    ),
+}
+
+
+def summarize(times: list[float]) -> dict[str, float]:
+    q1, q3 = np.percentile(times, [25, 75])
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times),
+        "iqr": float(q3 - q1),
+    }
+
+
+def _timed(fn: Callable[[], object], repeats: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return summarize(times)
+
+
+def bench_one(df: pd.DataFrame, fmt: str, codec: str | None, work_dir: Path, repeats: int) -> dict:
+    spec = FORMATS[fmt]
+    path = work_dir / f"data{spec.suffix}"
+    result = {
+        "write": _timed(lambda: spec.write(df, path, codec), repeats),
+        "size_bytes": path.stat().st_size,
+        "read": _timed(lambda: spec.read(path, None, codec), repeats),
+        "read_proj": _timed(lambda: spec.read(path, PROJECTION, codec), repeats),
+    }
+    path.unlink()
+    return result
+
+
+def run_matrix(rows_list: list[int], formats: list[str], repeats: int, seed: int = 42) -> tuple[list[dict], list[dict]]:
+    """(wyniki, pominięte kombinacje)."""
+    results: list[dict] = []
+    skipped: list[dict] = []
+    work_dir = Path(tempfile.mkdtemp(prefix="format-bench-"))
+    try:
+        for n_rows in rows_list:
+            df = generate_big_df(n_rows=n_rows, seed=seed)
+            frame_mb = df.memory_usage(deep=True).sum() / 1024**2
+            print(f"\n{n_rows:,} wierszy ({frame_mb:.1f} MB w pamięci)")
+            print(f"{'format':8s} {'kodek':8s} {'zapis':>10s} {'odczyt':>10s} {'projekcja':>10s} {'rozmiar':>10s}")
+            for fmt in formats:
+                spec = FORMATS[fmt]
+                for codec in spec.codecs:
+                    codec_name = codec or "none"
+                    if not spec.available(codec):
+                        skipped.append({"n_rows": n_rows, "format": fmt, "codec": codec_name, "reason": "brak biblioteki"})
+                        continue
+                    r = bench_one(df, fmt, codec, work_dir, repeats)
+                    results.append({"n_rows": n_rows, "format": fmt, "codec": codec_name, **r})
+                    print(
+                        f"{fmt:8s} {codec_name:8s} {r['write']['median']:9.3f}s {r['read']['median']:9.3f}s "
+                        f"{r['read_proj']['median']:9.3f}s {r['size_bytes'] / 1024**2:8.1f} MB"
+                    )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results, skipped
+
+
+def _op_medians(r: dict) -> dict[str, float]:
+    return {op: r[op]["median"] for op in ("write", "read", "read_proj")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Macierz formatów zapisu/odczytu dla genpandas.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--repeats", type=int, default=3)
+    add_report_args(parser, out="format_report.json")
+    args = parser.parse_args()
+
+    results, skipped = run_matrix(args.rows, args.formats, args.repeats)
+    write_report(
+        args.out,
+        results,
+        pyarrow=importlib.import_module("pyarrow").__version__ if _has("pyarrow") else None,
+        repeats=args.repeats,
+        projection=PROJECTION,
+        skipped=skipped,
+    )
+    for s in skipped:
+        print(f"pominięto {s['format']}/{s['codec']} ({s['reason']})")
+
+    if args.baseline:
+        check_baseline(results, args.baseline, args.threshold, ("n_rows", "format", "codec"), _op_medians)
+
+
+if __name__ == "__main__":
+    main()
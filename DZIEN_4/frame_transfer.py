@@ -0,0 +1,220 @@
+"""
+frame_transfer.py
+
+Przekazywanie ramek pandas między procesami bez kopiowania danych.
+
+Ramka wysłana do procesu roboczego (ProcessPoolExecutor, Queue, Pipe) jest
+pakowana zwykłym pickle: wszystkie kolumny lądują w jednym strumieniu bajtów,
+który jest kopiowany przez rurę, a odbiorca kopiuje go jeszcze raz do nowych
+tablic. Tutaj:
+    - pack() / unpack(): pickle protokół 5 z buforami poza strumieniem
+      (buffer_callback) - strumień zawiera tylko opis kolumn (typy, nazwy,
+      słowniki kategorii), a dane kolumn to osobne bufory; odbiorca składa
+      ramkę NA TYCH buforach (pd.DataFrame(..., copy=False), bez kopii),
+    - SharedFrame: bufory kopiujemy RAZ do bloku pamięci współdzielonej
+      (multiprocessing.shared_memory); do procesu leci tylko SharedFrameRef
+      (nazwa bloku + opis, kilka KB niezależnie od liczby wierszy),
+    - AttachedFrame: odbiorca podpina blok i dostaje ramkę, której kolumny są
+      widokami na pamięć współdzieloną, tylko do odczytu - jak w
+      streamlit/shared_dataset.py.
+Kolumny: liczby i bool wprost, datetime64 / timedelta64 jako widok int64
+(numpy pakuje je w strumieniu), category jako kody + typ; pozostałe (str,
+object, typy rozszerzeń) pakuje ich własny pickle - tekst Arrow też trafia
+do buforów, object już nie.
+
+Procesy robocze twórz przez make_executor(): w Pythonie < 3.13 podpięcie
+bloku rejestruje go w resource trackerze procesu, a proces z własnym
+trackerem usunąłby blok właścicielowi przy swoim wyjściu. make_executor()
+uruchamia tracker przed procesami roboczymi, więc wszystkie dzielą jeden.
+
+Uruchomienie (opóźnienie przekazania ramki do procesu: pickle vs pamięć współdzielona):
+    python frame_transfer.py --rows 1000000 --repeats 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import pickle
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+ALIGN = 64  # początek każdego bufora w bloku wyrównany do linii cache
+
+
+def _column_payload(s: pd.Series) -> tuple[str, object, object]:
+    """(rodzaj, dane, opis typu) jednej kolumny."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return "categorical", np.ascontiguousarray(s.array.codes), s.dtype
+    if isinstance(s.dtype, np.dtype) and s.dtype.kind in "biufcmM":
+        arr = np.ascontiguousarray(s.to_numpy())
+        if s.dtype.kind in "mM":
+            return "array", arr.view(np.int64), s.dtype
+        return "array", arr, None
+    return "series", s.array, s.dtype
+
+
+def _column_from_payload(kind: str, data, dtype, index: pd.Index):
+    if kind == "categorical":
+        return pd.Categorical.from_codes(data, dtype=dtype, validate=False)
+    if kind == "array":
+        return data if dtype is None else data.view(dtype)
+    # Series z jawnym dtype - inaczej kolumna object stałaby się str
+    return pd.Series(data, index=index, dtype=dtype, copy=False)
+
+
+def pack(df: pd.DataFrame) -> tuple[bytes, list[pickle.PickleBuffer]]:
+    """Opis ramki (mały strumień pickle) + bufory z danymi kolumn."""
+    payload = {
+        "index": df.index,
+        "columns": [(name, *_column_payload(df[name])) for name in df.columns],
+    }
+    buffers: list[pickle.PickleBuffer] = []
+    header = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+    return header, buffers
+
+
+def unpack(header: bytes, buffers) -> pd.DataFrame:
+    """Ramka złożona na podanych buforach (bez kopii danych kolumn)."""
+    payload = pickle.loads(header, buffers=buffers)
+    index = payload["index"]
+    data = {name: _column_from_payload(kind, arr, dtype, index) for name, kind, arr, dtype in payload["columns"]}
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+@dataclass(frozen=True)
+class SharedFrameRef:
+    """To, co wysyłamy do procesu: nazwa bloku, opis ramki, (offset, rozmiar) buforów."""
+    name: str
+    header: bytes
+    layout: tuple[tuple[int, int], ...]
+
+
+class SharedFrame:
+    """
+    Właściciel bloku pamięci współdzielonej z danymi ramki. Blok żyje do
+    close() (albo końca bloku with) - odbiorcy muszą skończyć wcześniej.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        header, buffers = pack(df)
+        raws = [b.raw() for b in buffers]
+        layout = []
+        offset = 0
+        for raw in raws:
+            layout.append((offset, raw.nbytes))
+            offset += -(-raw.nbytes // ALIGN) * ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for raw, (start, n) in zip(raws, layout):
+            self._shm.buf[start:start + n] = raw
+        self.ref = SharedFrameRef(self._shm.name, header, tuple(layout))
+        self.nbytes = offset
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> SharedFrame:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AttachedFrame:
+    """
+    Strona odbiorcy: ramka na bloku z SharedFrameRef, tylko do odczytu.
+    Przed close() trzeba puścić ramkę i wszystko, co z niej jest widokiem
+    (inaczej SharedMemory.close() zgłosi BufferError).
+    """
+
+    def __init__(self, ref: SharedFrameRef):
+        kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+        self._shm = shared_memory.SharedMemory(name=ref.name, **kwargs)
+        views = [self._shm.buf[start:start + n].toreadonly() for start, n in ref.layout]
+        self.frame: pd.DataFrame | None = unpack(ref.header, views)
+
+    def close(self) -> None:
+        self.frame = None
+        self._shm.close()
+
+    def __enter__(self) -> pd.DataFrame:
+        return self.frame
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def make_executor(workers: int | None = None) -> ProcessPoolExecutor:
+    """ProcessPoolExecutor, którego procesy dzielą resource tracker z bieżącym procesem."""
+    resource_tracker.ensure_running()
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _summary(df: pd.DataFrame) -> tuple[int, float]:
+    return len(df), float(df["amount"].sum())
+
+
+def _consume_shared(ref: SharedFrameRef) -> tuple[int, float]:
+    frame = AttachedFrame(ref)
+    try:
+        return _summary(frame.frame)
+    finally:
+        frame.close()
+
+
+def _timed(fn, repeats: int) -> tuple[float, object]:
+    times = []
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    from genpandas import generate_big_df
+
+    parser = argparse.ArgumentParser(description="Przekazanie ramki do procesu: pickle vs pamięć współdzielona.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    df = generate_big_df(n_rows=args.rows)
+    mb = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"{args.rows:,} wierszy ({mb:.1f} MB w pamięci), mediana z {args.repeats} przebiegów\n")
+
+    # w jednym procesie: sama serializacja
+    plain_s, _ = _timed(lambda: pickle.loads(pickle.dumps(df, protocol=5)), args.repeats)
+    oob_s, _ = _timed(lambda: unpack(*pack(df)), args.repeats)
+    header, _buffers = pack(df)
+    print(f"{'pickle dumps+loads':34s} {plain_s * 1000:8.1f} ms  strumień {len(pickle.dumps(df, protocol=5)) / 1024**2:7.1f} MB")
+    print(f"{'pickle 5 + bufory poza strumieniem':34s} {oob_s * 1000:8.1f} ms  strumień {len(header) / 1024:7.1f} KB")
+
+    # między procesami: proces roboczy uruchomiony wcześniej, mierzymy samo przekazanie + wynik
+    with make_executor(1) as pool:
+        pool.submit(_summary, df.head(1)).result()
+        via_pickle, r1 = _timed(lambda: pool.submit(_summary, df).result(), args.repeats)
+        t0 = time.perf_counter()
+        with SharedFrame(df) as shared:
+            publish_s = time.perf_counter() - t0
+            via_shm, r2 = _timed(lambda: pool.submit(_consume_shared, shared.ref).result(), args.repeats)
+            ref_kb = len(pickle.dumps(shared.ref)) / 1024
+            block_mb = shared.nbytes / 1024**2
+    assert r1 == r2, (r1, r2)
+
+    print(f"\n{'do procesu przez pickle':34s} {via_pickle * 1000:8.1f} ms")
+    print(f"{'do procesu przez SharedFrame':34s} {via_shm * 1000:8.1f} ms  wysłano {ref_kb:.1f} KB  "
+          f"(x{via_pickle / via_shm:.1f} szybciej)")
+    print(f"{'  jednorazowe SharedFrame(df)':34s} {publish_s * 1000:8.1f} ms  blok {block_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
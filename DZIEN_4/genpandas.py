@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import os
-import time
 from pathlib import Path
+from typing import Iterator
 
 import numpy as np
 import pandas as pd
 
+from dtype_optimizer import format_report, optimize_dtypes, read_csv_optimized
+from mem_probe import MemoryProbe, frame_bytes
+
+START = "2024-01-01"
+CATEGORIES = ["food", "fuel", "books", "tools", "travel", "other"]
+# stały typ kategorii: wszystkie partie mają ten sam typ (concat, schemat Parquet/Arrow)
+CATEGORY_DTYPE = pd.CategoricalDtype(sorted(CATEGORIES))
+CHUNK_ROWS = 1_000_000
+
 
 def generate_big_df(n_rows: int = 1_000_000, seed: int = 42) -> pd.DataFrame:
     """
@@ -23,12 +32,12 @@ def generate_big_df(n_rows: int = 1_000_000, seed: int = 42) -> pd.DataFrame:
     """
     rng = np.random.default_rng(seed)
 
-    categories = np.array(["food", "fuel", "books", "tools", "travel", "other"])
+    categories = np.array(CATEGORIES)
 
     df = pd.DataFrame(
         {
             "id": np.arange(1, n_rows + 1, dtype=np.int64),
-            "ts": pd.date_range("2024-01-01", periods=n_rows, freq="min"),
+            "ts": pd.date_range(START, periods=n_rows, freq="min"),
             "category": rng.choice(categories, size=n_rows, replace=True),
             "amount": rng.lognormal(mean=3.2, sigma=0.7, size=n_rows).round(2),
             "score": rng.random(n_rows, dtype=np.float64),
@@ -42,14 +51,57 @@ def generate_big_df(n_rows: int = 1_000_000, seed: int = 42) -> pd.DataFrame:
     return df
 
 
-def timed_save(label: str, func) -> None:
+def generate_chunk(chunk_no: int, start_row: int, n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Jedna partia ramki: wiersze start_row .. start_row + n_rows - 1.
+
+    Kolumny i typy jak w generate_big_df. id i ts są ciągłe między partiami,
+    a losowe kolumny pochodzą z default_rng([seed, chunk_no]) - każdą partię
+    da się odtworzyć niezależnie od pozostałych (np. w innym procesie).
+    """
+    rng = np.random.default_rng([seed, chunk_no])
+    return pd.DataFrame(
+        {
+            "id": np.arange(start_row + 1, start_row + n_rows + 1, dtype=np.int64),
+            "ts": pd.date_range(pd.Timestamp(START) + pd.Timedelta(minutes=start_row), periods=n_rows, freq="min"),
+            "category": pd.Categorical.from_codes(
+                rng.integers(0, len(CATEGORIES), size=n_rows), dtype=CATEGORY_DTYPE
+            ),
+            "amount": rng.lognormal(mean=3.2, sigma=0.7, size=n_rows).round(2),
+            "score": rng.random(n_rows, dtype=np.float64),
+            "flag": rng.random(n_rows) < 0.05,
+        }
+    )
+
+
+def iter_big_df_chunks(n_rows: int, chunk_rows: int = CHUNK_ROWS, seed: int = 42) -> Iterator[pd.DataFrame]:
     """
-    Mała pomocnicza funkcja: mierzy czas zapisu.
+    Ramka n_rows wierszy oddawana partiami po chunk_rows - w pamięci jest
+    naraz tylko jedna partia (inne liczby losowe niż generate_big_df z tym samym seedem).
     """
-    t0 = time.perf_counter()
-    func()
-    t1 = time.perf_counter()
-    print(f"{label:12s} -> {t1 - t0:.2f}s")
+    for chunk_no, start in enumerate(range(0, n_rows, chunk_rows)):
+        yield generate_chunk(chunk_no, start, min(chunk_rows, n_rows - start), seed)
+
+
+def timed_save(label: str, func, frame_size: int | None = None) -> None:
+    """
+    Mała pomocnicza funkcja: mierzy czas zapisu i szczyt pamięci (RSS).
+    Z frame_size podaje narzut względem rozmiaru ramki.
+    """
+    with MemoryProbe(trace=False) as probe:
+        func()
+    print(f"{label:12s} -> {probe.seconds:.2f}s  {probe.describe(frame_size)}")
+
+
+def timed_load(label: str, func, frame_size: int | None = None):
+    """
+    Jak timed_save, ale dla odczytu - wczytana ramka żyje do końca pomiaru.
+    Zwraca wynik func() (wywołujący decyduje, czy go zatrzymać).
+    """
+    with MemoryProbe(trace=False) as probe:
+        loaded = func()
+    print(f"{label:12s} <- {probe.seconds:.2f}s  {probe.describe(frame_size)}")
+    return loaded
 
 
 def main():
@@ -61,17 +113,18 @@ def main():
     df = generate_big_df(n_rows=n)
 
     print(df.head())
-    print("Memory usage (MB):", df.memory_usage(deep=True).sum() / (1024**2))
+    size = frame_bytes(df)
+    print("Memory usage (MB):", size / (1024**2))
 
     # ---------------------------------------------------------
     # 1) CSV - uniwersalny, ale duży i wolniejszy
     # ---------------------------------------------------------
     csv_path = out_dir / "data.csv"
-    timed_save("CSV", lambda: df.to_csv(csv_path, index=False))
+    timed_save("CSV", lambda: df.to_csv(csv_path, index=False), size)
 
     # CSV skompresowany (często sensowny kompromis)
     csv_gz_path = out_dir / "data.csv.gz"
-    timed_save("CSV.GZ", lambda: df.to_csv(csv_gz_path, index=False, compression="gzip"))
+    timed_save("CSV.GZ", lambda: df.to_csv(csv_gz_path, index=False, compression="gzip"), size)
 
     # ---------------------------------------------------------
     # 2) Parquet - najlepszy do analytics (kolumnowy, kompresja)
@@ -79,7 +132,7 @@ def main():
     # ---------------------------------------------------------
     parquet_path = out_dir / "data.parquet"
     try:
-        timed_save("Parquet", lambda: df.to_parquet(parquet_path, index=False))
+        timed_save("Parquet", lambda: df.to_parquet(parquet_path, index=False), size)
     except Exception as e:
         print("Parquet pominięty (brak pyarrow/fastparquet?):", repr(e))
 
@@ -89,7 +142,7 @@ def main():
     # ---------------------------------------------------------
     feather_path = out_dir / "data.feather"
     try:
-        timed_save("Feather", lambda: df.to_feather(feather_path))
+        timed_save("Feather", lambda: df.to_feather(feather_path), size)
     except Exception as e:
         print("Feather pominięty (brak pyarrow?):", repr(e))
 
@@ -97,7 +150,7 @@ def main():
     # 4) Pickle - Python-only (nie dla wymiany z innymi językami)
     # ---------------------------------------------------------
     pkl_path = out_dir / "data.pkl"
-    timed_save("Pickle", lambda: df.to_pickle(pkl_path))
+    timed_save("Pickle", lambda: df.to_pickle(pkl_path), size)
 
     # ---------------------------------------------------------
     # 5) Excel - raczej do małych danych (limit wierszy ~1,048,576)
@@ -105,7 +158,7 @@ def main():
     # ---------------------------------------------------------
     xlsx_path = out_dir / "data.xlsx"
     if len(df) <= 1_048_000:  # zostawiamy margines
-        timed_save("Excel", lambda: df.to_excel(xlsx_path, index=False))
+        timed_save("Excel", lambda: df.to_excel(xlsx_path, index=False), size)
     else:
         print("Excel pominięty (za dużo wierszy).")
 
@@ -117,8 +170,47 @@ def main():
     timed_save(
         "JSONL",
         lambda: df.to_json(json_path, orient="records", lines=True, force_ascii=False),
+        size,
     )
 
+    # ---------------------------------------------------------
+    # 7) Odczyt - ten sam pomiar czasu i pamięci dla importu
+    # ---------------------------------------------------------
+    # CSV / JSONL od razu ze zmniejszonymi typami - mierzymy loader razem z optymalizacją;
+    # ich listy zmian (małe) zostają do raportu w punkcie 8, ramki nie
+    print("\nOdczyt:")
+    readers = {
+        csv_path: lambda p: read_csv_optimized(p, parse_dates=["ts"]),
+        csv_gz_path: lambda p: read_csv_optimized(p, parse_dates=["ts"])[0],
+        parquet_path: pd.read_parquet,
+        feather_path: pd.read_feather,
+        pkl_path: pd.read_pickle,
+        xlsx_path: pd.read_excel,
+        json_path: lambda p: optimize_dtypes(pd.read_json(p, lines=True)),
+    }
+    reports = {}
+    for path, reader in readers.items():
+        if path.exists():
+            try:
+                loaded = timed_load(path.name, lambda: reader(path), size)
+            except Exception as e:
+                print(f"{path.name} pominięty przy odczycie:", repr(e))
+                continue
+            if path in (csv_path, json_path):
+                optimized, changes = loaded
+                reports[path] = (changes, frame_bytes(optimized))
+                del optimized
+            del loaded
+
+    # ---------------------------------------------------------
+    # 8) Typy po odczycie - read_csv / read_json dają int64 / float64 / str,
+    # optimize_dtypes zmniejsza je tam, gdzie wartości się nie zmienią
+    # (raport z odczytów z punktu 7, bez ponownego czytania plików)
+    # ---------------------------------------------------------
+    for path, (changes, after_bytes) in reports.items():
+        print(f"\nOptymalizacja typów po odczycie {path.name}:")
+        print(format_report(changes, after_bytes=after_bytes))
+
     # Podsumowanie: rozmiary plików
     print("\nRozmiary plików:")
     for p in sorted(out_dir.glob("data.*")):
@@ -0,0 +1,266 @@
+"""
+mem_probe.py
+
+Pomiar szczytowego zużycia pamięci przy eksporcie i imporcie ramek pandas.
+
+genpandas wypisuje raz memory_usage(deep=True), ale nic nie mówi o pamięci
+CHWILOWEJ, którą zajmuje to_csv / to_json / to_excel / to_parquet (bufory
+tekstu, tabele Arrow, kopie kolumn). MemoryProbe mierzy ją na dwa sposoby:
+    - tracemalloc: szczyt alokacji przez alokator Pythona (NumPy, pandas,
+      obiekty) - dokładny, ale nie widzi pamięci Arrow ani bibliotek C,
+    - RSS procesu próbkowany w osobnym wątku co `interval` s (psutil, a bez
+      niego /proc/self/statm) - widzi wszystko, ale może przegapić krótki
+      szczyt, gdy kod C trzyma GIL.
+probe_call() robi oba pomiary w osobnych przebiegach (czas i RSS bez
+tracemalloc). Narzut = max(oba szczyty) / rozmiar ramki; bezpieczny limit
+pamięci dla formatu to rozmiar ramki x (1 + narzut) z zapasem SAFETY_MARGIN.
+
+Uruchomienie (tabela + raport JSON z limitami per format):
+    python mem_probe.py --rows 1000000 --out mem_report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # RSS z /proc albo wcale
+    psutil = None
+
+SAFETY_MARGIN = 1.25
+SAMPLE_INTERVAL = 0.005
+EXCEL_MAX_ROWS = 1_048_000  # limit arkusza 1 048 576 wierszy, z marginesem
+MB = 1024**2
+
+
+def rss_bytes() -> int | None:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryProbe:
+    """Kontekst: czas, szczyt tracemalloc i szczyt RSS (względem startu) dla bloku kodu."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, trace: bool = True):
+        self.interval = interval
+        self.trace = trace
+        self.seconds = 0.0
+        self.traced_peak = 0
+        self.rss_peak_delta: int | None = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = rss_bytes()
+            if rss is not None:
+                self._rss_peak = max(self._rss_peak, rss)
+
+    def __enter__(self) -> MemoryProbe:
+        gc.collect()
+        self._rss_start = rss_bytes()
+        self._rss_peak = self._rss_start or 0
+        self._own_trace = self.trace and not tracemalloc.is_tracing()
+        if self._own_trace:
+            tracemalloc.start()
+        if tracemalloc.is_tracing():
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        if self._rss_start is not None:
+            self._sampler.start()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds = time.perf_counter() - self._t0
+        self._stop.set()
+        if self._sampler.is_alive():
+            self._sampler.join()
+        if tracemalloc.is_tracing():
+            self.traced_peak = max(0, tracemalloc.get_traced_memory()[1] - self._traced_start)
+        if self._own_trace:
+            tracemalloc.stop()
+        if self._rss_start is not None:
+            rss_end = rss_bytes() or 0
+            self.rss_peak_delta = max(self._rss_peak, rss_end) - self._rss_start
+
+    @property
+    def peak(self) -> int:
+        """Większy z dwóch szczytów (bajty ponad stan sprzed bloku)."""
+        return max(self.traced_peak, self.rss_peak_delta or 0)
+
+    def report(self, frame_bytes: int | None = None) -> dict:
+        out = {
+            "seconds": self.seconds,
+            "traced_peak_mb": self.traced_peak / MB,
+            "rss_peak_delta_mb": None if self.rss_peak_delta is None else self.rss_peak_delta / MB,
+            "peak_mb": self.peak / MB,
+        }
+        if frame_bytes:
+            out["overhead_x"] = self.peak / frame_bytes
+        return out
+
+    def describe(self, frame_bytes: int | None = None) -> str:
+        parts = []
+        if self.trace:
+            parts.append(f"tracemalloc {self.traced_peak / MB:.1f} MB")
+        parts.append("RSS n/d" if self.rss_peak_delta is None else f"RSS +{self.rss_peak_delta / MB:.1f} MB")
+        text = "szczyt: " + ", ".join(parts)
+        if frame_bytes:
+            text += f" (x{self.peak / frame_bytes:.2f} ramki)"
+        return text
+
+
+def probe_call(fn: Callable[[], object], size: int | None = None) -> dict:
+    """
+    Dwa przebiegi fn(): czas i RSS bez tracemalloc (który spowalnia kod
+    Pythona kilkukrotnie i sam zajmuje pamięć), potem szczyt tracemalloc.
+    Wynik fn() żyje do końca pomiaru - odczyt liczy się razem z ramką wynikową.
+    """
+    with MemoryProbe(trace=False) as plain:
+        result = fn()
+    del result
+    with MemoryProbe() as traced:
+        result = fn()
+    del result
+
+    peak = max(traced.traced_peak, plain.rss_peak_delta or 0)
+    out = {
+        "seconds": plain.seconds,
+        "traced_peak_mb": traced.traced_peak / MB,
+        "rss_peak_delta_mb": None if plain.rss_peak_delta is None else plain.rss_peak_delta / MB,
+        "peak_mb": peak / MB,
+    }
+    if size:
+        out["overhead_x"] = peak / size
+    return out
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _excel_engine() -> str | None:
+    for engine in ("xlsxwriter", "openpyxl"):
+        if _has(engine):
+            return engine
+    return None
+
+
+def io_cases() -> list[tuple[str, str, Callable[[pd.DataFrame, Path], None], Callable[[Path], pd.DataFrame]]]:
+    """(etykieta, plik, zapis, odczyt) dla formatów z genpandas, które da się tu uruchomić."""
+    cases = [
+        ("CSV", "data.csv", lambda df, p: df.to_csv(p, index=False), lambda p: pd.read_csv(p, parse_dates=["ts"])),
+        ("CSV.GZ", "data.csv.gz", lambda df, p: df.to_csv(p, index=False, compression="gzip"),
+         lambda p: pd.read_csv(p, parse_dates=["ts"])),
+        ("Pickle", "data.pkl", lambda df, p: df.to_pickle(p), pd.read_pickle),
+        ("JSONL", "data.jsonl", lambda df, p: df.to_json(p, orient="records", lines=True, force_ascii=False, date_format="iso"),
+         lambda p: pd.read_json(p, lines=True)),
+    ]
+    if _has("pyarrow") or _has("fastparquet"):
+        cases.insert(2, ("Parquet", "data.parquet", lambda df, p: df.to_parquet(p, index=False), pd.read_parquet))
+    if _has("pyarrow"):
+        cases.insert(3, ("Feather", "data.feather", lambda df, p: df.to_feather(p), pd.read_feather))
+    engine = _excel_engine()
+    if engine is not None and _has("openpyxl"):
+        cases.append(("Excel", "data.xlsx", lambda df, p: df.to_excel(p, index=False, engine=engine), pd.read_excel))
+    return cases
+
+
+def profile_io(df: pd.DataFrame, work_dir: Path) -> list[dict]:
+    """Zapis i odczyt każdego formatu pod MemoryProbe; wypisuje tabelę na bieżąco."""
+    size = frame_bytes(df)
+    rows = []
+    print(f"{'format':8s} {'operacja':8s} {'czas':>8s} {'tracemalloc':>12s} {'RSS':>10s} {'narzut':>8s}")
+    for label, name, write, read in io_cases():
+        if label == "Excel" and len(df) > EXCEL_MAX_ROWS:
+            print("Excel pominięty (za dużo wierszy).")
+            continue
+        path = work_dir / name
+        for op, fn in (("zapis", lambda: write(df, path)), ("odczyt", lambda: read(path))):
+            r = {"format": label, "op": op, **probe_call(fn, size)}
+            rows.append(r)
+            rss = "n/d" if r["rss_peak_delta_mb"] is None else f"{r['rss_peak_delta_mb']:.1f} MB"
+            print(
+                f"{label:8s} {op:8s} {r['seconds']:7.2f}s {r['traced_peak_mb']:9.1f} MB {rss:>10s} "
+                f"x{r['overhead_x']:6.2f}"
+            )
+        path.unlink(missing_ok=True)
+    return rows
+
+
+def safe_limits(rows: list[dict], size: int) -> dict[str, float]:
+    """Format -> bezpieczny limit pamięci [MB] dla ramki tej wielkości (zapis i odczyt)."""
+    limits: dict[str, float] = {}
+    for r in rows:
+        need = (size / MB) * (1 + r["overhead_x"]) * SAFETY_MARGIN
+        limits[r["format"]] = max(limits.get(r["format"], 0.0), need)
+    return limits
+
+
+def main() -> None:
+    from genpandas import generate_big_df
+
+    parser = argparse.ArgumentParser(description="Szczytowa pamięć eksportu/importu ramek genpandas.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--out", default="mem_report.json")
+    args = parser.parse_args()
+
+    df = generate_big_df(n_rows=args.rows)
+    size = frame_bytes(df)
+    print(f"Ramka: {args.rows:,} wierszy, {size / MB:.1f} MB (memory_usage deep)"
+          f"{'' if psutil else ' - bez psutil, RSS z /proc'}\n")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mem-probe-"))
+    try:
+        rows = profile_io(df, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    limits = safe_limits(rows, size)
+    print(f"\nBezpieczny limit pamięci dla tej ramki (x{SAFETY_MARGIN} zapasu):")
+    for fmt, mb in sorted(limits.items(), key=lambda kv: kv[1]):
+        print(f"{fmt:8s} {mb:9.1f} MB  (x{mb / (size / MB):.1f} rozmiaru ramki)")
+    if _excel_engine() is None or not _has("openpyxl"):
+        print("Excel pominięty (brak openpyxl/xlsxwriter).")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "pandas": pd.__version__,
+        "n_rows": args.rows,
+        "frame_mb": size / MB,
+        "rss_source": "psutil" if psutil else "/proc/self/statm",
+        "results": rows,
+        "safe_limits_mb": limits,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nRaport: {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
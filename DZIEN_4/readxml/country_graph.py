@@ -0,0 +1,236 @@
+"""
+country_graph.py
+
+Indeks sąsiedztwa (graf "kto z kim graniczy") zbudowany nad rekordami
+z parse_countries() / iter_countries().
+
+Zamiast listy słowników neighbours w każdym rekordzie trzymamy graf
+w formacie CSR (Compressed Sparse Row) - dwie tablice numpy:
+    - indptr[i] : indptr[i + 1]  -> zakres sąsiadów węzła i
+    - indices[...]               -> numery sąsiadów (int32)
+Nazwy krajów są zamienione na kolejne liczby całkowite (names[i]).
+
+Dzięki temu:
+    - stopień (liczba sąsiadów) = indptr[i + 1] - indptr[i]       -> O(1)
+    - sąsiedzi węzła             = wycinek tablicy indices         -> bez kopiowania
+    - BFS (k-hop, najkrótsza liczba "przejść granic") rozwija
+      cały poziom naraz operacjami wektorowymi numpy
+      (najkrótsza droga: BFS dwukierunkowy).
+
+Uruchomienie:
+    python country_graph.py [kraj.xml]          # demo na pliku XML
+    python country_graph.py --bench 1000000     # pomiar na losowym grafie
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from xml_countries_viewer import iter_countries
+
+
+class CountryGraph:
+    """
+    Graf sąsiedztwa w formacie CSR.
+
+    Węzłami są wszystkie kraje z pliku ORAZ kraje występujące tylko jako
+    <neighbour> (np. Austria dla Liechtensteinu).
+    """
+
+    def __init__(self, names: list[str], indptr: np.ndarray, indices: np.ndarray):
+        self.names = names
+        self.indptr = indptr
+        self.indices = indices
+        self._ids = {name: i for i, name in enumerate(names)}
+
+    # ------------------------------------------------------------
+    # Budowanie
+    # ------------------------------------------------------------
+    @classmethod
+    def from_records(cls, countries: Iterable[dict], symmetric: bool = True) -> "CountryGraph":
+        """
+        Buduje graf z rekordów krajów (lista z parse_countries() albo
+        generator iter_countries() - wtedy bez trzymania całego XML).
+
+        symmetric=True: granica działa w obie strony, nawet jeśli w XML
+        jest wpisana tylko przy jednym z krajów.
+        """
+        ids: dict[str, int] = {}
+        src: list[int] = []
+        dst: list[int] = []
+
+        def node(name: str) -> int:
+            i = ids.get(name)
+            if i is None:
+                i = ids[name] = len(ids)
+            return i
+
+        for record in countries:
+            a = node(record["country"])
+            for n in record.get("neighbours", []):
+                if n.get("name"):
+                    src.append(a)
+                    dst.append(node(n["name"]))
+
+        return cls.from_edges(list(ids), np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64), symmetric)
+
+    @classmethod
+    def from_edges(cls, names: list[str], src: np.ndarray, dst: np.ndarray, symmetric: bool = True) -> "CountryGraph":
+        """Buduje CSR z tablic krawędzi (src[i] -> dst[i]), usuwając duplikaty."""
+        n = len(names)
+        if symmetric:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+
+        # unique na kluczu src * n + dst: usuwa duplikaty i od razu sortuje po (src, dst)
+        keys = np.unique(src.astype(np.int64) * n + dst)
+        src, dst = keys // max(n, 1), keys % max(n, 1)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(names, indptr, dst.astype(np.int32))
+
+    # ------------------------------------------------------------
+    # Zapytania
+    # ------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def node_id(self, name: str) -> int:
+        try:
+            return self._ids[name]
+        except KeyError:
+            raise KeyError(f"Nieznany kraj: {name}") from None
+
+    def degree(self, name: str) -> int:
+        i = self.node_id(name)
+        return int(self.indptr[i + 1] - self.indptr[i])
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbours(self, name: str) -> list[str]:
+        i = self.node_id(name)
+        return [self.names[j] for j in self.indices[self.indptr[i]:self.indptr[i + 1]]]
+
+    def _expand(self, frontier: np.ndarray) -> np.ndarray:
+        """Wszyscy sąsiedzi węzłów z frontier - jednym ruchem, bez pętli w Pythonie."""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # dla każdej pozycji wyniku: start jej węzła + przesunięcie wewnątrz zakresu
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.indices[np.repeat(starts, counts) + offsets]
+
+    def _bfs(self, source: int, max_hops: int) -> np.ndarray:
+        """BFS poziomami. Zwraca tablicę odległości (-1 = nieosiągalny)."""
+        dist = np.full(len(self.names), -1, dtype=np.int32)
+        dist[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+
+        hop = 0
+        while frontier.size and hop < max_hops:
+            hop += 1
+            candidates = self._expand(frontier)
+            new = np.unique(candidates[dist[candidates] < 0])
+            dist[new] = hop
+            frontier = new
+        return dist
+
+    def k_hop(self, name: str, k: int) -> list[str]:
+        """Kraje osiągalne w co najwyżej k przejściach granicy (bez samego kraju)."""
+        dist = self._bfs(self.node_id(name), k)
+        reached = np.flatnonzero(dist > 0)
+        return [self.names[i] for i in reached]
+
+    def shortest_hops(self, source: str, target: str) -> int:
+        """
+        Najmniejsza liczba przejść granic z source do target (-1 = brak drogi).
+
+        BFS dwukierunkowy: rozwijamy zawsze mniejszy z dwóch frontów,
+        więc odwiedzamy dużo mniej węzłów niż BFS od jednej strony.
+        """
+        s, t = self.node_id(source), self.node_id(target)
+        if s == t:
+            return 0
+
+        n = len(self.names)
+        dist = [np.full(n, -1, dtype=np.int32), np.full(n, -1, dtype=np.int32)]
+        dist[0][s] = 0
+        dist[1][t] = 0
+        frontiers = [np.array([s], dtype=np.int64), np.array([t], dtype=np.int64)]
+        hops = [0, 0]
+
+        while frontiers[0].size and frontiers[1].size:
+            side = 0 if frontiers[0].size <= frontiers[1].size else 1
+            own, other = dist[side], dist[1 - side]
+
+            hops[side] += 1
+            candidates = self._expand(frontiers[side])
+            new = np.unique(candidates[own[candidates] < 0])
+            own[new] = hops[side]
+
+            met = new[other[new] >= 0]
+            if met.size:
+                return int((own[met] + other[met]).min())
+            frontiers[side] = new
+        return -1
+
+
+def build_country_graph(xml_file: Path, symmetric: bool = True) -> CountryGraph:
+    """Strumieniowo czyta XML (iter_countries) i buduje graf sąsiedztwa."""
+    return CountryGraph.from_records(iter_countries(xml_file), symmetric=symmetric)
+
+
+def _benchmark(n_nodes: int, avg_degree: int = 4, seed: int = 42) -> None:
+    rng = np.random.default_rng(seed)
+    n_edges = n_nodes * avg_degree // 2
+    names = [f"C{i}" for i in range(n_nodes)]
+
+    t0 = time.perf_counter()
+    g = CountryGraph.from_edges(
+        names, rng.integers(0, n_nodes, n_edges), rng.integers(0, n_nodes, n_edges)
+    )
+    t1 = time.perf_counter()
+    print(f"Budowa CSR: {len(g):,} węzłów, {g.n_edges:,} krawędzi w {t1 - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    deg = g.degree("C0")
+    t1 = time.perf_counter()
+    reach = g.k_hop("C0", 3)
+    t2 = time.perf_counter()
+    hops = g.shortest_hops("C0", f"C{n_nodes - 1}")
+    t3 = time.perf_counter()
+
+    print(f"degree(C0) = {deg}                 {1000 * (t1 - t0):8.3f} ms")
+    print(f"k_hop(C0, 3) -> {len(reach):,} krajów    {1000 * (t2 - t1):8.3f} ms")
+    print(f"shortest_hops(C0, C{n_nodes - 1}) = {hops}   {1000 * (t3 - t2):8.3f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--bench":
+        _benchmark(int(sys.argv[2]))
+        sys.exit(0)
+
+    xml_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent / "kraj.xml"
+    graph = build_country_graph(xml_path)
+
+    print(f"Węzły: {len(graph)}, krawędzie (w obie strony): {graph.n_edges}")
+    for country in ("Polska", "Liechtenstein", "Panama"):
+        if country in graph:
+            print(f"{country:15s} stopień={graph.degree(country)}  sąsiedzi={graph.neighbours(country)}")
+    if "Polska" in graph:
+        print("2 przejścia od Polski:", graph.k_hop("Polska", 2))
@@ -0,0 +1,216 @@
+"""
+country_index.py
+
+Indeksy pomocnicze (secondary indexes) nad DataFrame z parse_countries().
+
+Zamiast filtrować całą ramkę przy każdym zapytaniu (df[df["continent"] == ...])
+budujemy RAZ po parsowaniu:
+    - indeksy haszujące dla atrybutów kategorycznych (continent, rok):
+      wartość -> tablica numerów wierszy              -> O(1) na zapytanie
+    - posortowane tablice dla zakresów liczbowych (wartP):
+      wartości posortowane + permutacja wierszy       -> O(log n) (searchsorted)
+
+Indeks zapisujemy obok pliku XML (kraj.xml -> kraj.idx.npz) razem z rozmiarem
+i czasem modyfikacji XML, więc kolejne uruchomienia wczytują go bez parsowania,
+a zmieniony XML wymusza przebudowę.
+
+Numery wierszy odnoszą się do kolejności w df (posortowanej po nazwie kraju),
+a nazwy krajów są zapisane w indeksie - odpowiedź na zapytanie nie wymaga ramki.
+
+Uruchomienie:
+    python country_index.py [kraj.xml]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from xml_countries_viewer import parse_countries
+
+HASH_COLUMNS = ("continent", "rok")
+RANGE_COLUMNS = ("wartP",)
+
+
+class CountryIndex:
+    """Indeksy haszujące + zakresowe nad wierszami ramki krajów."""
+
+    def __init__(
+        self,
+        names: np.ndarray,
+        hash_indexes: dict[str, dict[str, np.ndarray]],
+        range_indexes: dict[str, tuple[np.ndarray, np.ndarray]],
+        source: dict | None = None,
+    ):
+        self.names = names
+        self.hash_indexes = hash_indexes
+        self.range_indexes = range_indexes
+        self.source = source or {}
+
+    # ------------------------------------------------------------
+    # Budowanie
+    # ------------------------------------------------------------
+    @classmethod
+    def build(
+        cls,
+        df: pd.DataFrame,
+        hash_columns: tuple[str, ...] = HASH_COLUMNS,
+        range_columns: tuple[str, ...] = RANGE_COLUMNS,
+    ) -> "CountryIndex":
+        hash_indexes: dict[str, dict[str, np.ndarray]] = {}
+        for col in hash_columns:
+            if col not in df.columns:
+                continue
+            values = df[col].reset_index(drop=True)
+            values = values[values.notna()].astype(str)
+            positions = values.index.to_numpy(dtype=np.int64)
+            # groupby().indices: wartość -> pozycje w przefiltrowanej serii (jedno przejście)
+            hash_indexes[col] = {str(k): positions[v] for k, v in values.groupby(values).indices.items()}
+
+        range_indexes: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for col in range_columns:
+            if col not in df.columns:
+                continue
+            # wartości w XML są tekstem - konwertujemy, śmieci pomijamy
+            numeric = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            rows = np.flatnonzero(~np.isnan(numeric))
+            order = np.argsort(numeric[rows], kind="stable")
+            range_indexes[col] = (numeric[rows][order], rows[order])
+
+        names = df.index.to_numpy(dtype=str)
+        return cls(names, hash_indexes, range_indexes)
+
+    # ------------------------------------------------------------
+    # Zapytania
+    # ------------------------------------------------------------
+    def lookup(self, column: str, value) -> np.ndarray:
+        """Numery wierszy, w których column == value."""
+        index = self.hash_indexes[column]
+        return index.get(str(value), np.empty(0, dtype=np.int64))
+
+    def range(self, column: str, low: float | None = None, high: float | None = None) -> np.ndarray:
+        """Numery wierszy z low <= column <= high (None = bez ograniczenia)."""
+        values, rows = self.range_indexes[column]
+        lo = 0 if low is None else np.searchsorted(values, low, side="left")
+        hi = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return np.sort(rows[lo:hi])
+
+    def query(self, **conditions) -> np.ndarray:
+        """
+        Łączy warunki (AND), np.:
+            idx.query(continent="Europa", wartP=(1_000_000, None))
+        Krotka (low, high) = zakres, pozostałe wartości = równość.
+        """
+        result: np.ndarray | None = None
+        for column, cond in conditions.items():
+            if isinstance(cond, tuple):
+                rows = self.range(column, *cond)
+            else:
+                rows = self.lookup(column, cond)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+            if result.size == 0:
+                break
+        if result is None:
+            return np.arange(len(self.names))
+        return result
+
+    def countries(self, rows: np.ndarray) -> list[str]:
+        return self.names[rows].tolist()
+
+    @staticmethod
+    def select(df: pd.DataFrame, rows: np.ndarray) -> pd.DataFrame:
+        """Wiersze ramki dla wyniku zapytania (bez skanowania całej ramki)."""
+        return df.iloc[rows]
+
+    # ------------------------------------------------------------
+    # Zapis / odczyt
+    # ------------------------------------------------------------
+    def save(self, path: Path) -> None:
+        arrays: dict[str, np.ndarray] = {"names": self.names}
+        meta: dict = {"source": self.source, "hash": {}, "range": list(self.range_indexes)}
+
+        for col, index in self.hash_indexes.items():
+            keys = list(index)
+            meta["hash"][col] = keys
+            lengths = np.array([len(index[k]) for k in keys], dtype=np.int64)
+            arrays[f"hash__{col}__offsets"] = np.concatenate([[0], np.cumsum(lengths)])
+            arrays[f"hash__{col}__rows"] = (
+                np.concatenate([index[k] for k in keys]) if keys else np.empty(0, dtype=np.int64)
+            )
+
+        for col, (values, rows) in self.range_indexes.items():
+            arrays[f"range__{col}__values"] = values
+            arrays[f"range__{col}__rows"] = rows
+
+        arrays["meta"] = np.array(json.dumps(meta, ensure_ascii=False))
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "CountryIndex":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+
+            hash_indexes: dict[str, dict[str, np.ndarray]] = {}
+            for col, keys in meta["hash"].items():
+                offsets = data[f"hash__{col}__offsets"]
+                rows = data[f"hash__{col}__rows"]
+                hash_indexes[col] = {k: rows[offsets[i]:offsets[i + 1]] for i, k in enumerate(keys)}
+
+            range_indexes = {
+                col: (data[f"range__{col}__values"], data[f"range__{col}__rows"]) for col in meta["range"]
+            }
+            return cls(data["names"], hash_indexes, range_indexes, meta["source"])
+
+
+def index_path_for(xml_file: Path) -> Path:
+    """kraj.xml -> kraj.idx.npz (w tym samym katalogu)."""
+    return xml_file.with_suffix(".idx.npz")
+
+
+def _source_stamp(xml_file: Path) -> dict:
+    st = xml_file.stat()
+    return {"file": xml_file.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_or_build_index(xml_file: Path, df: pd.DataFrame | None = None) -> CountryIndex:
+    """
+    Wczytuje indeks z pliku obok XML, jeśli jest aktualny.
+    W przeciwnym razie parsuje XML (albo używa podanego df), buduje indeks i go zapisuje.
+    """
+    xml_file = Path(xml_file)
+    idx_path = index_path_for(xml_file)
+    stamp = _source_stamp(xml_file)
+
+    if idx_path.exists():
+        try:
+            index = CountryIndex.load(idx_path)
+            if index.source == stamp:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass  # uszkodzony / stary format - budujemy od nowa
+
+    if df is None:
+        _, df = parse_countries(xml_file)
+    index = CountryIndex.build(df)
+    index.source = stamp
+    index.save(idx_path)
+    return index
+
+
+if __name__ == "__main__":
+    xml_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent / "kraj.xml"
+
+    idx = load_or_build_index(xml_path)
+    print("Indeks:", index_path_for(xml_path))
+    print("Europa:", idx.countries(idx.lookup("continent", "Europa")))
+    print("rok=2020:", idx.countries(idx.lookup("rok", 2020)))
+    print("wartP >= 1 000 000:", idx.countries(idx.range("wartP", 1_000_000)))
+    print(
+        "Europa i wartP w [1e6, 6e6]:",
+        idx.countries(idx.query(continent="Europa", wartP=(1_000_000, 6_000_000))),
+    )
@@ -7,18 +7,73 @@ Czyta plik XML z krajami i pokazuje:
 
 Uruchomienie:
     python xml_countries_viewer.py /ścieżka/do/pliku.xml
+    python xml_countries_viewer.py /ścieżka/do/duzego.xml --stream   # iterparse + strumieniowy JSON/HTML
+    python xml_countries_viewer.py /ścieżka/do/duzego.xml --stream-frame   # iterparse -> sam DataFrame
 
 Jeśli nie podasz ścieżki, program użyje: kraj.xml (jeśli istnieje obok skryptu).
 """
 
 from __future__ import annotations
 
+import hashlib
+import html
 import json
+import os
+import pickle
+import re
+import sys
 from pathlib import Path
+from typing import Iterable, Iterator, TextIO
 import xml.etree.ElementTree as ET
 
 import pandas as pd
 
+# Zmień, gdy zmienia się wynik parse_countries() - stare wpisy cache przestaną pasować
+PARSER_VERSION = 1
+CACHE_DIR_NAME = ".countries_cache"
+HASH_DIGEST_SIZE = 20
+HASH_HEX_LEN = 2 * HASH_DIGEST_SIZE
+
+
+def country_record(c: ET.Element) -> dict:
+    """Buduje słownik z pełnym opisem jednego elementu <country>."""
+    # --- Atrybuty tagu <country> (parametry wewnątrz tagów) ---
+    country_name = c.get("name")
+    continent = c.get("continent")
+
+    record: dict = {
+        "country": country_name,
+        "continent": continent,
+    }
+
+    # --- Proste podtagi tekstowe (np. <id>1</id>) ---
+    # Zbieramy wszystkie dzieci poza neighbour (bo neighbour jest "rekordem" z atrybutami)
+    for child in c:
+        if child.tag == "neighbour":
+            continue
+        record[child.tag] = (child.text or "").strip()
+
+    # --- Neighbours: atrybuty wewnątrz <neighbour name="..." direction="..."/> ---
+    neighbours: list[dict] = []
+    for n in c.findall("neighbour"):
+        neighbours.append(
+            {
+                "name": n.get("name"),
+                "direction": n.get("direction"),
+            }
+        )
+
+    record["neighbours"] = neighbours
+    record["neighbour_count"] = len(neighbours)
+
+    # Dodatkowe kolumny "wygodne do analizy/wyświetlania"
+    record["neighbour_names"] = ", ".join([n["name"] for n in neighbours if n.get("name")])
+    record["neighbour_pairs"] = "; ".join(
+        [f'{n["name"]}({n["direction"]})' for n in neighbours if n.get("name")]
+    )
+
+    return record
+
 
 def parse_countries(xml_file: Path) -> tuple[list[dict], pd.DataFrame]:
     """
@@ -29,55 +84,291 @@ def parse_countries(xml_file: Path) -> tuple[list[dict], pd.DataFrame]:
     tree = ET.parse(xml_file)
     root = tree.getroot()
 
-    countries: list[dict] = []
-
     # Każdy <country> ma atrybuty (name, continent) i podtagi (<id>, <rok>, <wartP>, <neighbour .../>)
-    for c in root.findall(".//country"):
-        # --- Atrybuty tagu <country> (parametry wewnątrz tagów) ---
-        country_name = c.get("name")
-        continent = c.get("continent")
-
-        record: dict = {
-            "country": country_name,
-            "continent": continent,
-        }
-
-        # --- Proste podtagi tekstowe (np. <id>1</id>) ---
-        # Zbieramy wszystkie dzieci poza neighbour (bo neighbour jest "rekordem" z atrybutami)
-        for child in c:
-            if child.tag == "neighbour":
-                continue
-            record[child.tag] = (child.text or "").strip()
-
-        # --- Neighbours: atrybuty wewnątrz <neighbour name="..." direction="..."/> ---
-        neighbours: list[dict] = []
-        for n in c.findall("neighbour"):
-            neighbours.append(
-                {
-                    "name": n.get("name"),
-                    "direction": n.get("direction"),
-                }
-            )
-
-        record["neighbours"] = neighbours
-        record["neighbour_count"] = len(neighbours)
-
-        # Dodatkowe kolumny "wygodne do analizy/wyświetlania"
-        record["neighbour_names"] = ", ".join([n["name"] for n in neighbours if n.get("name")])
-        record["neighbour_pairs"] = "; ".join(
-            [f'{n["name"]}({n["direction"]})' for n in neighbours if n.get("name")]
-        )
-
-        countries.append(record)
+    countries: list[dict] = [country_record(c) for c in root.findall(".//country")]
 
     df = pd.DataFrame(countries).set_index("country").sort_index()
     return countries, df
 
 
-def pretty_print_countries(countries: list[dict]) -> None:
-    """Czytelny wydruk listy krajów (JSON z wcięciami)."""
+def iter_countries(xml_file: Path) -> Iterator[dict]:
+    """
+    Strumieniowo zwraca rekordy krajów - jeden <country> naraz.
+
+    iterparse buduje drzewo "w locie", więc po obsłużeniu kraju odpinamy
+    go od rodzica i czyścimy - w pamięci zostaje tylko bieżący element.
+    """
+    stack: list[ET.Element] = []
+
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if elem.tag != "country":
+            continue
+
+        yield country_record(elem)
+
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def parse_countries_streaming(xml_file: Path, chunk_rows: int = 50_000) -> pd.DataFrame:
+    """
+    Tryb strumieniowy: buduje ten sam DataFrame co parse_countries(),
+    ale bez trzymania całego drzewa XML ani listy wszystkich rekordów.
+
+    Rekordy trafiają do buforów kolumnowych (dict: kolumna -> lista),
+    które co chunk_rows wierszy zamieniamy na mały DataFrame.
+    """
+    chunks: list[pd.DataFrame] = []
+    columns: dict[str, list] = {}
+    n_buffered = 0
+
+    def flush() -> None:
+        nonlocal columns, n_buffered
+        if n_buffered:
+            chunks.append(pd.DataFrame(columns))
+        columns = {}
+        n_buffered = 0
+
+    for record in iter_countries(xml_file):
+        # kolumna, która pojawia się pierwszy raz, dostaje None dla wcześniejszych wierszy
+        for key in record:
+            if key not in columns:
+                columns[key] = [None] * n_buffered
+        for key, values in columns.items():
+            values.append(record.get(key))
+        n_buffered += 1
+
+        if n_buffered >= chunk_rows:
+            flush()
+    flush()
+
+    if not chunks:
+        return pd.DataFrame(columns=["country"]).set_index("country")
+
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    # porcja, w której kolumna ma same None, jest typu object i concat daje object;
+    # infer_objects() przywraca typy jak pd.DataFrame(records) w parse_countries() (np. str)
+    return df.infer_objects().set_index("country").sort_index()
+
+
+def file_content_hash(path: Path, block_size: int = 1024 * 1024) -> str:
+    """Skrót zawartości pliku (BLAKE2b), liczony blokami - bez wczytywania całości."""
+    h = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parse_countries_cached(xml_file: Path, cache_dir: Path | None = None) -> tuple[list[dict], pd.DataFrame]:
+    """
+    parse_countries() z trwałym cache na dysku.
+
+    Klucz = skrót zawartości XML + PARSER_VERSION, wartość = (countries, df)
+    zapisane picklem (szybki format binarny). Niezmieniony plik wczytuje się
+    bez parsowania; zmieniony plik ma inny skrót, więc cache unieważnia się sam.
+    """
+    xml_file = Path(xml_file)
+    cache_dir = Path(cache_dir) if cache_dir else xml_file.parent / CACHE_DIR_NAME
+    cache_file = cache_dir / f"{xml_file.stem}-{file_content_hash(xml_file)}-v{PARSER_VERSION}.pkl"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            pass  # uszkodzony albo nieaktualny wpis (np. po zmianie modułów) - parsujemy od nowa
+
+    countries, df = parse_countries(xml_file)
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # stare wersje TEGO pliku nie będą już potrzebne (kraj-2.xml ma własne wpisy)
+        own_entry = re.compile(rf"{re.escape(xml_file.stem)}-[0-9a-f]{{{HASH_HEX_LEN}}}-v\d+\.pkl")
+        for old in cache_dir.iterdir():
+            if own_entry.fullmatch(old.name):
+                old.unlink(missing_ok=True)
+
+        # zapis atomowy: najpierw plik tymczasowy, potem podmiana
+        tmp_file = cache_file.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_file, "wb") as f:
+            pickle.dump((countries, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # np. katalog tylko do odczytu - wynik bez cache
+
+    return countries, df
+
+
+class JsonArrayWriter:
+    """
+    Strumieniowy zapis tablicy JSON - rekord po rekordzie.
+
+    Wynik jest identyczny z json.dumps(lista, ensure_ascii=False, indent=indent),
+    ale w pamięci jest zawsze tylko jeden rekord, a pierwszy pojawia się od razu.
+    """
+
+    def __init__(self, out: TextIO, indent: int = 2):
+        self.out = out
+        self.pad = " " * indent
+        self.indent = indent
+        self.count = 0
+
+    def write(self, record: dict) -> None:
+        body = json.dumps(record, ensure_ascii=False, indent=self.indent)
+        # wcięcie o jeden poziom (znaki nowej linii w stringach JSON są escapowane)
+        body = self.pad + body.replace("\n", "\n" + self.pad)
+        self.out.write(("[\n" if self.count == 0 else ",\n") + body)
+        if self.count == 0:
+            self.out.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self.out.write("\n]\n" if self.count else "[]\n")
+        self.out.flush()
+
+    def __enter__(self) -> "JsonArrayWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HtmlTableWriter:
+    """
+    Strumieniowy zapis tabeli HTML (układ i formatowanie komórek jak DataFrame.to_html()).
+
+    Kolumny podaje się z góry (np. record_columns() z pierwszego przejścia
+    po pliku) - bez nich bierzemy je z pierwszego rekordu, a klucze, które
+    pojawią się później, przepadają. index_col trafia do nagłówka wiersza.
+    Wiersze są w kolejności wejścia (bez sortowania - to wymagałoby całej ramki).
+    """
+
+    def __init__(self, out: TextIO, index_col: str = "country", columns: list[str] | None = None):
+        self.out = out
+        self.index_col = index_col
+        self.columns = None if columns is None else [c for c in columns if c != index_col]
+        self._header_written = False
+
+    @staticmethod
+    def _cell(value) -> str:
+        # brak wartości jak w to_html (NaN); to_html escapuje tylko &, < i >
+        if value is None or (isinstance(value, float) and value != value):
+            return "NaN"
+        return html.escape(str(value), quote=False)
+
+    def _write_header(self) -> None:
+        w = self.out.write
+        w('<table border="1" class="dataframe">\n  <thead>\n    <tr style="text-align: right;">\n      <th></th>\n')
+        for col in self.columns:
+            w(f"      <th>{html.escape(str(col), quote=False)}</th>\n")
+        w(f"    </tr>\n    <tr>\n      <th>{html.escape(self.index_col, quote=False)}</th>\n")
+        w("      <th></th>\n" * len(self.columns))
+        w("    </tr>\n  </thead>\n  <tbody>\n")
+        self.out.flush()
+        self._header_written = True
+
+    def write(self, record: dict) -> None:
+        if self.columns is None:
+            self.columns = [k for k in record if k != self.index_col]
+        if not self._header_written:
+            self._write_header()
+        cells = "".join(f"      <td>{self._cell(record.get(col))}</td>\n" for col in self.columns)
+        self.out.write(f"    <tr>\n      <th>{self._cell(record.get(self.index_col))}</th>\n{cells}    </tr>\n")
+
+    def close(self) -> None:
+        if not self._header_written:
+            if self.columns is None:
+                self.out.write('<table border="1" class="dataframe">\n  <tbody>\n')
+            else:
+                self._write_header()
+        self.out.write("  </tbody>\n</table>")
+        self.out.flush()
+
+    def __enter__(self) -> "HtmlTableWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def record_columns(records: Iterable[dict]) -> list[str]:
+    """Wszystkie klucze rekordów w kolejności pierwszego wystąpienia (jak kolumny pd.DataFrame(records))."""
+    columns: dict[str, None] = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def iter_frame_records(df: pd.DataFrame, chunk_rows: int = 10_000) -> Iterator[dict]:
+    """Wiersze ramki jako słowniki (z indeksem), porcjami - bez kopii całej ramki."""
+    for start in range(0, len(df), chunk_rows):
+        yield from df.iloc[start:start + chunk_rows].reset_index().to_dict("records")
+
+
+def _column_widths(chunk: pd.DataFrame) -> dict:
+    """Szerokość każdej kolumny porcji tak, jak sformatuje ją to_string (z nagłówkiem)."""
+    return {
+        col: max(len(str(col)), *(len(line) for line in chunk[[col]].to_string(index=False, header=False).split("\n")))
+        for col in chunk.columns
+    }
+
+
+def write_frame_text(df: pd.DataFrame, out: TextIO = sys.stdout, chunk_rows: int = 10_000) -> None:
+    """
+    Ramka jako tekst (jak to_string), porcjami po chunk_rows wierszy.
+
+    Pierwsze przejście formatuje porcje tak samo jak drugie (to_string) i zbiera
+    największą szerokość każdej kolumny; drugie wypisuje porcje z tym col_space,
+    więc wszystkie są wyrównane z nagłówkiem. Kopiujemy tylko bieżącą porcję.
+    """
+    def chunks() -> Iterator[pd.DataFrame]:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reset_index()
+
+    widths: dict = {}
+    for chunk in chunks():
+        for col, width in _column_widths(chunk).items():
+            widths[col] = max(widths.get(col, 0), width)
+
+    for i, chunk in enumerate(chunks()):
+        out.write(chunk.to_string(index=False, header=i == 0, col_space=widths) + "\n")
+        out.flush()
+
+
+def write_countries_json(records: Iterable[dict], out: TextIO = sys.stdout) -> int:
+    """Zapisuje rekordy jako tablicę JSON (strumieniowo). Zwraca liczbę rekordów."""
+    with JsonArrayWriter(out) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def write_countries_html(records: Iterable[dict], out: TextIO, columns: list[str] | None = None) -> None:
+    """Zapisuje rekordy jako tabelę HTML (strumieniowo)."""
+    with HtmlTableWriter(out, columns=columns) as writer:
+        for record in records:
+            writer.write(record)
+
+
+def pretty_print_countries(countries: Iterable[dict]) -> None:
+    """Czytelny wydruk listy krajów (JSON z wcięciami) - rekord po rekordzie."""
     print("=== LISTA KRAJÓW (list[dict]) ===")
-    print(json.dumps(countries, ensure_ascii=False, indent=2))
+    write_countries_json(countries, sys.stdout)
+
+
+def write_frame(df: pd.DataFrame, html_path: str = "countries.html") -> None:
+    """DataFrame w konsoli i w HTML - porcjami, bez budowania jednego ogromnego napisu."""
+    write_frame_text(df, sys.stdout)
+    with open(html_path, "w", encoding="utf-8", buffering=1024 * 1024) as html_file:
+        write_countries_html(iter_frame_records(df), html_file, columns=[df.index.name, *df.columns])
 
 
 def main() -> None:
@@ -90,6 +381,23 @@ def main() -> None:
         default=None,
         help="Ścieżka do pliku XML (opcjonalnie).",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Tryb strumieniowy (iterparse) dla dużych plików: JSON na stdout i countries.html "
+        "zapisywane rekord po rekordzie, bez budowania DataFrame.",
+    )
+    parser.add_argument(
+        "--stream-frame",
+        action="store_true",
+        help="Tryb strumieniowy (iterparse) budujący tylko DataFrame (parse_countries_streaming): "
+        "bez drzewa XML i listy rekordów w pamięci, bez cache.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Zawsze parsuj XML od nowa (bez cache w katalogu .countries_cache).",
+    )
     args = parser.parse_args()
 
     # Domyślna ścieżka: plik 'kraj.xml' obok skryptu, jeśli użytkownik nie poda argumentu
@@ -104,16 +412,33 @@ def main() -> None:
             f"Podaj poprawną ścieżkę, np.: python {Path(__file__).name} /path/to/file.xml"
         )
 
-    countries, df = parse_countries(xml_file)
+    if args.stream:
+        # Pierwsze przejście: tylko nazwy kolumn (klucz może pojawić się dopiero w dalszym kraju).
+        # Drugie: każdy rekord idzie od razu do JSON (stdout) i do HTML.
+        columns = record_columns(iter_countries(xml_file))
+        print("=== LISTA KRAJÓW (strumieniowo) ===")
+        with open("countries.html", "w", encoding="utf-8", buffering=1024 * 1024) as html_file, \
+                JsonArrayWriter(sys.stdout) as json_writer, \
+                HtmlTableWriter(html_file, columns=columns) as html_writer:
+            for record in iter_countries(xml_file):
+                json_writer.write(record)
+                html_writer.write(record)
+        return
+
+    if args.stream_frame:
+        print("=== DATAFRAME (wiersz = country, strumieniowo) ===")
+        write_frame(parse_countries_streaming(xml_file))
+        return
+
+    parse = parse_countries if args.no_cache else parse_countries_cached
+    countries, df = parse(xml_file)
 
     # 1) lista krajów z danymi (w tym atrybuty)
     pretty_print_countries(countries)
 
     # 2) DataFrame
     print("\n=== DATAFRAME (wiersz = country) ===")
-    # print(df) pokazuje całą ramkę w konsoli
-    print(df.to_string())
-    df.to_html("countries.html")
+    write_frame(df)
 
 
 if __name__ == "__main__":
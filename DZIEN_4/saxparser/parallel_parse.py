@@ -0,0 +1,175 @@
+"""
+parallel_parse.py
+
+Równoległe parsowanie JEDNEGO dużego pliku transactions.xml.
+
+Pomysł:
+1) Skanujemy bajty pliku i szukamy bezpiecznych punktów podziału
+   - zawsze na początku elementu <transaction ...>.
+2) Każdy kawałek (chunk) parsujemy w osobnym procesie jako samodzielny
+   dokument: nagłówek oryginalnego pliku (<?xml ...?><transactions>)
+   + fragment + oryginalne zamknięcie (</transactions>).
+3) Wyniki sklejamy w ORYGINALNEJ kolejności.
+
+Do parsowania fragmentów używamy tego samego TransactionHandler co wersja
+sekwencyjna, więc wynik (łącznie z atrybutem currency) jest identyczny.
+
+Założenie: tekst "<transaction" nie występuje wewnątrz komentarzy ani CDATA
+pomiędzy transakcjami (skan bajtowy nie rozumie składni XML).
+
+Uruchomienie:
+    python parallel_parse.py [transactions.xml] [liczba_procesów]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import xml.sax
+from concurrent.futures import ProcessPoolExecutor
+
+from main import Transaction, TransactionHandler, parse_transactions
+
+TX_OPEN = b"<transaction"
+# po nazwie tagu musi być biały znak, '>' albo '/', inaczej trafilibyśmy w <transactions>
+TX_NAME_END = b" \t\r\n>/"
+ROOT_CLOSE = b"</transactions"
+
+SCAN_WINDOW = 64 * 1024
+MIN_CHUNK_BYTES = 1024 * 1024
+
+
+def _find_tx_start(f, offset: int, limit: int) -> int:
+    """
+    Zwraca pozycję pierwszego '<transaction' (jako całego tagu) >= offset
+    i < limit. Jeśli nie ma - zwraca limit.
+    """
+    pos = offset
+    while pos < limit:
+        f.seek(pos)
+        # nakładka len(TX_OPEN) bajtów, żeby nie zgubić trafienia na granicy okna
+        window = f.read(min(SCAN_WINDOW, limit - pos) + len(TX_OPEN))
+        start = 0
+        while True:
+            i = window.find(TX_OPEN, start)
+            if i == -1 or pos + i >= limit:
+                break
+            nxt = window[i + len(TX_OPEN): i + len(TX_OPEN) + 1]
+            if nxt and nxt in TX_NAME_END:
+                return pos + i
+            if not nxt:
+                # tag urwany na końcu okna - doczytamy go w następnej iteracji
+                break
+            start = i + 1
+        pos += SCAN_WINDOW
+    return limit
+
+
+def _find_body_end(f, file_size: int) -> int:
+    """Pozycja zamykającego </transactions> (szukamy od końca pliku)."""
+    pos = file_size
+    tail = b""
+    while pos > 0:
+        step = min(SCAN_WINDOW, pos)
+        pos -= step
+        f.seek(pos)
+        tail = f.read(step) + tail[: len(ROOT_CLOSE)]
+        i = tail.rfind(ROOT_CLOSE)
+        if i != -1:
+            return pos + i
+    raise ValueError("Nie znaleziono zamykającego tagu </transactions>")
+
+
+def find_split_points(xml_path: str, n_chunks: int) -> tuple[bytes, bytes, list[tuple[int, int]]]:
+    """
+    Dzieli plik na maksymalnie n_chunks zakresów bajtów [start, end),
+    z których każdy zaczyna się od <transaction.
+
+    Zwraca:
+      - header: bajty od początku pliku do pierwszej transakcji (prolog + <transactions>)
+      - footer: bajty od </transactions> do końca pliku
+      - ranges: lista (start, end) w kolejności pliku
+    """
+    file_size = os.path.getsize(xml_path)
+
+    with open(xml_path, "rb") as f:
+        body_end = _find_body_end(f, file_size)
+        first = _find_tx_start(f, 0, body_end)
+
+        f.seek(0)
+        header = f.read(first)
+        f.seek(body_end)
+        footer = f.read()
+
+        if first >= body_end:
+            return header, footer, []
+
+        body_size = body_end - first
+        n_chunks = max(1, min(n_chunks, body_size // MIN_CHUNK_BYTES or 1))
+        step = body_size / n_chunks
+
+        starts = [first]
+        for k in range(1, n_chunks):
+            s = _find_tx_start(f, int(first + k * step), body_end)
+            if s > starts[-1] and s < body_end:
+                starts.append(s)
+
+    ends = starts[1:] + [body_end]
+    return header, footer, list(zip(starts, ends))
+
+
+def _parse_chunk(args: tuple[str, bytes, bytes, int, int]) -> list[Transaction]:
+    """Worker: czyta swój zakres bajtów i parsuje go jako samodzielny dokument."""
+    xml_path, header, footer, start, end = args
+    with open(xml_path, "rb") as f:
+        f.seek(start)
+        body = f.read(end - start)
+
+    handler = TransactionHandler()
+    xml.sax.parseString(header + body + footer, handler)
+    return handler.transactions
+
+
+def parse_transactions_parallel(
+    xml_path: str,
+    workers: int | None = None,
+    chunks_per_worker: int = 4,
+) -> list[Transaction]:
+    """
+    Równoległy odpowiednik parse_transactions().
+
+    Wynik ma tę samą kolejność i te same wartości co wersja sekwencyjna.
+    Dla małych plików (albo workers=1) po prostu woła parse_transactions().
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return parse_transactions(xml_path)
+
+    header, footer, ranges = find_split_points(xml_path, workers * chunks_per_worker)
+    if len(ranges) <= 1:
+        return parse_transactions(xml_path)
+
+    tasks = [(xml_path, header, footer, s, e) for s, e in ranges]
+
+    transactions: list[Transaction] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() zwraca wyniki w kolejności zadań -> zachowujemy kolejność z pliku
+        for part in pool.map(_parse_chunk, tasks):
+            transactions.extend(part)
+    return transactions
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "transactions.xml"
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    t0 = time.perf_counter()
+    seq = parse_transactions(path)
+    t1 = time.perf_counter()
+    par = parse_transactions_parallel(path, workers=n_workers)
+    t2 = time.perf_counter()
+
+    print(f"Sekwencyjnie: {len(seq):,} transakcji w {t1 - t0:.2f}s")
+    print(f"Równolegle:   {len(par):,} transakcji w {t2 - t1:.2f}s")
+    print("Wyniki identyczne:", seq == par)
@@ -0,0 +1,204 @@
+"""
+sharded_export.py
+
+Równoległy eksport CSV / CSV.GZ / JSONL - ramka dzielona na zakresy wierszy.
+
+Formatowanie tekstu i gzip w to_csv / to_json to praca na jednym rdzeniu.
+Tutaj każdy proces (ProcessPoolExecutor) formatuje i kompresuje swój shard
+do osobnego pliku part-NNNNN (format dat CSV wybrany raz dla całej ramki,
+chunked_export.csv_date_format - inaczej shard z samymi północami dostałby
+samą datę), a potem:
+    - tryb "concat": części sklejamy bajt po bajcie w jeden plik; nagłówek
+      CSV ma tylko shard 0, a pliki .gz są poprawne, bo gzip dopuszcza
+      wiele członów (members) jeden za drugim - gunzip / pandas czytają je
+      jak jeden strumień,
+    - tryb "partitioned": części zostają w katalogu (każda z nagłówkiem CSV),
+      np. do równoległego odczytu.
+
+Źródła shardów:
+    - export_frame_sharded(): gotowa ramka - proces dostaje swój wycinek
+      (pickle wycinka, bez kopii całości),
+    - export_generated_sharded(): proces sam generuje swój zakres przez
+      genpandas.generate_chunk - nic nie jest przesyłane między procesami.
+
+Uruchomienie (przepustowość vs liczba procesów):
+    python sharded_export.py --rows 5000000 --formats CSV.GZ --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from chunked_export import csv_date_format, generated_date_format
+from genpandas import generate_chunk
+
+FORMATS = {
+    "CSV": ".csv",
+    "CSV.GZ": ".csv.gz",
+    "JSONL": ".jsonl",
+    "JSONL.GZ": ".jsonl.gz",
+}
+GZIP_LEVEL = 6
+
+
+def _write_shard(df: pd.DataFrame, fmt: str, path: Path, header: bool, date_format: str | None) -> int:
+    compression = {"method": "gzip", "compresslevel": GZIP_LEVEL, "mtime": 0} if fmt.endswith(".GZ") else None
+    if fmt.startswith("CSV"):
+        df.to_csv(path, index=False, header=header, compression=compression, date_format=date_format)
+    else:
+        df.to_json(path, orient="records", lines=True, force_ascii=False, date_format="iso", compression=compression)
+    return len(df)
+
+
+def _frame_shard(args: tuple[pd.DataFrame, str, str, bool, str | None]) -> int:
+    df, fmt, path, header, date_format = args
+    return _write_shard(df, fmt, Path(path), header, date_format)
+
+
+def _generated_shard(args: tuple[int, int, int, int, str, str, bool, str | None]) -> int:
+    shard_no, start, n_rows, seed, fmt, path, header, date_format = args
+    return _write_shard(generate_chunk(shard_no, start, n_rows, seed), fmt, Path(path), header, date_format)
+
+
+def shard_ranges(n_rows: int, n_shards: int) -> list[tuple[int, int]]:
+    """(start, liczba wierszy) dla n_shards możliwie równych zakresów."""
+    n_shards = max(1, min(n_shards, n_rows))
+    bounds = [n_rows * i // n_shards for i in range(n_shards + 1)]
+    return [(lo, hi - lo) for lo, hi in zip(bounds, bounds[1:])]
+
+
+def part_name(i: int, fmt: str) -> str:
+    return f"part-{i:05d}{FORMATS[fmt]}"
+
+
+def concat_parts(parts: list[Path], out_path: Path) -> None:
+    """Skleja części w kolejności (dla .gz wynik to wieloczłonowy, poprawny gzip)."""
+    with open(out_path, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as src:
+                shutil.copyfileobj(src, out, 8 * 1024 * 1024)
+
+
+def _run_shards(worker, tasks: list[tuple], workers: int) -> int:
+    if workers <= 1:
+        return sum(map(worker, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(worker, tasks))
+
+
+def _finish(parts: list[Path], out: Path, mode: str) -> Path:
+    if mode == "partitioned":
+        return out
+    concat_parts(parts, out)
+    return out
+
+
+def _targets(out: Path, fmt: str, n_shards: int, mode: str) -> tuple[list[Path], Path | None]:
+    """Ścieżki części (+ katalog tymczasowy do usunięcia w trybie concat)."""
+    if mode == "partitioned":
+        out.mkdir(parents=True, exist_ok=True)
+        return [out / part_name(i, fmt) for i in range(n_shards)], None
+    tmp = Path(tempfile.mkdtemp(prefix=".shards-", dir=out.parent))
+    return [tmp / part_name(i, fmt) for i in range(n_shards)], tmp
+
+
+def export_frame_sharded(
+    df: pd.DataFrame,
+    fmt: str,
+    out: str | Path,
+    workers: int | None = None,
+    shards: int | None = None,
+    mode: str = "concat",
+) -> Path:
+    """
+    Zapisuje ramkę w formacie fmt (FORMATS) równolegle.
+    mode="concat" -> jeden plik `out`; mode="partitioned" -> katalog `out` z częściami.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = shard_ranges(len(df), shards or workers)
+    out = Path(out)
+    parts, tmp = _targets(out, fmt, len(ranges), mode)
+    date_format = csv_date_format(df) if fmt.startswith("CSV") else None
+    try:
+        tasks = [
+            (df.iloc[start:start + n], fmt, str(part), i == 0 or mode == "partitioned", date_format)
+            for i, ((start, n), part) in enumerate(zip(ranges, parts))
+        ]
+        _run_shards(_frame_shard, tasks, workers)
+        return _finish(parts, out, mode)
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def export_generated_sharded(
+    n_rows: int,
+    fmt: str,
+    out: str | Path,
+    workers: int | None = None,
+    shards: int | None = None,
+    mode: str = "concat",
+    seed: int = 42,
+) -> Path:
+    """
+    Jak export_frame_sharded, ale shard i generuje swoje wiersze sam
+    (generate_chunk(i, start, n, seed)) - te same dane co iter_big_df_chunks
+    z chunk_rows równym rozmiarowi shardu.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = shard_ranges(n_rows, shards or workers)
+    out = Path(out)
+    parts, tmp = _targets(out, fmt, len(ranges), mode)
+    date_format = generated_date_format(n_rows, seed) if fmt.startswith("CSV") else None
+    try:
+        tasks = [
+            (i, start, n, seed, fmt, str(part), i == 0 or mode == "partitioned", date_format)
+            for i, ((start, n), part) in enumerate(zip(ranges, parts))
+        ]
+        _run_shards(_generated_shard, tasks, workers)
+        return _finish(parts, out, mode)
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main() -> None:
+    from genpandas import generate_big_df
+
+    parser = argparse.ArgumentParser(description="Równoległy (shardowany) eksport CSV / CSV.GZ / JSONL.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=["CSV", "CSV.GZ", "JSONL"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--mode", choices=["concat", "partitioned"], default="concat")
+    parser.add_argument("--out-dir", default="pandas_exports_sharded")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(exist_ok=True)
+    df = generate_big_df(n_rows=args.rows)
+    print(f"{args.rows:,} wierszy, CPU: {os.cpu_count()}, tryb: {args.mode}")
+
+    for fmt in args.formats:
+        base = None
+        for workers in args.workers:
+            target = out_dir / f"data-{workers}w{FORMATS[fmt] if args.mode == 'concat' else ''}"
+            t0 = time.perf_counter()
+            export_frame_sharded(df, fmt, target, workers=workers, mode=args.mode)
+            seconds = time.perf_counter() - t0
+            base = base or seconds
+            print(
+                f"{fmt:8s} procesy {workers:3d}  {seconds:7.2f}s  "
+                f"{args.rows / seconds / 1e6:6.2f} mln wierszy/s  przyspieszenie x{base / seconds:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from concurrent_panels import compute_sections, make_executor, panels_from_sections, top_outliers_rows
+from csv_ingest import file_hash, read_csv_chunked
+from demo_data import generate_demo_data
+from export_stream import EXPORT_MAX_ROWS, FORMATS, available_formats, export_to_file
+from filter_index import FilterIndex, PartitionedFilterIndex
+from live_feed import LiveStream
+from ooc_data import LazyDataset, generate_partitioned, open_dataset
+from query_backends import Filters, QueryBackend, available_backends, backend_panels, make_backend
+from rollup_cube import Panels, RollupCube, compute_panels
+from shared_dataset import attach, share
+
 # =========================
 # 1) USTAWIENIA APLIKACJI
 # =========================
@@ -20,35 +36,151 @@ st.caption("Mini-dashboard: generowanie danych / upload CSV, filtry, KPI, wykres
 # =========================
 # 2) GENEROWANIE DANYCH (cache)
 # =========================
-@st.cache_data(show_spinner=False)
+@st.cache_resource(show_spinner=False, max_entries=4)
 def generate_data(n_rows: int, seed: int) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
+    # jedna kopia dla wszystkich sesji i procesów: kolumny w pamięci współdzielonej,
+    # ramka to widoki tylko do odczytu (cache_data dawałby każdej sesji własną kopię)
+    key = ("gen", n_rows, seed)
+    ds = attach(key) or share(generate_demo_data(n_rows, seed), key)
+    return ds.frame()
+
+
+@st.cache_resource(show_spinner=False)
+def uploaded_frames() -> tuple[dict[str, pd.DataFrame], threading.Lock]:
+    # skrót zawartości pliku -> wczytana ramka (wspólne dla reruns i sesji, bez kopiowania);
+    # słownik zmieniają wątki różnych sesji, więc dostęp tylko pod blokadą
+    return {}, threading.Lock()
+
+
+def upload_content_hash(uploaded) -> str:
+    # skrót liczony raz na upload (file_id); kolejne reruns nie czytają pliku ponownie
+    memo = st.session_state.setdefault("upload_hashes", {})
+    key = (uploaded.file_id, uploaded.size)
+    if key not in memo:
+        memo.clear()  # poprzednie uploady tej sesji nie są już potrzebne
+        memo[key] = file_hash(uploaded)
+    return memo[key]
+
+
+def load_uploaded_csv(uploaded, max_cached: int = 2) -> tuple[str, pd.DataFrame]:
+    upload_hash = upload_content_hash(uploaded)
+    frames, lock = uploaded_frames()
+    with lock:
+        df = frames.get(upload_hash)
+    if df is None:
+        # pasek postępu poza funkcją z cache (elementów nie da się "odtworzyć" z cache)
+        progress = st.sidebar.progress(0.0, text="Wczytywanie CSV…")
+        df = read_csv_chunked(uploaded, total_bytes=uploaded.size, progress=progress.progress)
+        progress.empty()
+
+        # Prosty kontrakt: oczekujemy kolumn minimum: ts, category, amount (city opcjonalnie)
+        if "city" not in df.columns:
+            df["city"] = "N/A"
+
+        with lock:
+            # inna sesja mogła w międzyczasie wczytać ten sam plik - zostaje jedna ramka
+            df = frames.setdefault(upload_hash, df)
+            while len(frames) > max_cached:
+                frames.pop(next(iter(frames)))
+    return upload_hash, df
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_dataset_index(dataset_key: tuple, _ds: LazyDataset) -> PartitionedFilterIndex:
+    # zbiór na dysku: tylko słowniki i zakres kwot, maski liczone partiami z memmap
+    return PartitionedFilterIndex(_ds)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_dataset_cube(dataset_key: tuple, _ds: LazyDataset) -> RollupCube:
+    # kostka z kodów uint8 partiami - bez ramki całego zbioru
+    return RollupCube.from_dataset(_ds)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_filter_index(dataset_key: tuple, _df: pd.DataFrame) -> FilterIndex:
+    # _df nie jest hashowany - zbiór danych identyfikuje dataset_key
+    return FilterIndex(_df)
+
 
-    categories = np.array(["food", "fuel", "books", "tools", "travel", "other"])
-    cities = np.array(["Warszawa", "Kraków", "Gdańsk", "Wrocław", "Poznań"])
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_rollup_cube(dataset_key: tuple, _df: pd.DataFrame) -> RollupCube:
+    return RollupCube(_df)
 
-    # Oś czasu (minuty)
-    ts = pd.date_range("2026-01-01", periods=n_rows, freq="min")
 
-    df = pd.DataFrame({
-        "id": np.arange(1, n_rows + 1, dtype=np.int64),
-        "ts": ts,
-        "category": rng.choice(categories, size=n_rows),
-        "city": rng.choice(cities, size=n_rows),
-        "amount": rng.lognormal(mean=3.1, sigma=0.8, size=n_rows).round(2),
-        "flag": (rng.random(n_rows) < 0.07),
-    })
+@st.cache_resource(show_spinner=False)
+def get_panel_pool() -> ThreadPoolExecutor:
+    # jedna pula wątków na cały serwer (współdzielona przez sesje)
+    return make_executor()
 
-    # Dodatkowe kolumny do analityki
-    df["date"] = df["ts"].dt.date
-    df["hour"] = df["ts"].dt.hour
-    df["weekday"] = df["ts"].dt.day_name()
 
-    # Lekka „anomalizacja” (żeby były outliery, a dashboard wyglądał ciekawiej)
-    bump_idx = rng.choice(n_rows, size=max(10, n_rows // 5000), replace=False)
-    df.loc[bump_idx, "amount"] = (df.loc[bump_idx, "amount"] * rng.uniform(8, 20, size=len(bump_idx))).round(2)
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_query_backend(dataset_key: tuple, engine: str, _df: pd.DataFrame) -> QueryBackend:
+    return make_backend(engine, _df)
 
-    return df
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_live_stream(seed: int) -> LiveStream:
+    # jeden strumień i jedna kostka przyrostowa dla wszystkich sesji
+    return LiveStream(seed)
+
+
+def render_panels(panels: Panels, top: pd.DataFrame, caption: str) -> None:
+    """KPI, wykresy i outliery - wspólne dla zbiorów statycznych i trybu na żywo."""
+    col1, col2, col3, col4 = st.columns(4)
+
+    total = panels.total
+    avg = panels.avg
+    count = panels.count
+    p95 = panels.p95
+
+    col1.metric("Suma", f"{total:,.2f}")
+    col2.metric("Średnia", f"{avg:,.2f}")
+    col3.metric("Liczba rekordów", f"{count:,}")
+    col4.metric("95 percentyl", f"{p95:,.2f}")
+
+    st.caption(caption)
+
+    st.divider()
+
+    # ---- 6) Wykresy i tabela
+    left, right = st.columns([1.2, 1])
+
+    # ---- 6a) Ranking kategorii
+    rank = panels.rank
+
+    fig_rank = px.bar(
+        rank,
+        x="category",
+        y="amount",
+        title="Suma kwot per kategoria",
+    )
+    left.plotly_chart(fig_rank, use_container_width=True)
+
+    # ---- 6b) Time series: suma per dzień
+    daily = panels.daily
+    fig_ts = px.line(
+        daily,
+        x="date",
+        y="amount",
+        title="Suma kwot w czasie (per dzień)",
+    )
+    right.plotly_chart(fig_ts, use_container_width=True)
+
+    # ---- 6c) Heatmap: dzień tygodnia x godzina
+    st.subheader("Heatmapa: tydzień × godzina (średnia kwota)")
+    pivot = panels.pivot
+
+    fig_heat = px.imshow(
+        pivot,
+        aspect="auto",
+        title="Średnia kwota (amount) w zależności od dnia tygodnia i godziny",
+    )
+    st.plotly_chart(fig_heat, use_container_width=True)
+
+    # ---- 6d) Outliery: top 30 transakcji
+    st.subheader("🪨 Outliery: największe kwoty")
+    st.dataframe(top, use_container_width=True, height=280)
 
 
 # =========================
@@ -56,7 +188,45 @@ def generate_data(n_rows: int, seed: int) -> pd.DataFrame:
 # =========================
 st.sidebar.header("Źródło danych")
 
-mode = st.sidebar.radio("Dane", ["Generuj (demo)", "Wgraj CSV"], index=0)
+mode = st.sidebar.radio(
+    "Dane", ["Generuj (demo)", "Wgraj CSV", "Zbiór na dysku (out-of-core)", "Na żywo (strumień)"], index=0
+)
+
+if mode == "Na żywo (strumień)":
+    live_seed = st.sidebar.number_input("Seed strumienia", min_value=0, max_value=9999, value=42, step=1)
+    rows_per_s = st.sidebar.slider("Napływ [wierszy/s]", 100, 50_000, 2_000, step=100)
+    refresh_s = st.sidebar.slider("Odświeżanie co [s]", 1, 30, 3)
+    stream = get_live_stream(int(live_seed))
+
+    st.sidebar.header("Filtry")
+    live_cat = st.sidebar.selectbox("Kategoria", ["ALL"] + stream.cube.categories, index=0)
+    live_city = st.sidebar.selectbox("Miasto", ["ALL"] + stream.cube.cities, index=0)
+    live_flag = st.sidebar.checkbox("Tylko flag=True (np. podejrzane)", value=False)
+    st.sidebar.caption("Na żywo nie ma filtra kwoty - kostka przyrostowa nie ma wymiaru kwoty.")
+
+    # Odświeża się tylko ten fragment; koszt zależy od nowych wierszy, nie od historii
+    @st.fragment(run_every=refresh_s)
+    def live_dashboard() -> None:
+        t_live = time.perf_counter()
+        added = stream.poll(rows_per_s)
+        live_panels = stream.cube.panels(live_cat, live_city, live_flag)
+        live_top = stream.cube.outliers(live_cat, live_city, live_flag)
+        live_ms = 1000 * (time.perf_counter() - t_live)
+        if live_panels is None:
+            st.warning("Po filtrach nie ma danych. Zmień filtry.")
+            return
+        render_panels(
+            live_panels,
+            live_top,
+            caption=(
+                f"Na żywo: +{added:,} nowych wierszy, historia {stream.cube.n_rows:,}, "
+                f"odświeżenie {live_ms:.1f} ms (przyrostowo)"
+            ),
+        )
+
+    live_dashboard()
+    st.stop()
+
 
 if mode == "Wgraj CSV":
     uploaded = st.sidebar.file_uploader("Wgraj plik CSV", type=["csv"])
@@ -64,149 +234,146 @@ if mode == "Wgraj CSV":
         st.info("Wgraj CSV, albo przełącz na tryb generowania danych.")
         st.stop()
 
-    # Prosty odczyt: oczekujemy kolumn minimum: ts, category, amount (city opcjonalnie)
-    df = pd.read_csv(uploaded)
-
-    # Próba konwersji czasu (jeśli jest)
-    if "ts" in df.columns:
-        df["ts"] = pd.to_datetime(df["ts"], errors="coerce")
-        df = df.dropna(subset=["ts"])
-        df["date"] = df["ts"].dt.date
-        df["hour"] = df["ts"].dt.hour
-        df["weekday"] = df["ts"].dt.day_name()
-    else:
-        # Jeśli nie ma czasu, tworzymy sztuczny
-        df["ts"] = pd.date_range("2026-01-01", periods=len(df), freq="min")
-        df["date"] = df["ts"].dt.date
-        df["hour"] = df["ts"].dt.hour
-        df["weekday"] = df["ts"].dt.day_name()
+    # Odczyt partiami z typami z próbki; wynik w cache per skrót zawartości pliku
+    upload_hash, df = load_uploaded_csv(uploaded)
 
     # Bezpieczne minimum
     if "category" not in df.columns or "amount" not in df.columns:
         st.error("CSV musi mieć kolumny: category, amount. (ts opcjonalnie)")
         st.stop()
 
-    if "city" not in df.columns:
-        df["city"] = "N/A"
+    dataset_key = ("csv", upload_hash)
+    ds = None
+
+elif mode == "Zbiór na dysku (out-of-core)":
+    data_dir = st.sidebar.text_input("Katalog zbioru", "observatory_data")
+    ooc_rows = st.sidebar.number_input(
+        "Liczba wierszy", min_value=1_000_000, max_value=50_000_000, value=5_000_000, step=1_000_000
+    )
+    ooc_seed = st.sidebar.number_input("Seed zbioru", min_value=0, max_value=9999, value=42, step=1)
+
+    if st.sidebar.button("Wygeneruj zbiór na dysk"):
+        progress = st.sidebar.progress(0.0, text="Generowanie partycji…")
+        generate_partitioned(data_dir, int(ooc_rows), int(ooc_seed), progress=progress.progress)
+        progress.empty()
+
+    if not (Path(data_dir) / "meta.json").exists():
+        st.info("Brak zbioru w podanym katalogu - wygeneruj go przyciskiem w panelu bocznym.")
+        st.stop()
+
+    # df = None: ramka całego zbioru nie powstaje, wszystko liczymy partiami z ds
+    ds = open_dataset(data_dir)
+    df = None
+    dataset_key = ("ooc",) + ds.stamp
 
 else:
     n_rows = st.sidebar.slider("Liczba wierszy", 50_000, 500_000, 150_000, step=50_000)
     seed = st.sidebar.number_input("Seed", min_value=0, max_value=9999, value=42, step=1)
     df = generate_data(n_rows, seed)
+    dataset_key = ("gen", n_rows, seed)
+    ds = None
 
 st.sidebar.header("Filtry")
 
-categories = ["ALL"] + sorted(df["category"].astype(str).unique().tolist())
-cities = ["ALL"] + sorted(df["city"].astype(str).unique().tolist())
+fidx = get_filter_index(dataset_key, df) if ds is None else get_dataset_index(dataset_key, ds)
+
+categories = ["ALL"] + fidx.values["category"]
+cities = ["ALL"] + fidx.values["city"]
 
 cat = st.sidebar.selectbox("Kategoria", categories, index=0)
 city = st.sidebar.selectbox("Miasto", cities, index=0)
 
-min_amount, max_amount = float(df["amount"].min()), float(df["amount"].max())
+min_amount, max_amount = fidx.amount_min, fidx.amount_max
 amount_range = st.sidebar.slider("Kwota (amount)", min_amount, max_amount, (min_amount, max_amount))
 
 flag_only = st.sidebar.checkbox("Tylko flag=True (np. podejrzane)", value=False)
 
+# Silnik dla agregacji z surowych wierszy (filtr kwoty); pandas = dotychczasowe funkcje.
+# Zbiór na dysku liczy wszystko partiami z memmap - silniki i pula wątków go nie dotyczą.
+engine = st.sidebar.selectbox("Silnik zapytań", available_backends(), index=0, disabled=ds is not None)
+# Panele czytają te same przefiltrowane wiersze - mogą liczyć się jednocześnie na puli wątków
+parallel_panels = st.sidebar.checkbox("Równoległe liczenie paneli", value=False, disabled=ds is not None)
+
 # =========================
 # 4) APLIKACJA FILTRÓW
 # =========================
-f = df.copy()
-
-if cat != "ALL":
-    f = f[f["category"].astype(str) == cat]
-if city != "ALL":
-    f = f[f["city"].astype(str) == city]
-
-f = f[(f["amount"] >= amount_range[0]) & (f["amount"] <= amount_range[1])]
-
-if flag_only:
-    f = f[f["flag"] == True]
+# Gotowe maski z indeksu (AND), bez df.copy() i bez astype(str) przy każdym rerunie.
+# Sesja trzyma tylko numery wierszy (rows); ramka z wierszami powstaje tylko tam, gdzie trzeba.
+if ds is None:
+    rows = fidx.rows(category=cat, city=city, amount_range=amount_range, flag_only=flag_only)
+    n_filtered = len(df) if rows is None else len(rows)
+else:
+    # zbiór na dysku: maska bool (1 bajt na wiersz) zamiast numerów wierszy (8 bajtów)
+    ds_mask = fidx.mask(category=cat, city=city, amount_range=amount_range, flag_only=flag_only)
+    n_filtered = len(ds) if ds_mask is None else int(np.count_nonzero(ds_mask))
 
-if len(f) == 0:
+if n_filtered == 0:
     st.warning("Po filtrach nie ma danych. Zmień filtry.")
     st.stop()
 
 # =========================
 # 5) KPI (NA GÓRZE)
 # =========================
-col1, col2, col3, col4 = st.columns(4)
-
-total = f["amount"].sum()
-avg = f["amount"].mean()
-count = len(f)
-p95 = np.percentile(f["amount"], 95)
-
-col1.metric("Suma", f"{total:,.2f}")
-col2.metric("Średnia", f"{avg:,.2f}")
-col3.metric("Liczba rekordów", f"{count:,}")
-col4.metric("95 percentyl", f"{p95:,.2f}")
-
-st.divider()
-
-# =========================
-# 6) WIDOK: wykresy i tabela
-# =========================
-left, right = st.columns([1.2, 1])
-
-# ---- 6a) Ranking kategorii
-rank = (
-    f.groupby("category", as_index=False)["amount"]
-     .sum()
-     .sort_values("amount", ascending=False)
-)
-
-fig_rank = px.bar(
-    rank,
-    x="category",
-    y="amount",
-    title="Suma kwot per kategoria",
-)
-left.plotly_chart(fig_rank, use_container_width=True)
-
-# ---- 6b) Time series: suma per dzień
-daily = (
-    f.groupby("date", as_index=False)["amount"]
-     .sum()
-     .sort_values("date")
-)
-fig_ts = px.line(
-    daily,
-    x="date",
-    y="amount",
-    title="Suma kwot w czasie (per dzień)",
-)
-right.plotly_chart(fig_ts, use_container_width=True)
-
-# ---- 6c) Heatmap: dzień tygodnia x godzina
-st.subheader("Heatmapa: tydzień × godzina (średnia kwota)")
-pivot = (
-    f.pivot_table(index="weekday", columns="hour", values="amount", aggfunc="mean")
-)
-
-# uporządkuj dni tygodnia (estetyka)
-weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-pivot = pivot.reindex([d for d in weekday_order if d in pivot.index])
-
-fig_heat = px.imshow(
-    pivot,
-    aspect="auto",
-    title="Średnia kwota (amount) w zależności od dnia tygodnia i godziny",
+# Bez filtra kwoty KPI i wykresy pochodzą z kostki (małe tabele zamiast surowych wierszy),
+# z filtrem kwoty liczymy je z przefiltrowanych wierszy.
+pool = get_panel_pool() if parallel_panels else None
+t_panels = time.perf_counter()
+amount_filter_active = tuple(amount_range) != (min_amount, max_amount)
+if ds is not None:
+    # bez filtra kwoty: kostka całego zbioru; z filtrem: kostka tylko z wierszy maski
+    cube = RollupCube.from_dataset(ds, ds_mask) if amount_filter_active else get_dataset_cube(dataset_key, ds)
+    panels = cube.panels(cat, city, flag_only)
+    top = ds.top_amount(ds_mask)
+elif amount_filter_active and engine == "pandas":
+    # KPI, ranking, seria, pivot i outliery z wierszy - po kolei albo na puli wątków
+    sections = compute_sections(FilterIndex.take(df, rows), pool)
+    panels = panels_from_sections(sections)
+    top = sections["outliers"]
+else:
+    # outliery zawsze z wierszy; w trybie równoległym liczą się obok kostki / silnika
+    top_future = pool.submit(top_outliers_rows, df, rows) if pool is not None else None
+    panels = None if amount_filter_active else get_rollup_cube(dataset_key, df).panels(cat, city, flag_only)
+    if panels is None and engine != "pandas":
+        filters = Filters(cat, city, tuple(amount_range), flag_only)
+        panels = backend_panels(get_query_backend(dataset_key, engine, df), filters)
+    if panels is None:
+        panels = compute_panels(FilterIndex.take(df, rows))
+    top = top_future.result() if top_future is not None else top_outliers_rows(df, rows)
+panels_ms = 1000 * (time.perf_counter() - t_panels)
+
+render_panels(
+    panels,
+    top,
+    caption=(
+        f"Filtr → dane wykresów: {panels_ms:.1f} ms "
+        + (
+            f"(partycje z dysku{', kostka z wierszy filtra' if amount_filter_active else ', kostka'})"
+            if ds is not None
+            else f"({f'surowe wiersze, {engine}' if amount_filter_active else 'kostka'}"
+            f"{', równolegle' if parallel_panels else ''})"
+        )
+    ),
 )
-st.plotly_chart(fig_heat, use_container_width=True)
-
-# ---- 6d) Outliery: top 30 transakcji
-st.subheader("🪨 Outliery: największe kwoty")
-top = f.sort_values("amount", ascending=False).head(30)
-st.dataframe(top, use_container_width=True, height=280)
 
 # ---- 6e) Eksport filtrowanych danych
 st.subheader("⬇️ Eksport")
-csv_bytes = f.to_csv(index=False).encode("utf-8")
+export_fmt = st.radio("Format eksportu", available_formats(), horizontal=True)
+export_suffix, export_mime = FORMATS[export_fmt]
+# Plik powstaje dopiero po kliknięciu (callable), partiami, w pliku tymczasowym;
+# Streamlit wysyła go jako jeden obiekt bytes, stąd limit wierszy
+export_too_big = n_filtered > EXPORT_MAX_ROWS
+if export_too_big:
+    st.warning(f"Eksport jest ograniczony do {EXPORT_MAX_ROWS:,} wierszy - zawęź filtry.")
 st.download_button(
-    "Pobierz filtrowane dane (CSV)",
-    data=csv_bytes,
-    file_name="filtered_data.csv",
-    mime="text/csv"
+    f"Pobierz filtrowane dane ({export_fmt})",
+    data=(
+        lambda: export_to_file(df, export_fmt, rows=rows)
+        if ds is None
+        else export_to_file(ds, export_fmt, rows=None if ds_mask is None else np.flatnonzero(ds_mask))
+    ),
+    file_name=f"filtered_data{export_suffix}",
+    mime=export_mime,
+    disabled=export_too_big,
 )
 
 st.caption("Tip: Streamlit jest idealny do szybkich dashboardów demo i aplikacji AI/BI bez pisania frontendu.")
@@ -0,0 +1,100 @@
+"""
+bench_report.py
+
+Wspólny szkielet raportów benchmarków: bench_sections.py i ../format_bench.py.
+
+Oba skrypty zapisują wyniki jako plik JSON porównywalny między uruchomieniami
+i z --baseline oznaczają pomiary wolniejsze niż --threshold:
+    - add_report_args(): --out / --baseline / --threshold,
+    - write_report():    nagłówek (data, wersje bibliotek) + wyniki -> JSON,
+    - compare():         pomiary wolniejsze niż baseline * threshold,
+    - check_baseline():  porównanie z plikiem, wydruk regresji i kod wyjścia 1.
+Wynik to lista słowników; klucz pomiaru (key_fields) i czasy (timings)
+podaje skrypt. Moduł leży w streamlit/, bo ten katalog musi działać
+samodzielnie; skrypty z DZIEN_4 dostają go przez ../bench_report.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLD = 1.25
+
+
+def _seconds(row: dict) -> dict[str, float]:
+    return {"seconds": row["seconds"]}
+
+
+def add_report_args(parser: argparse.ArgumentParser, out: str) -> None:
+    parser.add_argument("--out", default=out)
+    parser.add_argument("--baseline", default=None, help="Poprzedni raport JSON do porównania.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+
+def write_report(path: str | Path, results: list[dict], **extra) -> dict:
+    """Zapisuje raport (nagłówek + extra + results) i go zwraca."""
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        **extra,
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nRaport: {path}")
+    return report
+
+
+def compare(
+    results: list[dict],
+    baseline: list[dict],
+    threshold: float,
+    key_fields: tuple[str, ...],
+    timings: Callable[[dict], dict[str, float]] = _seconds,
+) -> list[dict]:
+    """Pomiary wolniejsze niż baseline * threshold (jeden wpis na operację z timings)."""
+    key = lambda r: tuple(r[k] for k in key_fields)  # noqa: E731
+    base = {key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get(key(r))
+        if b is None:
+            continue
+        old_times = timings(b)
+        for op, new in timings(r).items():
+            old = old_times.get(op)
+            if old and new / old > threshold:
+                regressions.append({**{k: r[k] for k in key_fields}, "op": op, "baseline": old, "seconds": new, "ratio": new / old})
+    return regressions
+
+
+def check_baseline(
+    results: list[dict],
+    baseline_path: str | Path,
+    threshold: float,
+    key_fields: tuple[str, ...],
+    timings: Callable[[dict], dict[str, float]] = _seconds,
+) -> None:
+    """Porównuje z raportem baseline; przy regresjach wypisuje je i kończy z kodem 1."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, threshold, key_fields, timings)
+    if regressions:
+        print(f"\nREGRESJE (wolniej niż x{threshold}):")
+        for r in regressions:
+            label = " ".join(f"{r[k]:>9,}" if isinstance(r[k], int) else f"{r[k]:14s}" for k in key_fields)
+            op = "" if r["op"] == "seconds" else f" {r['op']:9s}"
+            print(
+                f"{label}{op} {1000 * r['baseline']:9.2f} -> {1000 * r['seconds']:9.2f} ms (x{r['ratio']:.2f})"
+            )
+        sys.exit(1)
+    print("Brak regresji względem", baseline_path)
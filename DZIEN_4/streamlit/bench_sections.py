@@ -0,0 +1,160 @@
+"""
+bench_sections.py
+
+Headless pomiar sekcji Data Observatory - bez uruchamiania Streamlit.
+
+Skrypt woła tę samą logikę co app.py (demo_data, FilterIndex, RollupCube,
+funkcje paneli, eksport) dla siatki rozmiarów danych i kombinacji filtrów.
+Dla każdej sekcji zapisuje:
+    - seconds:  mediana czasu z --repeats przebiegów (bez tracemalloc),
+    - peak_mb:  szczyt alokacji w sekcji (tracemalloc, osobny przebieg),
+    - rss_mb:   RSS procesu po sekcji (jeśli jest psutil).
+
+Raport trafia do pliku JSON; z --baseline porównujemy z poprzednim raportem
+i oznaczamy sekcje wolniejsze niż --threshold (domyślnie x1.25) - szkielet
+raportu jest wspólny z ../format_bench.py (bench_report.py).
+
+Uruchomienie:
+    python bench_sections.py --sizes 50000 150000 500000 --out report.json
+    python bench_sections.py --out new.json --baseline report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from typing import Callable
+
+from bench_report import add_report_args, check_baseline, write_report
+from concurrent_panels import compute_sections, make_executor, top_outliers_rows
+from demo_data import generate_demo_data
+from export_stream import export_to_file
+from filter_index import FilterIndex
+from rollup_cube import RollupCube, daily_series, kpis, rank_by_category, weekday_hour_pivot
+
+try:
+    import psutil
+except ImportError:  # RSS jest opcjonalny
+    psutil = None
+
+DEFAULT_SIZES = (50_000, 150_000, 500_000)
+
+# (kategoria, miasto, zakres kwoty jako ułamki [min, max] albo None, tylko flag)
+FILTERS = {
+    "brak": ("ALL", "ALL", None, False),
+    "kategoria": ("food", "ALL", None, False),
+    "kat+miasto+flag": ("fuel", "Kraków", None, True),
+    "kwota": ("ALL", "ALL", (0.0, 0.01), False),
+}
+
+
+def _rss_mb() -> float | None:
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / 1024**2
+
+
+def measure(fn: Callable[[], object], repeats: int) -> tuple[object, float, float]:
+    """Zwraca (wynik, mediana czasu [s], szczyt alokacji [MB])."""
+    times = []
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(times), peak / 1024**2
+
+
+def run_grid(sizes: tuple[int, ...], repeats: int, seed: int = 42) -> list[dict]:
+    rows: list[dict] = []
+
+    def record(n_rows: int, filter_name: str, section: str, seconds: float, peak_mb: float) -> None:
+        rows.append({
+            "n_rows": n_rows,
+            "filter": filter_name,
+            "section": section,
+            "seconds": seconds,
+            "peak_mb": peak_mb,
+            "rss_mb": _rss_mb(),
+        })
+        print(f"{n_rows:>9,} {filter_name:16s} {section:14s} {1000 * seconds:9.2f} ms {peak_mb:9.1f} MB")
+
+    pool = make_executor()
+    for n in sizes:
+        # sekcje liczone raz na zbiór danych
+        df, s, m = measure(lambda: generate_demo_data(n, seed), 1)
+        record(n, "-", "generation", s, m)
+        fidx, s, m = measure(lambda: FilterIndex(df), 1)
+        record(n, "-", "filter_index", s, m)
+        cube, s, m = measure(lambda: RollupCube(df), 1)
+        record(n, "-", "rollup_cube", s, m)
+
+        lo_all, hi_all = fidx.amount_min, fidx.amount_max
+        for name, (cat, city, amount_frac, flag_only) in FILTERS.items():
+            amount_range = None
+            if amount_frac is not None:
+                span = hi_all - lo_all
+                amount_range = (lo_all + amount_frac[0] * span, lo_all + amount_frac[1] * span)
+
+            f, s, m = measure(lambda: FilterIndex.apply(df, fidx.mask(cat, city, amount_range, flag_only)), repeats)
+            record(n, name, "filtering", s, m)
+            if len(f) == 0:
+                continue
+
+            for section, fn in (
+                ("kpis", lambda: kpis(f)),
+                ("rank", lambda: rank_by_category(f)),
+                ("daily", lambda: daily_series(f)),
+                ("pivot", lambda: weekday_hour_pivot(f)),
+            ):
+                _, s, m = measure(fn, repeats)
+                record(n, name, section, s, m)
+
+            if amount_range is None:
+                _, s, m = measure(lambda: cube.panels(cat, city, flag_only), repeats)
+                record(n, name, "cube_panels", s, m)
+
+            # outliery jak w app.py: z numerów wierszy, bez sortowania przefiltrowanej ramki
+            selected = fidx.rows(cat, city, amount_range, flag_only)
+            _, s, m = measure(lambda: top_outliers_rows(df, selected), repeats)
+            record(n, name, "outliers", s, m)
+
+            # wszystkie panele z wierszy naraz: po kolei vs pula wątków (concurrent_panels)
+            _, s, m = measure(lambda: compute_sections(f), repeats)
+            record(n, name, "sections_seq", s, m)
+            _, s, m = measure(lambda: compute_sections(f, pool, min_rows=0), repeats)
+            record(n, name, "sections_pool", s, m)
+
+            def export() -> None:
+                export_to_file(f, "CSV").close()
+
+            _, s, m = measure(export, 1)
+            record(n, name, "export", s, m)
+
+    pool.shutdown()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pomiar sekcji Data Observatory (bez Streamlit).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeats", type=int, default=3)
+    add_report_args(parser, out="bench_sections_report.json")
+    args = parser.parse_args()
+
+    rows = run_grid(tuple(args.sizes), args.repeats)
+    write_report(args.out, rows, repeats=args.repeats)
+
+    if args.baseline:
+        check_baseline(rows, args.baseline, args.threshold, ("n_rows", "filter", "section"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+concurrent_panels.py
+
+Równoległe liczenie niezależnych paneli Data Observatory na puli wątków.
+
+KPI, ranking kategorii, seria dzienna, pivot (weekday x hour) i top-30
+outlierów tylko CZYTAJĄ tę samą przefiltrowaną ramkę, więc mogą liczyć się
+jednocześnie. Wątki (a nie procesy), bo:
+    - nie kopiujemy ramki do innych procesów,
+    - jądra NumPy/pandas (sortowanie, sumy, groupby na kodach) w dużej części
+      zwalniają GIL, więc wątki realnie pracują równolegle.
+Kolejność rysowania się nie zmienia: compute_sections() zwraca wyniki
+w kolejności SECTIONS, niezależnie od tego, który wątek skończył pierwszy.
+
+Pomiar (sekwencyjnie vs pula wątków, ten sam zestaw paneli):
+    python concurrent_panels.py [n_rows] [workers]
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from rollup_cube import Panels, daily_series, kpis, rank_by_category, weekday_hour_pivot
+
+TOP_N = 30
+# poniżej tej liczby wierszy narzut puli jest większy niż zysk - liczymy po kolei
+MIN_PARALLEL_ROWS = 50_000
+
+
+def top_outliers(f: pd.DataFrame, n: int = TOP_N) -> pd.DataFrame:
+    return f.sort_values("amount", ascending=False).head(n)
+
+
+def top_outliers_rows(df: pd.DataFrame, rows: np.ndarray | None, n: int = TOP_N) -> pd.DataFrame:
+    """Jak top_outliers, ale z numerów wierszy - kopiujemy tylko n wynikowych wierszy."""
+    amount = df["amount"].to_numpy(dtype=np.float64)
+    if rows is not None:
+        amount = amount[rows]
+    key = np.where(np.isnan(amount), np.inf, -amount)  # malejąco, NaN na końcu jak w sort_values
+    k = min(n, len(key))
+    top = np.argpartition(key, k - 1)[:k] if 0 < k < len(key) else np.arange(k)
+    top = top[np.argsort(key[top], kind="stable")]
+    return df.take(top if rows is None else rows[top])
+
+
+# nazwa sekcji -> funkcja(f); kolejność = kolejność rysowania w app.py
+SECTIONS: dict[str, Callable[[pd.DataFrame], object]] = {
+    "kpis": kpis,
+    "rank": rank_by_category,
+    "daily": daily_series,
+    "pivot": weekday_hour_pivot,
+    "outliers": top_outliers,
+}
+
+
+def default_workers() -> int:
+    return min(len(SECTIONS), os.cpu_count() or 1)
+
+
+def make_executor(workers: int | None = None) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers or default_workers(), thread_name_prefix="panels")
+
+
+def compute_sections(
+    f: pd.DataFrame,
+    executor: Executor | None = None,
+    sections: tuple[str, ...] = tuple(SECTIONS),
+    min_rows: int = MIN_PARALLEL_ROWS,
+) -> dict[str, object]:
+    """
+    Wyniki wybranych sekcji (słownik w kolejności `sections`).
+    executor=None albo mniej niż min_rows wierszy -> po kolei w bieżącym wątku.
+    """
+    if executor is None or len(f) < min_rows:
+        return {name: SECTIONS[name](f) for name in sections}
+    futures = {name: executor.submit(SECTIONS[name], f) for name in sections}
+    # odbiór w stałej kolejności; wyjątek z sekcji jest zgłaszany tutaj
+    return {name: fut.result() for name, fut in futures.items()}
+
+
+def panels_from_sections(results: dict[str, object]) -> Panels:
+    total, avg, count, p95 = results["kpis"]
+    return Panels(
+        total=total,
+        avg=avg,
+        count=count,
+        p95=p95,
+        rank=results["rank"],
+        daily=results["daily"],
+        pivot=results["pivot"],
+    )
+
+
+def _benchmark(n_rows: int, workers: int, repeats: int = 5) -> None:
+    from demo_data import generate_demo_data
+    from filter_index import FilterIndex
+
+    df = generate_demo_data(n_rows, 42)
+    fidx = FilterIndex(df)
+    scenarios = {
+        "brak filtrów": ("ALL", "ALL", False),
+        "food": ("food", "ALL", False),
+        "fuel+Kraków+flag": ("fuel", "Kraków", True),
+    }
+
+    print(f"Dane: {n_rows:,} wierszy, CPU: {os.cpu_count()}, wątki: {workers}")
+    with make_executor(workers) as pool:
+        for name, (cat, city, flag_only) in scenarios.items():
+            f = FilterIndex.apply(df, fidx.mask(cat, city, None, flag_only))
+            timings = {}
+            for label, executor in (("sekwencyjnie", None), ("pula wątków", pool)):
+                times = []
+                for _ in range(repeats):
+                    t0 = time.perf_counter()
+                    compute_sections(f, executor, min_rows=0)
+                    times.append(time.perf_counter() - t0)
+                timings[label] = statistics.median(times)
+            seq, par = timings["sekwencyjnie"], timings["pula wątków"]
+            print(
+                f"{name:18s} {len(f):>9,} wierszy  sekwencyjnie {1000 * seq:8.1f} ms  "
+                f"pula {1000 * par:8.1f} ms  zysk x{seq / par:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else default_workers()
+    _benchmark(rows, n_workers)
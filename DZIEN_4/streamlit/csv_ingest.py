@@ -0,0 +1,149 @@
+"""
+csv_ingest.py
+
+Wczytywanie dużych plików CSV do Data Observatory - partiami (chunkami).
+
+Zamiast jednego pd.read_csv(uploaded) z domyślnymi typami i pd.to_datetime
+na całej kolumnie:
+    1) z próbki (pierwsze SAMPLE_ROWS wierszy) ustalamy typy kolumn:
+       amount -> float64, liczby zostają liczbami, tekst o małej liczbie
+       różnych wartości -> category (dużo mniej pamięci niż object),
+    2) z tej samej próbki wykrywamy format daty w kolumnie ts
+       (parsowanie ze znanym formatem jest wielokrotnie szybsze od zgadywania),
+    3) czytamy plik po CHUNK_ROWS wierszy: konwersja ts i kolumny pochodne
+       (date, hour, weekday) liczone od razu na każdej partii,
+    4) raportujemy postęp (ułamek przeczytanych bajtów) przez callback,
+    5) po złożeniu partii typy zmniejsza optimize_dtypes (dtype_optimizer.py)
+       (np. int64 -> int32) - dopiero na całej ramce, bo próbka nie zna
+       min/max reszty pliku. Bez float32 i bez zmian w KEEP_DTYPES: amount
+       zostaje float64 (KPI liczone na float32 różniłyby się od trybu demo).
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import BinaryIO, Callable
+
+import pandas as pd
+
+from dtype_optimizer import optimize_dtypes
+
+SAMPLE_ROWS = 10_000
+CHUNK_ROWS = 250_000
+# kolumna tekstowa staje się category, jeśli unikalnych wartości jest mniej niż ten ułamek próbki
+CATEGORY_MAX_RATIO = 0.5
+# kolumny, których typu optimize_dtypes nie zmienia
+KEEP_DTYPES = ("amount", "ts")
+# kolumny pochodne ts (jak w trybie demo)
+TIME_COLUMNS = ("date", "hour", "weekday")
+
+DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y",
+)
+
+
+def file_hash(buffer: BinaryIO, block_size: int = 8 * 1024 * 1024) -> str:
+    """Skrót zawartości pliku (klucz cache) - liczony blokami."""
+    h = hashlib.blake2b(digest_size=20)
+    buffer.seek(0)
+    while block := buffer.read(block_size):
+        h.update(block)
+    buffer.seek(0)
+    return h.hexdigest()
+
+
+def infer_dtypes(sample: pd.DataFrame) -> dict[str, str]:
+    """Typy kolumn dla read_csv na podstawie próbki."""
+    dtypes: dict[str, str] = {}
+    for col in sample.columns:
+        s = sample[col]
+        if col in TIME_COLUMNS and "ts" in sample.columns:
+            continue  # i tak liczone od nowa z ts (_add_time_columns), np. w eksporcie z aplikacji
+        if col == "ts":
+            dtypes[col] = "object"  # parsujemy sami, ze znanym formatem
+        elif col == "amount" or pd.api.types.is_float_dtype(s):
+            dtypes[col] = "float64"
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_integer_dtype(s):
+            continue  # zostawiamy inferencję read_csv (brakujące wartości w dalszej części pliku)
+        elif s.nunique(dropna=True) <= max(1, CATEGORY_MAX_RATIO * len(s)):
+            dtypes[col] = "category"
+    return dtypes
+
+
+def detect_datetime_format(values: pd.Series) -> str | None:
+    """Pierwszy format z DATETIME_FORMATS, który parsuje wszystkie niepuste wartości próbki."""
+    values = values.dropna().astype(str)
+    if values.empty:
+        return None
+    for fmt in DATETIME_FORMATS:
+        try:
+            pd.to_datetime(values, format=fmt, errors="raise")
+        except (ValueError, TypeError):
+            continue
+        return fmt
+    return None
+
+
+def _add_time_columns(chunk: pd.DataFrame, fmt: str | None) -> pd.DataFrame:
+    chunk["ts"] = pd.to_datetime(chunk["ts"], format=fmt, errors="coerce")
+    chunk = chunk.dropna(subset=["ts"])
+    chunk["date"] = chunk["ts"].dt.date
+    chunk["hour"] = chunk["ts"].dt.hour
+    chunk["weekday"] = chunk["ts"].dt.day_name()
+    return chunk
+
+
+def read_csv_chunked(
+    buffer: BinaryIO,
+    total_bytes: int | None = None,
+    progress: Callable[[float], None] | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> pd.DataFrame:
+    """
+    Wczytuje CSV partiami. Zwraca ramkę z kolumnami jak w trybie demo
+    (ts, date, hour, weekday + kolumny z pliku).
+    """
+    buffer.seek(0)
+    sample = pd.read_csv(buffer, nrows=SAMPLE_ROWS)
+    dtypes = infer_dtypes(sample)
+    fmt = detect_datetime_format(sample["ts"]) if "ts" in sample.columns else None
+    has_ts = "ts" in sample.columns
+
+    buffer.seek(0)
+    chunks: list[pd.DataFrame] = []
+    for chunk in pd.read_csv(buffer, dtype=dtypes, chunksize=chunk_rows):
+        if has_ts:
+            chunk = _add_time_columns(chunk, fmt)
+        chunks.append(chunk)
+        if progress and total_bytes:
+            progress(min(1.0, buffer.tell() / total_bytes))
+
+    if not chunks:
+        df = sample.iloc[0:0]
+    else:
+        # category: wspólny zestaw kategorii, żeby concat nie zamienił kolumny z powrotem na object
+        for col, dtype in dtypes.items():
+            # kolumny nadpisane po drodze (np. przez _add_time_columns) nie są już category
+            if dtype == "category" and all(isinstance(c[col].dtype, pd.CategoricalDtype) for c in chunks):
+                union = pd.api.types.union_categoricals([c[col] for c in chunks]).categories
+                for c in chunks:
+                    c[col] = c[col].cat.set_categories(union)
+        df, _changes = optimize_dtypes(pd.concat(chunks), CATEGORY_MAX_RATIO, allow_float32=False, skip=KEEP_DTYPES)
+
+    if not has_ts:
+        # Jeśli nie ma czasu, tworzymy sztuczny
+        df["ts"] = pd.date_range("2026-01-01", periods=len(df), freq="min")
+        df["date"] = df["ts"].dt.date
+        df["hour"] = df["ts"].dt.hour
+        df["weekday"] = df["ts"].dt.day_name()
+
+    if progress:
+        progress(1.0)
+    return df
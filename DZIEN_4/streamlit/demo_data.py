@@ -0,0 +1,41 @@
+"""
+demo_data.py
+
+Generowanie danych demo dla Data Observatory (bez zależności od Streamlit),
+żeby tę samą logikę mogły wołać app.py (z cache) i skrypty pomiarowe.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def generate_demo_data(n_rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    categories = np.array(["food", "fuel", "books", "tools", "travel", "other"])
+    cities = np.array(["Warszawa", "Kraków", "Gdańsk", "Wrocław", "Poznań"])
+
+    # Oś czasu (minuty)
+    ts = pd.date_range("2026-01-01", periods=n_rows, freq="min")
+
+    df = pd.DataFrame({
+        "id": np.arange(1, n_rows + 1, dtype=np.int64),
+        "ts": ts,
+        "category": rng.choice(categories, size=n_rows),
+        "city": rng.choice(cities, size=n_rows),
+        "amount": rng.lognormal(mean=3.1, sigma=0.8, size=n_rows).round(2),
+        "flag": (rng.random(n_rows) < 0.07),
+    })
+
+    # Dodatkowe kolumny do analityki
+    df["date"] = df["ts"].dt.date
+    df["hour"] = df["ts"].dt.hour
+    df["weekday"] = df["ts"].dt.day_name()
+
+    # Lekka „anomalizacja” (żeby były outliery, a dashboard wyglądał ciekawiej)
+    bump_idx = rng.choice(n_rows, size=max(10, n_rows // 5000), replace=False)
+    df.loc[bump_idx, "amount"] = (df.loc[bump_idx, "amount"] * rng.uniform(8, 20, size=len(bump_idx))).round(2)
+
+    return df
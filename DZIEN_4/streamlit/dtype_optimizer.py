@@ -0,0 +1,187 @@
+"""
+dtype_optimizer.py
+
+Automatyczne zmniejszanie typów kolumn (downcasting) z raportem oszczędności.
+
+genpandas zamienia na category tylko jedną kolumnę, ręcznie. Ramki z
+read_csv / read_json mają wszędzie int64 / float64 / object. optimize_dtypes()
+ogląda każdą kolumnę i zmienia typ tylko wtedy, gdy wartości się nie zmienią:
+    - liczby całkowite     -> najmniejszy int / uint, który mieści min i max
+                              (nullable Int* dla kolumn z brakami),
+    - float z samymi całkowitymi wartościami -> jak wyżej,
+    - float                -> float32, jeśli po konwersji wartości są takie same
+                              z dokładnością do liczby miejsc po przecinku,
+                              z jaką są zapisane (np. kwoty z groszami), a dla
+                              wartości "ciągłych" tylko wtedy, gdy float32 ->
+                              float64 oddaje dokładnie te same liczby,
+    - object z True/False i brakami -> nullable "boolean",
+    - tekst o małej liczbie różnych wartości -> category
+                              (nunique <= CATEGORY_MAX_RATIO * liczba wierszy).
+Daty, bool, category, kolumny z `skip` i kolumny, których nie da się
+bezpiecznie zmniejszyć, zostają bez zmian.
+
+Używają go loadery: wczytywanie uploadu w csv_ingest.py i odczyt zwrotny
+w ../genpandas.py (read_csv_optimized). Moduł leży w streamlit/, bo ten
+katalog musi działać samodzielnie; skrypty z DZIEN_4 dostają go przez
+../dtype_optimizer.py (tam też uruchomienie z linii poleceń).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_MAX_RATIO = 0.5
+MAX_DECIMALS = 6
+
+_INT_TYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32, np.int64]
+_NULLABLE = {np.int8: "Int8", np.uint8: "UInt8", np.int16: "Int16", np.uint16: "UInt16",
+             np.int32: "Int32", np.uint32: "UInt32", np.int64: "Int64"}
+
+
+@dataclass
+class ColumnChange:
+    column: str
+    before: str
+    after: str
+    before_bytes: int
+    after_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.before_bytes - self.after_bytes
+
+
+def smallest_int_type(lo: int, hi: int) -> type:
+    for t in _INT_TYPES:
+        info = np.iinfo(t)
+        if info.min <= lo and hi <= info.max:
+            return t
+    return np.int64
+
+
+def _decimals(values: np.ndarray) -> int | None:
+    """Najmniejsza liczba miejsc po przecinku, z jaką zapisano wartości (None = "ciągłe")."""
+    values = values[np.isfinite(values)]  # ±inf nie ma miejsc po przecinku
+    scale = np.maximum(np.abs(values), 1.0)
+    for d in range(MAX_DECIMALS + 1):
+        if np.all(np.abs(np.round(values, d) - values) <= 1e-9 * scale):
+            return d
+    return None
+
+
+def _float32_safe(values: np.ndarray) -> bool:
+    """values bez NaN."""
+    as32 = values.astype(np.float32).astype(np.float64)
+    if not np.all(np.isfinite(as32) == np.isfinite(values)):
+        return False  # przepełnienie float32
+    d = _decimals(values)
+    if d is not None:
+        return bool(np.array_equal(np.round(as32, d), values))
+    # błąd względny float32 (~6e-8) zmieściłby się w każdej rozsądnej tolerancji,
+    # więc bez skali dziesiętnej wymagamy dokładnego powrotu
+    return bool(np.array_equal(as32, values))
+
+
+def _int_target(values: np.ndarray, has_na: bool) -> str | type:
+    t = smallest_int_type(int(values.min()), int(values.max())) if values.size else np.int8
+    return _NULLABLE[t] if has_na else t
+
+
+def suggest_dtype(s: pd.Series, category_max_ratio: float = CATEGORY_MAX_RATIO, allow_float32: bool = True):
+    """Docelowy typ kolumny albo None (bez zmian)."""
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype) \
+            or pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+        return None
+
+    if pd.api.types.is_integer_dtype(dtype):
+        na = s.isna()
+        values = s[~na].to_numpy(dtype=np.int64)
+        target = _int_target(values, bool(na.any()))
+        return None if pd.api.types.pandas_dtype(target) == dtype else target
+
+    if pd.api.types.is_float_dtype(dtype):
+        values = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = values[~np.isnan(values)]
+        if finite.size and np.all(np.isfinite(finite)) and np.all(finite == np.round(finite)) \
+                and np.abs(finite).max() < 2**63:
+            return _int_target(finite.astype(np.int64), finite.size < values.size)
+        if allow_float32 and dtype != np.float32 and finite.size and _float32_safe(finite):
+            return np.float32
+        return None
+
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        non_null = s.dropna()
+        if non_null.empty:
+            return None
+        kind = pd.api.types.infer_dtype(non_null, skipna=True)
+        if kind == "boolean":
+            return "boolean"
+        if kind == "string" and non_null.nunique() <= max(1, category_max_ratio * len(s)):
+            return "category"
+    return None
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    category_max_ratio: float = CATEGORY_MAX_RATIO,
+    allow_float32: bool = True,
+    skip: Iterable[str] = (),
+) -> tuple[pd.DataFrame, list[ColumnChange]]:
+    """Nowa ramka ze zmniejszonymi typami + lista zmian (tylko zmienione kolumny)."""
+    skip = set(skip)
+    out = {}
+    changes: list[ColumnChange] = []
+    for name in df.columns:
+        s = df[name]
+        target = None if name in skip else suggest_dtype(s, category_max_ratio, allow_float32)
+        if target is None:
+            out[name] = s
+            continue
+        new = s.astype(target)
+        before, after = int(s.memory_usage(deep=True, index=False)), int(new.memory_usage(deep=True, index=False))
+        if after >= before:
+            out[name] = s
+            continue
+        out[name] = new
+        changes.append(ColumnChange(str(name), str(s.dtype), str(new.dtype), before, after))
+    return pd.DataFrame(out, index=df.index), changes
+
+
+def format_report(
+    changes: list[ColumnChange],
+    df_before: pd.DataFrame | None = None,
+    after_bytes: int | None = None,
+) -> str:
+    """
+    Tabela zmian. Rozmiar całej ramki "przed" z df_before albo, gdy jej już
+    nie ma, z after_bytes (rozmiar po optymalizacji) + zaoszczędzone bajty.
+    """
+    mb = 1024**2
+    lines = [f"{'kolumna':12s} {'przed':>10s} {'po':>10s} {'MB przed':>9s} {'MB po':>8s} {'oszczędność':>12s}"]
+    for c in changes:
+        lines.append(
+            f"{c.column:12s} {c.before:>10s} {c.after:>10s} {c.before_bytes / mb:9.2f} {c.after_bytes / mb:8.2f} "
+            f"{c.saved_bytes / mb:8.2f} MB"
+        )
+    saved = sum(c.saved_bytes for c in changes)
+    total = f"Razem zaoszczędzono {saved / mb:.2f} MB"
+    before = None
+    if df_before is not None:
+        before = df_before.memory_usage(deep=True).sum()
+    elif after_bytes is not None:
+        before = after_bytes + saved
+    if before:
+        total += f" z {before / mb:.2f} MB ({100 * saved / before:.0f}%)"
+    lines.append(total)
+    return "\n".join(lines)
+
+
+def read_csv_optimized(path, **read_csv_kwargs) -> tuple[pd.DataFrame, list[ColumnChange]]:
+    """pd.read_csv + optimize_dtypes."""
+    return optimize_dtypes(pd.read_csv(path, **read_csv_kwargs))
+
@@ -0,0 +1,141 @@
+"""
+export_stream.py
+
+Strumieniowy eksport przefiltrowanych danych do pliku tymczasowego.
+
+f.to_csv(index=False).encode("utf-8") buduje cały tekst CSV, a potem
+drugą kopię jako bytes - dla dużych ramek to kilka razy więcej pamięci
+niż same dane. Tutaj zapisujemy ramkę partiami (CHUNK_ROWS wierszy)
+do pliku tymczasowego i oddajemy widżetowi otwarty plik:
+    - CSV:     nagłówek raz, potem kolejne partie dopisywane do pliku,
+    - Parquet: każda partia to osobna grupa wierszy (row group) - wymaga pyarrow.
+
+Uwaga: st.download_button czyta otwarty plik w całości do jednego obiektu
+bytes, więc szczyt pamięci to nadal ok. 1x rozmiar eksportu (zamiast 2-3x
+przy to_csv().encode()) - pamięć NIE jest ograniczona partią. Dlatego
+eksport ma limit EXPORT_MAX_ROWS wierszy; większe wybory trzeba zawęzić
+filtrami (albo eksportować poza aplikacją, np. chunked_export.py).
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from ooc_data import LazyDataset
+
+CHUNK_ROWS = 100_000
+EXPORT_DIR = Path(tempfile.gettempdir()) / "observatory_exports"
+MAX_AGE_S = 3600
+# ok. 150-200 MB CSV dla danych demo - tyle Streamlit trzyma w pamięci na jedno pobranie
+EXPORT_MAX_ROWS = 2_000_000
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats() -> list[str]:
+    return [name for name in FORMATS if name != "Parquet" or PARQUET_AVAILABLE]
+
+
+def export_rows(df: pd.DataFrame | LazyDataset, rows: np.ndarray | None = None) -> int:
+    return len(df) if rows is None else len(rows)
+
+
+def iter_chunks(
+    df: pd.DataFrame | LazyDataset, rows: np.ndarray | None = None, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Kolejne partie ramki; z rows (numery wierszy po filtrze) kopiujemy tylko bieżącą partię.
+    Zbiór na dysku (LazyDataset) daje ramkę tylko dla bieżącej partii (to_frame).
+    """
+    n = export_rows(df, rows)
+    lazy = not isinstance(df, pd.DataFrame)
+    for start in range(0, max(n, 1), chunk_rows):
+        part = slice(start, min(start + chunk_rows, n)) if rows is None else rows[start:start + chunk_rows]
+        if lazy:
+            yield df.to_frame(part)
+        elif rows is None:
+            yield df.iloc[part]
+        else:
+            yield df.take(part)
+
+
+def write_csv_chunked(
+    df: pd.DataFrame | LazyDataset, path: Path, chunk_rows: int = CHUNK_ROWS, rows: np.ndarray | None = None
+) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        for i, chunk in enumerate(iter_chunks(df, rows, chunk_rows)):
+            chunk.to_csv(out, index=False, header=(i == 0))
+
+
+def write_parquet_chunked(
+    df: pd.DataFrame | LazyDataset, path: Path, chunk_rows: int = CHUNK_ROWS, rows: np.ndarray | None = None
+) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in iter_chunks(df, rows, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _cleanup_old_exports() -> None:
+    now = time.time()
+    for p in EXPORT_DIR.glob("export-*"):
+        try:
+            if now - p.stat().st_mtime > MAX_AGE_S:
+                p.unlink()
+        except OSError:
+            pass
+
+
+def export_to_file(df: pd.DataFrame | LazyDataset, fmt: str = "CSV", rows: np.ndarray | None = None) -> BinaryIO:
+    """
+    Zapisuje ramkę (albo jej wiersze `rows`) partiami do pliku tymczasowego
+    i zwraca go otwartego do odczytu.
+    Na systemach, które na to pozwalają, plik jest od razu usuwany z katalogu
+    (znika po zamknięciu); pozostałe sprzątamy po MAX_AGE_S.
+    Więcej niż EXPORT_MAX_ROWS wierszy -> ValueError (patrz opis modułu).
+    """
+    n_rows = export_rows(df, rows)
+    if n_rows > EXPORT_MAX_ROWS:
+        raise ValueError(f"Eksport {n_rows:,} wierszy przekracza limit {EXPORT_MAX_ROWS:,}.")
+    suffix, _mime = FORMATS[fmt]
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    _cleanup_old_exports()
+
+    fd, name = tempfile.mkstemp(prefix="export-", suffix=suffix, dir=EXPORT_DIR)
+    os.close(fd)
+    path = Path(name)
+
+    if fmt == "Parquet":
+        write_parquet_chunked(df, path, rows=rows)
+    else:
+        write_csv_chunked(df, path, rows=rows)
+
+    handle = open(path, "rb")
+    try:
+        path.unlink()
+    except OSError:
+        pass  # np. Windows - plik otwarty, posprząta _cleanup_old_exports()
+    return handle
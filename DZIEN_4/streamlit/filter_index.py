@@ -0,0 +1,192 @@
+"""
+filter_index.py
+
+Indeks filtrów dla Data Observatory - budowany RAZ na zbiór danych.
+
+Wcześniej każda zmiana widżetu robiła df.copy() i porównywała kolumny
+.astype(str) z wybraną wartością - pełna materializacja stringów dla
+setek tysięcy wierszy przy każdym rerunie.
+
+Teraz:
+    - category / city -> kody kategoryczne + gotowa maska bool dla każdej wartości
+    - flag            -> gotowa maska bool
+    - amount          -> posortowane wartości + permutacja wierszy (searchsorted)
+Filtrowanie to AND kilku gotowych masek, a ramka wynikowa powstaje jednym
+df.take() tylko z wybranych wierszy (bez kopii całej ramki; bez filtrów
+zwracamy po prostu df).
+
+PartitionedFilterIndex to odpowiednik dla zbioru na dysku (ooc_data.LazyDataset):
+masek na wartość ani permutacji amount nie trzymamy (przy 50 mln wierszy to
+ponad 1 GB), tylko maskę wyniku liczymy partiami wprost z kodów uint8
+i kolumny amount w memmap.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from ooc_data import LazyDataset
+
+CATEGORICAL_COLUMNS = ("category", "city")
+
+
+class FilterIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+
+        # wartość -> maska bool (porównanie z astype(str) jak w dotychczasowych filtrach)
+        self.values: dict[str, list[str]] = {}
+        self.masks: dict[str, dict[str, np.ndarray]] = {}
+        for col in CATEGORICAL_COLUMNS:
+            cat = pd.Categorical(df[col].astype(str))
+            codes = cat.codes
+            self.values[col] = sorted(cat.categories.tolist())
+            self.masks[col] = {str(v): codes == k for k, v in enumerate(cat.categories)}
+
+        if "flag" in df.columns:
+            self.flag_mask = (df["flag"] == True).to_numpy(dtype=bool)  # noqa: E712 - jak w filtrze app.py
+        else:
+            self.flag_mask = np.zeros(self.n_rows, dtype=bool)
+
+        # amount: NaN na końcu sortowania, więc zakres [min, max] ich nie obejmie
+        amount = df["amount"].to_numpy(dtype=np.float64)
+        self.amount_order = np.argsort(amount, kind="stable")
+        self.amount_sorted = amount[self.amount_order]
+        self.n_amount = int(np.count_nonzero(~np.isnan(amount)))
+
+    @property
+    def amount_min(self) -> float:
+        return float(self.amount_sorted[0])
+
+    @property
+    def amount_max(self) -> float:
+        return float(self.amount_sorted[self.n_amount - 1])
+
+    def amount_mask(self, low: float, high: float) -> np.ndarray | None:
+        """Maska low <= amount <= high (None = wszystkie wiersze spełniają warunek)."""
+        lo = int(np.searchsorted(self.amount_sorted[:self.n_amount], low, side="left"))
+        hi = int(np.searchsorted(self.amount_sorted[:self.n_amount], high, side="right"))
+        if lo == 0 and hi == self.n_rows:
+            return None
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.amount_order[lo:hi]] = True
+        return mask
+
+    def mask(
+        self,
+        category: str = "ALL",
+        city: str = "ALL",
+        amount_range: tuple[float, float] | None = None,
+        flag_only: bool = False,
+    ) -> np.ndarray | None:
+        """AND gotowych masek. None = brak aktywnych filtrów (wszystkie wiersze)."""
+        parts: list[np.ndarray] = []
+        empty = np.zeros(self.n_rows, dtype=bool)
+
+        if category != "ALL":
+            parts.append(self.masks["category"].get(category, empty))
+        if city != "ALL":
+            parts.append(self.masks["city"].get(city, empty))
+        if amount_range is not None:
+            m = self.amount_mask(*amount_range)
+            if m is not None:
+                parts.append(m)
+        if flag_only:
+            parts.append(self.flag_mask)
+
+        if not parts:
+            return None
+        result = parts[0].copy()
+        for m in parts[1:]:
+            np.logical_and(result, m, out=result)
+        return result
+
+    def rows(
+        self,
+        category: str = "ALL",
+        city: str = "ALL",
+        amount_range: tuple[float, float] | None = None,
+        flag_only: bool = False,
+    ) -> np.ndarray | None:
+        """Numery wierszy spełniających filtry (None = wszystkie) - zamiast kopii ramki."""
+        mask = self.mask(category, city, amount_range, flag_only)
+        return None if mask is None else np.flatnonzero(mask)
+
+    @staticmethod
+    def take(df: pd.DataFrame, rows: np.ndarray | None) -> pd.DataFrame:
+        """Ramka z wybranych wierszy (df bez kopii, gdy rows=None)."""
+        return df if rows is None else df.take(rows)
+
+    @staticmethod
+    def apply(df: pd.DataFrame, mask: np.ndarray | None) -> pd.DataFrame:
+        """Wiersze spełniające maskę (df bez kopii, gdy nie ma filtrów)."""
+        if mask is None:
+            return df
+        return df.take(np.flatnonzero(mask))
+
+
+class PartitionedFilterIndex:
+    """Filtry jak w FilterIndex dla LazyDataset - partiami z memmap, bez ramki zbioru."""
+
+    def __init__(self, ds: LazyDataset):
+        self.ds = ds
+        self.n_rows = len(ds)
+        self.labels = {"category": ds.meta["categories"], "city": ds.meta["cities"]}
+        self.values = {col: sorted(labels) for col, labels in self.labels.items()}
+
+        amount = ds.columns["amount"]
+        lows, highs = [], []
+        for part in ds.partitions():
+            a = amount[part]
+            a = a[~np.isnan(a)]
+            if a.size:
+                lows.append(a.min())
+                highs.append(a.max())
+        self.amount_min = float(min(lows)) if lows else float("nan")
+        self.amount_max = float(max(highs)) if highs else float("nan")
+
+    def mask(
+        self,
+        category: str = "ALL",
+        city: str = "ALL",
+        amount_range: tuple[float, float] | None = None,
+        flag_only: bool = False,
+    ) -> np.ndarray | None:
+        """Maska bool (1 bajt na wiersz) albo None = brak aktywnych filtrów."""
+        codes: dict[str, int] = {}
+        for col, value in (("category", category), ("city", city)):
+            if value != "ALL":
+                if value not in self.labels[col]:
+                    return np.zeros(self.n_rows, dtype=bool)
+                codes[col] = self.labels[col].index(value)
+        if amount_range is not None and amount_range[0] <= self.amount_min and amount_range[1] >= self.amount_max:
+            amount_range = None
+        if not codes and amount_range is None and not flag_only:
+            return None
+
+        c = self.ds.columns
+        result = np.ones(self.n_rows, dtype=bool)
+        for part in self.ds.partitions():
+            m = result[part]
+            for col, code in codes.items():
+                m &= c[col][part] == code
+            if amount_range is not None:
+                a = c["amount"][part]
+                m &= (a >= amount_range[0]) & (a <= amount_range[1])
+            if flag_only:
+                m &= c["flag"][part]
+        return result
+
+    def rows(
+        self,
+        category: str = "ALL",
+        city: str = "ALL",
+        amount_range: tuple[float, float] | None = None,
+        flag_only: bool = False,
+    ) -> np.ndarray | None:
+        mask = self.mask(category, city, amount_range, flag_only)
+        return None if mask is None else np.flatnonzero(mask)
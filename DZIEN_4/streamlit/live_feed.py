@@ -0,0 +1,303 @@
+"""
+live_feed.py
+
+Tryb "na żywo" dla Data Observatory: dashboard śledzi rosnący strumień
+transakcji (nowe wiersze co kilka sekund).
+
+Liczenie total / avg / p95 / rankingu / serii dziennej / pivota od zera przy
+każdym odświeżeniu kosztuje tyle, ile ma cała historia. LiveCube trzyma
+wyłącznie stan, który da się aktualizować przyrostowo:
+    - sumy i liczniki w gęstych tablicach NumPy
+        daily: (dzień, category, city, flag)
+        heat:  (weekday, hour, category, city, flag)
+      nowa partia to np.add.at tylko dla jej wierszy,
+    - histogram kwot per (category, city, flag) o STAŁYCH koszykach
+      logarytmicznych (LIVE_EDGES) - histogramy się sumują, więc to
+      scalany szkic kwantyli (p95 z błędem ok. 1-2%),
+    - top-k największych kwot per komórka (category, city, flag) - top-30
+      dla dowolnego filtra to najlepsze wiersze z wybranych komórek.
+Koszt append() zależy od liczby nowych wierszy, a panels() od rozmiaru
+tablic (dni x kategorie x miasta), nie od liczby wierszy w historii.
+Nowa kategoria / miasto / dzień poszerza tablice.
+
+TransactionFeed symuluje źródło: kolejne partie mają ciągłe id i ts
+(co minutę) oraz własny seed default_rng([seed, numer_partii]).
+LiveStream łączy źródło z kostką dla app.py: poll() dolicza tyle wierszy,
+ile "napłynęło" od poprzedniego wywołania (niezależnie od liczby sesji).
+
+Pomiar (przyrostowo vs od zera, rosnąca historia):
+    python live_feed.py [historia_max] [wiersze_partii]
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ooc_data import CATEGORIES, CITIES, START, WEEKDAYS
+from rollup_cube import HIST_BUCKETS, Panels, order_weekdays, percentile_from_hist
+
+TOP_K = 30
+# stałe koszyki dla całego strumienia (kwoty spoza zakresu trafiają do skrajnych koszyków)
+LIVE_EDGES = np.geomspace(0.01, 1e6, HIST_BUCKETS + 1)
+
+
+class TransactionFeed:
+    """Symulowany strumień: każda partia to kolejne minuty osi czasu."""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+        self.batch_no = 0
+        self.next_row = 0
+        self.start_min = int(np.datetime64(START, "m").astype(np.int64))
+
+    def next_batch(self, n_rows: int) -> pd.DataFrame:
+        rng = np.random.default_rng([self.seed, self.batch_no])
+        lo = self.next_row
+        minutes = self.start_min + np.arange(lo, lo + n_rows, dtype=np.int64)
+
+        amount = rng.lognormal(mean=3.1, sigma=0.8, size=n_rows).round(2)
+        bump = rng.random(n_rows) < 1 / 5000
+        amount[bump] = (amount[bump] * rng.uniform(8, 20, size=int(bump.sum()))).round(2)
+
+        batch = pd.DataFrame({
+            "id": np.arange(lo + 1, lo + n_rows + 1, dtype=np.int64),
+            "ts": pd.to_datetime(minutes, unit="m"),
+            "category": np.asarray(CATEGORIES)[rng.integers(0, len(CATEGORIES), size=n_rows)],
+            "city": np.asarray(CITIES)[rng.integers(0, len(CITIES), size=n_rows)],
+            "amount": amount,
+            "flag": rng.random(n_rows) < 0.07,
+        })
+        self.batch_no += 1
+        self.next_row += n_rows
+        return batch
+
+
+def _grow(arr: np.ndarray, axis: int, size: int, front: int = 0) -> np.ndarray:
+    """Poszerza tablicę wzdłuż osi do `size` (dokładając `front` pozycji z przodu)."""
+    if arr.shape[axis] + front >= size and front == 0:
+        return arr
+    pad = [(0, 0)] * arr.ndim
+    pad[axis] = (front, size - arr.shape[axis] - front)
+    return np.pad(arr, pad)
+
+
+class LiveCube:
+    def __init__(self, top_k: int = TOP_K, edges: np.ndarray = LIVE_EDGES):
+        self.top_k = top_k
+        self.edges = edges
+        self.categories: list[str] = []
+        self.cities: list[str] = []
+        self.n_rows = 0
+        self.first_day: int | None = None  # dni od epoki dla daily[0]
+        self.lock = threading.Lock()  # stan jest współdzielony przez sesje
+
+        n_buckets = len(edges) - 1
+        self.daily_sum = np.zeros((0, 0, 0, 2))
+        self.daily_cnt = np.zeros((0, 0, 0, 2), dtype=np.int64)
+        self.heat_sum = np.zeros((7, 24, 0, 0, 2))
+        self.heat_cnt = np.zeros((7, 24, 0, 0, 2), dtype=np.int64)
+        self.hist = np.zeros((0, 0, 2, n_buckets), dtype=np.int64)
+        self.top = pd.DataFrame()
+
+    def _codes(self, values: pd.Series, known: list[str]) -> np.ndarray:
+        """Kody względem `known`; nowe wartości dopisujemy na końcu listy."""
+        values = values.astype(str)
+        new = [v for v in pd.unique(values) if v not in known]
+        known.extend(sorted(new))
+        return pd.Categorical(values, categories=known).codes.astype(np.int64)
+
+    def _resize(self, n_days: int, front: int = 0) -> None:
+        nc, ny = len(self.categories), len(self.cities)
+        self.daily_sum = _grow(_grow(_grow(self.daily_sum, 0, n_days, front), 1, nc), 2, ny)
+        self.daily_cnt = _grow(_grow(_grow(self.daily_cnt, 0, n_days, front), 1, nc), 2, ny)
+        self.heat_sum = _grow(_grow(self.heat_sum, 2, nc), 3, ny)
+        self.heat_cnt = _grow(_grow(self.heat_cnt, 2, nc), 3, ny)
+        self.hist = _grow(_grow(self.hist, 0, nc), 1, ny)
+
+    def append(self, batch: pd.DataFrame) -> None:
+        """Dolicza nową partię (kolumny ts, category, city, amount, opcjonalnie flag)."""
+        batch = batch[batch["amount"].notna()]
+        if batch.empty:
+            return
+        with self.lock:
+            self._append(batch)
+
+    def _append(self, batch: pd.DataFrame) -> None:
+        c = self._codes(batch["category"], self.categories)
+        y = self._codes(batch["city"], self.cities)
+        flag = (batch["flag"] == True).to_numpy(np.int64) if "flag" in batch.columns else np.zeros(len(batch), np.int64)  # noqa: E712
+        amount = batch["amount"].to_numpy(np.float64)
+
+        minutes = batch["ts"].to_numpy().astype("datetime64[m]").astype(np.int64)
+        days = minutes // 1440
+        hour = (minutes % 1440) // 60
+        weekday = (days + 3) % 7  # 1970-01-01 to czwartek, poniedziałek = 0
+
+        lo, hi = int(days.min()), int(days.max())
+        if self.first_day is None:
+            self.first_day = lo
+        front = max(0, self.first_day - lo)
+        self.first_day -= front
+        self._resize(max(self.daily_sum.shape[0] + front, hi - self.first_day + 1), front)
+        d = days - self.first_day
+
+        np.add.at(self.daily_sum, (d, c, y, flag), amount)
+        np.add.at(self.daily_cnt, (d, c, y, flag), 1)
+        np.add.at(self.heat_sum, (weekday, hour, c, y, flag), amount)
+        np.add.at(self.heat_cnt, (weekday, hour, c, y, flag), 1)
+        bucket = np.clip(np.searchsorted(self.edges, amount, side="right") - 1, 0, self.hist.shape[-1] - 1)
+        np.add.at(self.hist, (c, y, flag, bucket), 1)
+
+        # top-k per komórka: stare top-k + kandydaci z partii (najwyżej k na komórkę)
+        cand = pd.concat([self.top, batch.assign(flag=flag.astype(bool))])
+        self.top = (
+            cand.sort_values("amount", ascending=False, kind="stable")
+            .groupby(["category", "city", "flag"], sort=False, observed=True)
+            .head(self.top_k)
+        )
+        self.n_rows += len(batch)
+
+    def _select(self, category: str, city: str, flag_only: bool) -> tuple | None:
+        """Indeksy osi (category, city, flag) dla filtrów; None = brak takiej wartości."""
+        sel = []
+        for value, known in ((category, self.categories), (city, self.cities)):
+            if value == "ALL":
+                sel.append(slice(None))
+            elif value in known:
+                sel.append(slice(known.index(value), known.index(value) + 1))
+            else:
+                return None
+        sel.append(slice(1, 2) if flag_only else slice(None))
+        return tuple(sel)
+
+    def panels(self, category: str = "ALL", city: str = "ALL", flag_only: bool = False) -> Panels | None:
+        """Panele dla filtrów category/city/flag. None = brak danych."""
+        with self.lock:
+            sel = self._select(category, city, flag_only)
+            if sel is None or self.first_day is None:
+                return None
+            c, y, f = sel
+            day_sum = self.daily_sum[:, c, y, f].sum(axis=(2, 3))  # (dni, kategorie)
+            cnt = self.daily_cnt[:, c, y, f].sum(axis=(2, 3))
+            day_cnt, cat_cnt = cnt.sum(axis=1), cnt.sum(axis=0)
+            count = int(day_cnt.sum())
+            if count == 0:
+                return None
+            heat_sum = self.heat_sum[:, :, c, y, f].sum(axis=(2, 3, 4))
+            heat_cnt = self.heat_cnt[:, :, c, y, f].sum(axis=(2, 3, 4))
+            hist = self.hist[c, y, f].sum(axis=(0, 1, 2))
+            cats = self.categories[c]
+
+        total = float(day_sum.sum())
+        rank = (
+            pd.DataFrame({"category": cats, "amount": day_sum.sum(axis=0)})[cat_cnt > 0]
+            .sort_values("amount", ascending=False)
+            .reset_index(drop=True)
+        )
+        has_rows = day_cnt > 0
+        daily = pd.DataFrame({
+            "date": pd.to_datetime(self.first_day + np.flatnonzero(has_rows), unit="D"),
+            "amount": day_sum.sum(axis=1)[has_rows],
+        })
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(heat_cnt > 0, heat_sum / np.maximum(heat_cnt, 1), np.nan)
+        pivot = pd.DataFrame(mean, index=pd.Index(WEEKDAYS, name="weekday"), columns=pd.Index(range(24), name="hour"))
+        pivot = pivot.dropna(how="all").dropna(axis=1, how="all")
+
+        return Panels(
+            total=total,
+            avg=total / count,
+            count=count,
+            p95=percentile_from_hist(hist, self.edges),
+            rank=rank,
+            daily=daily,
+            pivot=order_weekdays(pivot),
+        )
+
+    def outliers(self, category: str = "ALL", city: str = "ALL", flag_only: bool = False, n: int = TOP_K) -> pd.DataFrame:
+        with self.lock:
+            top = self.top
+        if top.empty:
+            return top
+        m = np.ones(len(top), dtype=bool)
+        if category != "ALL":
+            m &= (top["category"] == category).to_numpy()
+        if city != "ALL":
+            m &= (top["city"] == city).to_numpy()
+        if flag_only:
+            m &= top["flag"].to_numpy(dtype=bool)
+        return top[m].nlargest(n, "amount")
+
+
+class LiveStream:
+    """Źródło + kostka współdzielone przez sesje; poll() dolicza wiersze zależnie od upływu czasu."""
+
+    def __init__(self, seed: int = 42, initial_rows: int = 50_000, max_batch: int = 100_000):
+        self.feed = TransactionFeed(seed)
+        self.cube = LiveCube()
+        self.max_batch = max_batch
+        self.lock = threading.Lock()
+        if initial_rows:
+            self.cube.append(self.feed.next_batch(initial_rows))
+        self.last_poll = time.monotonic()
+
+    def poll(self, rows_per_s: float) -> int:
+        """Pobiera wiersze, które "napłynęły" od ostatniego wywołania; zwraca ich liczbę."""
+        with self.lock:
+            now = time.monotonic()
+            n = min(self.max_batch, int((now - self.last_poll) * rows_per_s))
+            if n == 0:
+                return 0
+            self.last_poll = now
+            self.cube.append(self.feed.next_batch(n))
+            return n
+
+
+def _benchmark(max_history: int, batch_rows: int) -> None:
+    from rollup_cube import compute_panels
+
+    feed = TransactionFeed(42)
+    cube = LiveCube()
+    history: list[pd.DataFrame] = []
+    checkpoints = [h for h in (100_000, 300_000, 1_000_000, 3_000_000, 10_000_000) if h <= max_history]
+
+    print(f"Partia: {batch_rows:,} wierszy")
+    print(f"{'historia':>12s} {'przyrostowo':>14s} {'od zera':>12s}   total / p95 (przyrostowo vs od zera)")
+    for target in checkpoints:
+        while cube.n_rows < target - batch_rows:
+            batch = feed.next_batch(min(250_000, target - batch_rows - cube.n_rows))
+            history.append(batch)
+            cube.append(batch)
+
+        batch = feed.next_batch(batch_rows)
+        history.append(batch)
+
+        t0 = time.perf_counter()
+        cube.append(batch)
+        live = cube.panels()
+        t1 = time.perf_counter()
+
+        full = pd.concat(history, ignore_index=True)
+        full["date"] = full["ts"].dt.floor("D")
+        full["hour"] = full["ts"].dt.hour
+        full["weekday"] = full["ts"].dt.day_name()
+        t2 = time.perf_counter()
+        ref = compute_panels(full)
+        t3 = time.perf_counter()
+        del full
+
+        print(
+            f"{cube.n_rows:>12,} {1000 * (t1 - t0):11.1f} ms {1000 * (t3 - t2):9.1f} ms   "
+            f"{live.total:,.2f} vs {ref.total:,.2f} / {live.p95:.2f} vs {ref.p95:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    history_max = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows_per_batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    _benchmark(history_max, rows_per_batch)
@@ -0,0 +1,223 @@
+"""
+ooc_data.py
+
+Generator danych "out-of-core" dla Data Observatory.
+
+generate_data() w app.py buduje całą ramkę w RAM, a date/hour/weekday liczy
+przez akcesory .dt (date to kolumna obiektów Pythona). Przy 50 mln wierszy
+to się nie mieści. Tutaj:
+    - dane powstają partiami (PARTITION_ROWS wierszy), każda partia ma własny
+      deterministyczny seed: default_rng([seed, numer_partycji]),
+    - każda kolumna to osobny plik .npy zapisywany przez memory-map
+      (np.lib.format.open_memmap) - w RAM jest tylko bieżąca partia,
+    - czas trzymamy jako minuty od epoki (int64), a date/hour/weekday liczymy
+      arytmetyką całkowitą: dni = min // 1440, godzina = (min % 1440) // 60,
+      dzień tygodnia = (dni + 3) % 7 (1970-01-01 to czwartek, poniedziałek = 0),
+    - kategorie i miasta zapisujemy jako kody uint8 + słownik w meta.json.
+
+open_dataset() otwiera katalog leniwie: kolumny to np.memmap, system
+doczytuje tylko strony, których faktycznie dotykamy. Indeks filtrów
+(filter_index.PartitionedFilterIndex), kostka (RollupCube.from_dataset)
+i outliery (top_amount) czytają kolumny partiami - ramka całego zbioru
+(to_frame() bez argumentu) nigdy nie powstaje w aplikacji.
+
+Uruchomienie:
+    python ooc_data.py observatory_data 50000000
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+PARTITION_ROWS = 1_000_000
+START = "2026-01-01"
+
+CATEGORIES = ["food", "fuel", "books", "tools", "travel", "other"]
+CITIES = ["Warszawa", "Kraków", "Gdańsk", "Wrocław", "Poznań"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+COLUMNS = {
+    "id": np.int64,
+    "ts_min": np.int64,
+    "category": np.uint8,
+    "city": np.uint8,
+    "amount": np.float64,
+    "flag": np.bool_,
+}
+
+
+def generate_partitioned(
+    out_dir: str | Path,
+    n_rows: int,
+    seed: int = 42,
+    partition_rows: int = PARTITION_ROWS,
+    progress: Callable[[float], None] | None = None,
+) -> Path:
+    """
+    Zapisuje n_rows wierszy do katalogu out_dir (kolumny .npy + meta.json).
+    Ten sam (seed, partition_rows) daje zawsze te same dane.
+
+    Zapis idzie do katalogu tymczasowego, który na końcu zastępuje out_dir -
+    ktoś, kto ma otwarty poprzedni zbiór (memmap), dalej czyta stare pliki.
+    """
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    # unikalny katalog: dwie sesje generujące naraz nie piszą do tych samych plików
+    staging = Path(tempfile.mkdtemp(prefix=f"{out_dir.name}.tmp-", dir=out_dir.parent))
+
+    cols = {
+        name: np.lib.format.open_memmap(staging / f"{name}.npy", mode="w+", dtype=dtype, shape=(n_rows,))
+        for name, dtype in COLUMNS.items()
+    }
+    start_min = int(np.datetime64(START, "m").astype(np.int64))
+
+    for part, lo in enumerate(range(0, n_rows, partition_rows)):
+        hi = min(lo + partition_rows, n_rows)
+        n = hi - lo
+        rng = np.random.default_rng([seed, part])
+
+        cols["id"][lo:hi] = np.arange(lo + 1, hi + 1, dtype=np.int64)
+        cols["ts_min"][lo:hi] = start_min + np.arange(lo, hi, dtype=np.int64)
+        cols["category"][lo:hi] = rng.integers(0, len(CATEGORIES), size=n, dtype=np.uint8)
+        cols["city"][lo:hi] = rng.integers(0, len(CITIES), size=n, dtype=np.uint8)
+
+        amount = rng.lognormal(mean=3.1, sigma=0.8, size=n).round(2)
+        cols["flag"][lo:hi] = rng.random(n) < 0.07
+
+        # Lekka „anomalizacja” (jak w generate_data, ale w obrębie partycji)
+        bump_idx = rng.choice(n, size=min(n, max(1, n // 5000)), replace=False)
+        amount[bump_idx] = (amount[bump_idx] * rng.uniform(8, 20, size=len(bump_idx))).round(2)
+        cols["amount"][lo:hi] = amount
+
+        if progress:
+            progress(hi / n_rows)
+
+    for arr in cols.values():
+        arr.flush()
+    del cols
+
+    meta = {
+        "n_rows": n_rows,
+        "seed": seed,
+        "partition_rows": partition_rows,
+        "categories": CATEGORIES,
+        "cities": CITIES,
+    }
+    (staging / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    staging.rename(out_dir)
+    return out_dir
+
+
+class LazyDataset:
+    """Zbiór z generate_partitioned() otwarty przez memory-map (tylko do odczytu)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.n_rows: int = self.meta["n_rows"]
+        self.columns = {name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @property
+    def stamp(self) -> tuple:
+        """Identyfikator zawartości (do kluczy cache)."""
+        m = self.meta
+        return (str(self.path.resolve()), m["n_rows"], m["seed"], m["partition_rows"])
+
+    def partitions(self) -> Iterator[slice]:
+        """Zakresy wierszy kolejnych partycji (jak przy generowaniu)."""
+        step = self.meta["partition_rows"]
+        for lo in range(0, self.n_rows, step):
+            yield slice(lo, min(lo + step, self.n_rows))
+
+    def top_amount(self, mask: np.ndarray | None = None, n: int = 30) -> pd.DataFrame:
+        """
+        n wierszy z największym amount (spośród mask), malejąco - jak
+        sort_values("amount", ascending=False).head(n). Kandydaci z każdej
+        partycji osobno, ramka powstaje tylko z n wynikowych wierszy.
+        """
+        amount = self.columns["amount"]
+        cand_rows: list[np.ndarray] = []
+        cand_keys: list[np.ndarray] = []
+        for part in self.partitions():
+            rows = np.arange(part.start, part.stop)
+            if mask is not None:
+                rows = rows[mask[part]]
+            a = amount[rows]
+            key = np.where(np.isnan(a), np.inf, -a)  # malejąco, NaN na końcu
+            if len(key) > n:
+                keep = np.argpartition(key, n - 1)[:n]
+                rows, key = rows[keep], key[keep]
+            cand_rows.append(rows)
+            cand_keys.append(key)
+        rows = np.concatenate(cand_rows) if cand_rows else np.zeros(0, dtype=np.int64)
+        key = np.concatenate(cand_keys) if cand_keys else np.zeros(0)
+        order = np.lexsort((rows, key))[:n]  # remisy w kolejności wierszy (stabilnie)
+        return self.to_frame(rows[order]).set_axis(rows[order])
+
+    def time_parts(self, rows: slice | np.ndarray = slice(None)) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(dni od epoki, godzina, dzień tygodnia 0=pon) - arytmetyka na minutach."""
+        minutes = self.columns["ts_min"][rows]
+        days = minutes // 1440
+        hour = ((minutes % 1440) // 60).astype(np.int8)
+        weekday = ((days + 3) % 7).astype(np.int8)
+        return days, hour, weekday
+
+    def to_frame(self, rows: slice | np.ndarray = slice(None)) -> pd.DataFrame:
+        """
+        Ramka w układzie generate_data() dla wybranych wierszy.
+
+        id / amount / flag dla pełnego zakresu są widokami na memmap (bez kopii);
+        category, city i weekday to Categorical z kodów (1 bajt na wiersz),
+        date to datetime (dzień), a nie obiekty date.
+        """
+        c = self.columns
+        days, hour, weekday = self.time_parts(rows)
+        minutes = c["ts_min"][rows]
+
+        return pd.DataFrame(
+            {
+                "id": c["id"][rows],
+                "ts": pd.to_datetime(minutes, unit="m"),
+                "category": pd.Categorical.from_codes(c["category"][rows], self.meta["categories"]),
+                "city": pd.Categorical.from_codes(c["city"][rows], self.meta["cities"]),
+                "amount": c["amount"][rows],
+                "flag": c["flag"][rows],
+                "date": pd.to_datetime(days, unit="D"),
+                "hour": hour,
+                "weekday": pd.Categorical.from_codes(weekday, WEEKDAYS),
+            },
+            copy=False,
+        )
+
+
+def open_dataset(path: str | Path) -> LazyDataset:
+    return LazyDataset(path)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "observatory_data"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000_000
+
+    t0 = time.perf_counter()
+    generate_partitioned(target, rows)
+    t1 = time.perf_counter()
+    ds = open_dataset(target)
+    t2 = time.perf_counter()
+    print(f"Generowanie {rows:,} wierszy: {t1 - t0:.2f}s -> {target}/")
+    print(f"Otwarcie (memory-map): {1000 * (t2 - t1):.1f} ms")
+    print(ds.to_frame(slice(0, 5)))
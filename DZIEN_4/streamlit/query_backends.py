@@ -0,0 +1,364 @@
+"""
+query_backends.py
+
+Wymienny silnik zapytań (in-process) dla agregacji Data Observatory.
+
+Kontrakt QueryBackend (Protocol - bez dziedziczenia, wystarczy mieć metody):
+    - filter(filters)                 -> "przefiltrowany zbiór" w formacie silnika
+    - group_sum(sel, by)              -> suma amount per kolumna (malejąco)
+    - daily(sel)                      -> suma amount per dzień
+    - weekday_hour_mean(sel)          -> średnia amount: dzień tygodnia x godzina
+    - top_n(sel, n)                   -> n największych kwot
+    - percentile(sel, q)              -> q-ty percentyl amount (interpolacja liniowa)
+    - count / total / mean (sel)      -> KPI
+Wyniki zawsze jako obiekty pandas (tak je rysuje dashboard).
+
+Implementacje:
+    - PandasBackend: FilterIndex + funkcje z rollup_cube (to samo co app.py),
+    - DuckDBBackend: SQL na ramce zarejestrowanej w DuckDB (bez serwera, bez kopii),
+    - PolarsBackend: ramka Polars (kolumnowa, wielowątkowa).
+DuckDB i Polars są opcjonalne - available_backends() zwraca tylko zainstalowane.
+
+Benchmark (te same dane, wszystkie dostępne silniki):
+    python query_backends.py 2000000
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import numpy as np
+import pandas as pd
+
+from filter_index import FilterIndex
+from rollup_cube import Panels, daily_series, order_weekdays, rank_by_category, weekday_hour_pivot
+
+# kolumny, których potrzebują agregacje (date/hour/weekday liczone z ts w silnikach kolumnowych)
+BASE_COLUMNS = ["id", "ts", "category", "city", "amount", "flag"]
+
+
+def _engine_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Kolumny potrzebne silnikom kolumnowym; brak flag = same False (jak w FilterIndex)."""
+    out = df[[c for c in BASE_COLUMNS if c in df.columns]]
+    if "flag" not in out.columns:
+        out = out.assign(flag=False)
+    return out
+
+
+@dataclass(frozen=True)
+class Filters:
+    category: str = "ALL"
+    city: str = "ALL"
+    amount_range: tuple[float, float] | None = None
+    flag_only: bool = False
+
+
+class QueryBackend(Protocol):
+    name: str
+
+    def filter(self, filters: Filters) -> Any: ...
+    def count(self, sel: Any) -> int: ...
+    def total(self, sel: Any) -> float: ...
+    def mean(self, sel: Any) -> float: ...
+    def percentile(self, sel: Any, q: float) -> float: ...
+    def group_sum(self, sel: Any, by: str) -> pd.DataFrame: ...
+    def daily(self, sel: Any) -> pd.DataFrame: ...
+    def weekday_hour_mean(self, sel: Any) -> pd.DataFrame: ...
+    def top_n(self, sel: Any, n: int) -> pd.DataFrame: ...
+
+
+def backend_panels(backend: QueryBackend, filters: Filters) -> Panels | None:
+    """Panele dashboardu policzone wybranym silnikiem. None = brak danych."""
+    sel = backend.filter(filters)
+    count = backend.count(sel)
+    if count == 0:
+        return None
+    return Panels(
+        total=backend.total(sel),
+        avg=backend.mean(sel),
+        count=count,
+        p95=backend.percentile(sel, 95),
+        rank=backend.group_sum(sel, "category"),
+        daily=backend.daily(sel),
+        pivot=backend.weekday_hour_mean(sel),
+    )
+
+
+# ============================================================
+# pandas
+# ============================================================
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.index = FilterIndex(df)
+
+    def filter(self, filters: Filters) -> pd.DataFrame:
+        mask = self.index.mask(filters.category, filters.city, filters.amount_range, filters.flag_only)
+        if mask is None:
+            # bez filtrów i tak odrzucamy brakujące kwoty (jak suwak kwoty w app.py)
+            mask = self.index.amount_mask(self.index.amount_min, self.index.amount_max)
+        return FilterIndex.apply(self.df, mask)
+
+    def count(self, sel: pd.DataFrame) -> int:
+        return len(sel)
+
+    def total(self, sel: pd.DataFrame) -> float:
+        return float(sel["amount"].sum())
+
+    def mean(self, sel: pd.DataFrame) -> float:
+        return float(sel["amount"].mean())
+
+    def percentile(self, sel: pd.DataFrame, q: float) -> float:
+        return float(np.percentile(sel["amount"], q))
+
+    def group_sum(self, sel: pd.DataFrame, by: str) -> pd.DataFrame:
+        if by == "category":
+            return rank_by_category(sel)
+        return (
+            sel.groupby(by, as_index=False, observed=True)["amount"].sum()
+            .sort_values("amount", ascending=False)
+        )
+
+    def daily(self, sel: pd.DataFrame) -> pd.DataFrame:
+        return daily_series(sel)
+
+    def weekday_hour_mean(self, sel: pd.DataFrame) -> pd.DataFrame:
+        return weekday_hour_pivot(sel)
+
+    def top_n(self, sel: pd.DataFrame, n: int) -> pd.DataFrame:
+        return sel.nlargest(n, "amount")
+
+
+# ============================================================
+# DuckDB (SQL in-process)
+# ============================================================
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, df: pd.DataFrame):
+        import duckdb
+
+        self.con = duckdb.connect()
+        self.frame = _engine_frame(df)
+
+    def _cursor(self):
+        """
+        Osobny kursor na każde zapytanie: jedno połączenie DuckDB nie jest
+        bezpieczne dla wielu wątków (sesje Streamlit, pula w app.py), a kursory
+        tej samej bazy już tak. Widok z register() jest lokalny dla kursora,
+        więc rejestrujemy ramkę od nowa - register() nie kopiuje danych,
+        DuckDB skanuje kolumny ramki bezpośrednio.
+        """
+        cur = self.con.cursor()
+        cur.register("t", self.frame)
+        return cur
+
+    def filter(self, filters: Filters) -> tuple[str, list]:
+        where = ["amount IS NOT NULL"]
+        params: list = []
+        if filters.category != "ALL":
+            where.append("CAST(category AS VARCHAR) = ?")
+            params.append(filters.category)
+        if filters.city != "ALL":
+            where.append("CAST(city AS VARCHAR) = ?")
+            params.append(filters.city)
+        if filters.amount_range is not None:
+            where.append("amount BETWEEN ? AND ?")
+            params.extend(filters.amount_range)
+        if filters.flag_only:
+            where.append("flag")
+        return " AND ".join(where), params
+
+    def _scalar(self, expr: str, sel: tuple[str, list]):
+        where, params = sel
+        with self._cursor() as cur:
+            return cur.execute(f"SELECT {expr} FROM t WHERE {where}", params).fetchone()[0]
+
+    def _df(self, sql: str, sel: tuple[str, list]) -> pd.DataFrame:
+        where, params = sel
+        with self._cursor() as cur:
+            return cur.execute(sql.format(where=where), params).df()
+
+    def count(self, sel) -> int:
+        return int(self._scalar("count(*)", sel))
+
+    def total(self, sel) -> float:
+        return float(self._scalar("sum(amount)", sel))
+
+    def mean(self, sel) -> float:
+        return float(self._scalar("avg(amount)", sel))
+
+    def percentile(self, sel, q: float) -> float:
+        return float(self._scalar(f"quantile_cont(amount, {q / 100})", sel))
+
+    def group_sum(self, sel, by: str) -> pd.DataFrame:
+        return self._df(
+            f'SELECT CAST("{by}" AS VARCHAR) AS "{by}", sum(amount) AS amount '
+            f'FROM t WHERE {{where}} GROUP BY 1 ORDER BY amount DESC',
+            sel,
+        )
+
+    def daily(self, sel) -> pd.DataFrame:
+        return self._df(
+            "SELECT CAST(ts AS DATE) AS date, sum(amount) AS amount "
+            "FROM t WHERE {where} GROUP BY 1 ORDER BY 1",
+            sel,
+        )
+
+    def weekday_hour_mean(self, sel) -> pd.DataFrame:
+        long = self._df(
+            "SELECT dayname(ts) AS weekday, hour(ts) AS hour, avg(amount) AS amount "
+            "FROM t WHERE {where} GROUP BY 1, 2",
+            sel,
+        )
+        return order_weekdays(long.pivot(index="weekday", columns="hour", values="amount").sort_index(axis=1))
+
+    def top_n(self, sel, n: int) -> pd.DataFrame:
+        return self._df(f"SELECT * FROM t WHERE {{where}} ORDER BY amount DESC LIMIT {int(n)}", sel)
+
+
+# ============================================================
+# Polars (ramka kolumnowa)
+# ============================================================
+class PolarsBackend:
+    name = "polars"
+
+    def __init__(self, df: pd.DataFrame):
+        import polars as pl
+
+        self.pl = pl
+        frame = pl.from_pandas(_engine_frame(df))
+        # tekst jako Categorical/String porównujemy jako String (jak astype(str) w app.py)
+        self.frame = frame.with_columns(
+            pl.col("category").cast(pl.String),
+            pl.col("city").cast(pl.String),
+        )
+
+    def filter(self, filters: Filters):
+        pl = self.pl
+        cond = pl.col("amount").is_not_null() & pl.col("amount").is_not_nan()
+        if filters.category != "ALL":
+            cond &= pl.col("category") == filters.category
+        if filters.city != "ALL":
+            cond &= pl.col("city") == filters.city
+        if filters.amount_range is not None:
+            cond &= pl.col("amount").is_between(*filters.amount_range)
+        if filters.flag_only:
+            cond &= pl.col("flag")
+        return self.frame.filter(cond)
+
+    def count(self, sel) -> int:
+        return sel.height
+
+    def total(self, sel) -> float:
+        return float(sel["amount"].sum())
+
+    def mean(self, sel) -> float:
+        return float(sel["amount"].mean())
+
+    def percentile(self, sel, q: float) -> float:
+        return float(sel["amount"].quantile(q / 100, interpolation="linear"))
+
+    def group_sum(self, sel, by: str) -> pd.DataFrame:
+        pl = self.pl
+        out = sel.group_by(by).agg(pl.col("amount").sum()).sort("amount", descending=True)
+        return out.to_pandas()
+
+    def daily(self, sel) -> pd.DataFrame:
+        pl = self.pl
+        out = (
+            sel.group_by(pl.col("ts").dt.date().alias("date"))
+            .agg(pl.col("amount").sum())
+            .sort("date")
+        )
+        return out.to_pandas()
+
+    def weekday_hour_mean(self, sel) -> pd.DataFrame:
+        pl = self.pl
+        long = (
+            sel.group_by(
+                pl.col("ts").dt.strftime("%A").alias("weekday"),
+                pl.col("ts").dt.hour().alias("hour"),
+            )
+            .agg(pl.col("amount").mean())
+            .to_pandas()
+        )
+        return order_weekdays(long.pivot(index="weekday", columns="hour", values="amount").sort_index(axis=1))
+
+    def top_n(self, sel, n: int) -> pd.DataFrame:
+        return sel.sort("amount", descending=True).head(n).to_pandas()
+
+
+BACKENDS = {
+    "pandas": (PandasBackend, None),
+    "duckdb": (DuckDBBackend, "duckdb"),
+    "polars": (PolarsBackend, "polars"),
+}
+
+
+def available_backends() -> list[str]:
+    return [name for name, (_cls, module) in BACKENDS.items() if module is None or importlib.util.find_spec(module)]
+
+
+def make_backend(name: str, df: pd.DataFrame) -> QueryBackend:
+    cls, _module = BACKENDS[name]
+    return cls(df)
+
+
+def _benchmark(n_rows: int, repeats: int = 3) -> None:
+    from demo_data import generate_demo_data
+
+    df = generate_demo_data(n_rows, 42)
+    lo, hi = float(df["amount"].min()), float(df["amount"].max())
+    scenarios = {
+        "brak filtrów": Filters(amount_range=(lo, hi)),
+        "food": Filters(category="food", amount_range=(lo, hi)),
+        "fuel+Kraków+flag": Filters(category="fuel", city="Kraków", amount_range=(lo, hi), flag_only=True),
+        "kwota 10-100": Filters(amount_range=(10.0, 100.0)),
+    }
+    ops = {
+        "filter": lambda b, f: b.filter(f),
+        "kpi+p95": lambda b, f: (lambda s: (b.count(s), b.total(s), b.mean(s), b.percentile(s, 95)))(b.filter(f)),
+        "group_sum": lambda b, f: b.group_sum(b.filter(f), "category"),
+        "daily": lambda b, f: b.daily(b.filter(f)),
+        "weekday_hour": lambda b, f: b.weekday_hour_mean(b.filter(f)),
+        "top_n": lambda b, f: b.top_n(b.filter(f), 30),
+    }
+
+    print(f"Dane: {n_rows:,} wierszy, silniki: {', '.join(available_backends())}")
+    backends = {}
+    for name in available_backends():
+        t0 = time.perf_counter()
+        backends[name] = make_backend(name, df)
+        print(f"  przygotowanie {name:7s} {1000 * (time.perf_counter() - t0):9.1f} ms")
+
+    header = f"{'scenariusz':18s} {'operacja':13s}" + "".join(f"{n:>12s}" for n in backends)
+    print("\n" + header + "\n" + "-" * len(header))
+    for sc_name, filters in scenarios.items():
+        for op_name, op in ops.items():
+            cells = []
+            for backend in backends.values():
+                times = []
+                for _ in range(repeats):
+                    t0 = time.perf_counter()
+                    op(backend, filters)
+                    times.append(time.perf_counter() - t0)
+                cells.append(f"{1000 * min(times):9.1f} ms")
+            print(f"{sc_name:18s} {op_name:13s}" + "".join(f"{c:>12s}" for c in cells))
+
+    # kontrola zgodności wyników KPI
+    ref = backend_panels(backends["pandas"], scenarios["food"])
+    for name, backend in backends.items():
+        p = backend_panels(backend, scenarios["food"])
+        ok = p.count == ref.count and np.isclose(p.total, ref.total) and np.isclose(p.p95, ref.p95)
+        print(f"zgodność KPI {name:7s}: {'OK' if ok else 'RÓŻNICA'}")
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
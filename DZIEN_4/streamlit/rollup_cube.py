@@ -0,0 +1,348 @@
+"""
+rollup_cube.py
+
+Wstępnie zagregowana kostka (rollup cube) dla KPI i wykresów Data Observatory.
+
+Każdy ruch suwaka liczył od nowa na surowych wierszach: groupby("category"),
+groupby("date"), pivot_table(weekday x hour) i np.percentile. Tutaj RAZ na
+zbiór danych liczymy liczniki, sumy i histogramy kwot po wymiarach
+(date, hour, weekday, category, city, flag), a zapytanie z filtrami
+category / city / flag sumuje już tylko małe tabele kostki.
+
+Zamiast pełnego iloczynu wymiarów (przy danych co minutę miałby prawie tyle
+komórek co wierszy) materializujemy trzy przekroje, których potrzebuje
+dashboard - każdy z wymiarami filtrów (category, city, flag):
+    - daily: (date, category, city, flag)          -> suma, liczba
+    - heat:  (weekday, hour, category, city, flag) -> suma, liczba
+    - hist:  (category, city, flag) x koszyk kwoty -> liczba
+p95 pochodzi z połączonych histogramów (koszyki logarytmiczne, błąd
+względny ok. 1%), pozostałe liczby są dokładne.
+
+Filtr zakresu kwoty nie jest wymiarem kostki - gdy jest aktywny, dashboard
+liczy panele z przefiltrowanych wierszy (compute_panels).
+
+RollupCube.from_dataset() buduje tę samą kostkę ze zbioru na dysku
+(ooc_data.LazyDataset) partiami: kody uint8 category/city prosto z memmap,
+date/hour/weekday z arytmetyki na minutach, sumy i liczniki przez
+np.bincount - bez ramki całego zbioru. Z maską wierszy (filtr kwoty) ta sama
+funkcja daje kostkę tylko z wybranych wierszy.
+
+Pomiar opóźnienia "filtr -> dane do wykresów" (przed/po):
+    python rollup_cube.py [n_rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from ooc_data import LazyDataset
+
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+HIST_BUCKETS = 1024
+
+
+@dataclass
+class Panels:
+    """Wszystko, co dashboard rysuje nad tabelą outlierów."""
+    total: float
+    avg: float
+    count: int
+    p95: float
+    rank: pd.DataFrame
+    daily: pd.DataFrame
+    pivot: pd.DataFrame
+
+
+def order_weekdays(pivot: pd.DataFrame) -> pd.DataFrame:
+    # uporządkuj dni tygodnia (estetyka)
+    return pivot.reindex([d for d in WEEKDAY_ORDER if d in pivot.index])
+
+
+def kpis(f: pd.DataFrame) -> tuple[float, float, int, float]:
+    """(suma, średnia, liczba, p95) z wierszy."""
+    return f["amount"].sum(), f["amount"].mean(), len(f), np.percentile(f["amount"], 95)
+
+
+def rank_by_category(f: pd.DataFrame) -> pd.DataFrame:
+    return (
+        f.groupby("category", as_index=False, observed=True)["amount"]
+         .sum()
+         .sort_values("amount", ascending=False)
+    )
+
+
+def daily_series(f: pd.DataFrame) -> pd.DataFrame:
+    return (
+        f.groupby("date", as_index=False)["amount"]
+         .sum()
+         .sort_values("date")
+    )
+
+
+def weekday_hour_pivot(f: pd.DataFrame) -> pd.DataFrame:
+    pivot = f.pivot_table(index="weekday", columns="hour", values="amount", aggfunc="mean", observed=True)
+    return order_weekdays(pivot)
+
+
+def compute_panels(f: pd.DataFrame) -> Panels:
+    """Panele liczone wprost z (przefiltrowanych) wierszy - ścieżka bez kostki."""
+    total, avg, count, p95 = kpis(f)
+    return Panels(
+        total=total,
+        avg=avg,
+        count=count,
+        p95=p95,
+        rank=rank_by_category(f),
+        daily=daily_series(f),
+        pivot=weekday_hour_pivot(f),
+    )
+
+
+def percentile_from_hist(counts: np.ndarray, edges: np.ndarray, q: float = 95) -> float:
+    """Percentyl z histogramu: interpolacja liniowa wewnątrz koszyka."""
+    total = counts.sum()
+    if total == 0:
+        return float("nan")
+    cum = np.cumsum(counts)
+    target = q / 100 * total
+    b = int(np.searchsorted(cum, target, side="left"))
+    before = cum[b - 1] if b > 0 else 0
+    frac = (target - before) / counts[b]
+    return float(edges[b] + frac * (edges[b + 1] - edges[b]))
+
+
+def _log_edges(lo: float | None, hi: float | None, n_buckets: int) -> np.ndarray:
+    lo = 1.0 if lo is None else lo
+    hi = max(1.0 if hi is None else hi, lo * 1.0001)
+    return np.geomspace(lo, hi, n_buckets + 1)
+
+
+def _bucket(edges: np.ndarray, amount: np.ndarray) -> np.ndarray:
+    return np.clip(np.searchsorted(edges, amount, side="right") - 1, 0, len(edges) - 2)
+
+
+def _hist_cells(n_categories: int, n_cities: int) -> pd.DataFrame:
+    """Komórka (category, city, flag) dla każdego wiersza macierzy histogramów."""
+    return pd.DataFrame({
+        "category": np.repeat(np.arange(n_categories), n_cities * 2),
+        "city": np.tile(np.repeat(np.arange(n_cities), 2), n_categories),
+        "flag": np.tile([False, True], n_categories * n_cities),
+    })
+
+
+class RollupCube:
+    def __init__(self, df: pd.DataFrame, n_buckets: int = HIST_BUCKETS):
+        # wiersze z NaN w amount i tak odpadają w filtrze zakresu kwoty
+        df = df[df["amount"].notna()]
+        amount = df["amount"].to_numpy(dtype=np.float64)
+
+        cat = pd.Categorical(df["category"].astype(str))
+        city = pd.Categorical(df["city"].astype(str))
+        self.categories = cat.categories.tolist()
+        self.cities = city.categories.tolist()
+
+        dims = pd.DataFrame({
+            "category": cat.codes.astype(np.int16),
+            "city": city.codes.astype(np.int16),
+            "flag": (df["flag"] == True).to_numpy(dtype=bool) if "flag" in df.columns else False,  # noqa: E712
+            "amount": amount,
+        })
+        dims["date"] = df["date"].to_numpy()
+        dims["weekday"] = df["weekday"].to_numpy()
+        dims["hour"] = df["hour"].to_numpy()
+
+        keys = ["category", "city", "flag"]
+        self.daily = dims.groupby(["date"] + keys, observed=True, sort=False)["amount"].agg(["sum", "count"]).reset_index()
+        self.heat = dims.groupby(["weekday", "hour"] + keys, observed=True, sort=False)["amount"].agg(["sum", "count"]).reset_index()
+
+        # koszyki logarytmiczne (kwoty są z rozkładu lognormalnego); kwoty <= 0 trafiają do koszyka 0
+        positive = amount[amount > 0]
+        self.edges = _log_edges(positive.min() if positive.size else None, positive.max() if positive.size else None, n_buckets)
+
+        # klucz komórki (category, city, flag) -> wiersz macierzy histogramów
+        n_cells = len(self.categories) * len(self.cities) * 2
+        cell = (dims["category"].to_numpy(np.int64) * len(self.cities) + dims["city"].to_numpy(np.int64)) * 2 + dims["flag"].to_numpy(np.int64)
+        bucket = _bucket(self.edges, amount)
+        self.hist = np.bincount(cell * n_buckets + bucket, minlength=n_cells * n_buckets).reshape(n_cells, n_buckets)
+        self.hist_cells = _hist_cells(len(self.categories), len(self.cities))
+
+    @classmethod
+    def from_dataset(cls, ds: LazyDataset, mask: np.ndarray | None = None, n_buckets: int = HIST_BUCKETS) -> RollupCube:
+        """Kostka ze zbioru na dysku (albo wierszy z mask), partiami z memmap."""
+        c = ds.columns
+        categories, cities = ds.meta["categories"], ds.meta["cities"]
+        n_city = len(cities)
+        n_cells = len(categories) * n_city * 2
+
+        def parts():
+            # (zakres, wybrane wiersze partycji jako maska albo None)
+            for part in ds.partitions():
+                m = None if mask is None else mask[part]
+                a = c["amount"][part]
+                keep = ~np.isnan(a) if m is None else m & ~np.isnan(a)
+                yield part, keep
+
+        # 1. przejście: zakres dni i kwot (krawędzie histogramu)
+        lo = hi = None
+        day_lo = day_hi = None
+        for part, keep in parts():
+            a = c["amount"][part][keep]
+            if not a.size:
+                continue
+            positive = a[a > 0]
+            if positive.size:
+                lo = positive.min() if lo is None else min(lo, positive.min())
+                hi = positive.max() if hi is None else max(hi, positive.max())
+            days = c["ts_min"][part][keep] // 1440
+            day_lo = days.min() if day_lo is None else min(day_lo, days.min())
+            day_hi = days.max() if day_hi is None else max(day_hi, days.max())
+        edges = _log_edges(lo, hi, n_buckets)
+        n_days = 0 if day_lo is None else int(day_hi - day_lo + 1)
+        day_lo = day_lo or 0
+
+        # 2. przejście: sumy i liczniki (dzień x komórka), (dzień tyg. x godzina x komórka), histogramy
+        daily_sum = np.zeros(n_days * n_cells)
+        daily_cnt = np.zeros(n_days * n_cells, dtype=np.int64)
+        heat_sum = np.zeros(7 * 24 * n_cells)
+        heat_cnt = np.zeros(7 * 24 * n_cells, dtype=np.int64)
+        hist = np.zeros(n_cells * n_buckets, dtype=np.int64)
+        for part, keep in parts():
+            a = c["amount"][part][keep]
+            if not a.size:
+                continue
+            cell = (c["category"][part][keep].astype(np.int64) * n_city + c["city"][part][keep]) * 2 + c["flag"][part][keep]
+            days, hour, weekday = ds.time_parts(part)
+            dkey = (days[keep] - day_lo) * n_cells + cell
+            hkey = (weekday[keep].astype(np.int64) * 24 + hour[keep]) * n_cells + cell
+            daily_sum += np.bincount(dkey, weights=a, minlength=len(daily_sum))
+            daily_cnt += np.bincount(dkey, minlength=len(daily_cnt))
+            heat_sum += np.bincount(hkey, weights=a, minlength=len(heat_sum))
+            heat_cnt += np.bincount(hkey, minlength=len(heat_cnt))
+            hist += np.bincount(cell * n_buckets + _bucket(edges, a), minlength=len(hist))
+
+        def cell_columns(cells: np.ndarray) -> dict[str, np.ndarray]:
+            return {
+                "category": (cells // (n_city * 2)).astype(np.int16),
+                "city": ((cells // 2) % n_city).astype(np.int16),
+                "flag": (cells % 2).astype(bool),
+            }
+
+        nz = np.flatnonzero(daily_cnt)
+        daily = pd.DataFrame({
+            "date": pd.to_datetime(day_lo + nz // n_cells, unit="D"),
+            **cell_columns(nz % n_cells),
+            "sum": daily_sum[nz],
+            "count": daily_cnt[nz],
+        })
+        nz = np.flatnonzero(heat_cnt)
+        slot = nz // n_cells
+        heat = pd.DataFrame({
+            "weekday": pd.Categorical.from_codes(slot // 24, WEEKDAY_ORDER),
+            "hour": (slot % 24).astype(np.int8),
+            **cell_columns(nz % n_cells),
+            "sum": heat_sum[nz],
+            "count": heat_cnt[nz],
+        })
+
+        cube = cls.__new__(cls)
+        cube.categories, cube.cities = list(categories), list(cities)
+        cube.daily, cube.heat = daily, heat
+        cube.edges = edges
+        cube.hist = hist.reshape(n_cells, n_buckets)
+        cube.hist_cells = _hist_cells(len(categories), n_city)
+        return cube
+
+    @staticmethod
+    def _select(table: pd.DataFrame, codes: dict[str, int | None], flag_only: bool) -> pd.DataFrame:
+        m = np.ones(len(table), dtype=bool)
+        for col, code in codes.items():
+            if code is not None:
+                m &= table[col].to_numpy() == code
+        if flag_only:
+            m &= table["flag"].to_numpy()
+        return table[m]
+
+    def _codes(self, category: str, city: str) -> dict[str, int | None] | None:
+        codes: dict[str, int | None] = {"category": None, "city": None}
+        for col, value, values in (("category", category, self.categories), ("city", city, self.cities)):
+            if value != "ALL":
+                if value not in values:
+                    return None
+                codes[col] = values.index(value)
+        return codes
+
+    def p95_from_hist(self, counts: np.ndarray, q: float = 95) -> float:
+        return percentile_from_hist(counts, self.edges, q)
+
+    def panels(self, category: str = "ALL", city: str = "ALL", flag_only: bool = False) -> Panels | None:
+        """Panele z kostki dla filtrów category/city/flag. None = brak danych."""
+        codes = self._codes(category, city)
+        if codes is None:
+            return None
+
+        daily_cells = self._select(self.daily, codes, flag_only)
+        count = int(daily_cells["count"].sum())
+        if count == 0:
+            return None
+        total = float(daily_cells["sum"].sum())
+
+        rank = daily_cells.groupby("category", sort=False)["sum"].sum().reset_index()
+        rank["category"] = np.asarray(self.categories, dtype=object)[rank["category"].to_numpy()]
+        rank = rank.rename(columns={"sum": "amount"}).sort_values("amount", ascending=False)
+
+        daily = (
+            daily_cells.groupby("date", as_index=False)["sum"].sum()
+            .rename(columns={"sum": "amount"})
+            .sort_values("date")
+        )
+
+        heat = self._select(self.heat, codes, flag_only).groupby(["weekday", "hour"], observed=True)[["sum", "count"]].sum()
+        pivot = (heat["sum"] / heat["count"]).unstack("hour")
+        pivot.index.name, pivot.columns.name = "weekday", "hour"
+
+        hist_rows = self._select(self.hist_cells, codes, flag_only).index.to_numpy()
+        p95 = self.p95_from_hist(self.hist[hist_rows].sum(axis=0))
+
+        return Panels(
+            total=total,
+            avg=total / count,
+            count=count,
+            p95=p95,
+            rank=rank.reset_index(drop=True),
+            daily=daily.reset_index(drop=True),
+            pivot=order_weekdays(pivot),
+        )
+
+
+def _benchmark(n_rows: int = 500_000, seed: int = 42) -> None:
+    from demo_data import generate_demo_data
+    from filter_index import FilterIndex
+
+    df = generate_demo_data(n_rows, seed)
+
+    t0 = time.perf_counter()
+    fidx = FilterIndex(df)
+    cube = RollupCube(df)
+    print(f"Budowa indeksu + kostki ({n_rows:,} wierszy): {time.perf_counter() - t0:.2f}s (raz na zbiór)")
+
+    for cat, city, flag in [("ALL", "ALL", False), ("food", "ALL", False), ("fuel", "Kraków", True)]:
+        t0 = time.perf_counter()
+        raw = compute_panels(FilterIndex.apply(df, fidx.mask(cat, city, None, flag)))
+        t1 = time.perf_counter()
+        fast = cube.panels(cat, city, flag)
+        t2 = time.perf_counter()
+        print(
+            f"{cat:5s} {city:8s} flag={flag!s:5s}  surowe: {1000 * (t1 - t0):7.1f} ms   "
+            f"kostka: {1000 * (t2 - t1):6.1f} ms   p95 {raw.p95:.2f} vs {fast.p95:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,218 @@
+"""
+shared_dataset.py
+
+Jeden zbiór danych dla wszystkich sesji Data Observatory.
+
+@st.cache_data oddaje każdemu wywołaniu KOPIĘ wyniku (pickle -> unpickle),
+więc 30 równoległych sesji to 30 kopii ramki z 500 tys. wierszy. Tutaj
+ramkę zapisujemy RAZ jako kolumny .npy w pamięci współdzielonej
+(/dev/shm, jeśli jest; inaczej katalog tymczasowy) i otwieramy przez
+memory-map tylko do odczytu:
+    - strony plików są wspólne dla wszystkich sesji i procesów serwera
+      (jedna kopia w pamięci systemu, niezależnie od liczby sesji),
+    - kolumny ramki to widoki na memmap (bez kopii); zapis do nich kończy
+      się błędem "read-only", więc sesja nie zepsuje danych innym,
+    - tekst (category, city, weekday) zapisujemy jako kody + słownik w meta.json,
+      date jako datetime64 (dzień) - jak w ooc_data.LazyDataset.
+Sesja trzyma tylko swój stan: numery wierszy po filtrach
+(FilterIndex.rows) i małe wyniki paneli.
+
+Katalogi w SHARED_ROOT przeżywają proces serwera (i eviction z cache_resource),
+więc publish() sprząta po sobie: zostawia SHARED_MAX_DATASETS ostatnio
+używanych zbiorów (attach() odświeża czas użycia) i porzucone katalogi
+tymczasowe. Usunięcie jest bezpieczne dla sesji, które zbiór mają już
+otwarty - zmapowane pliki znikają z dysku dopiero po zamknięciu mapowania.
+
+Pomiar (kopie jak w cache_data vs wspólny zbiór + indeksy wierszy):
+    python shared_dataset.py [n_rows] [sessions]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SHARED_VERSION = 1
+SHARED_ROOT = Path("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()) / "observatory_shared"
+SHARED_MAX_DATASETS = 4  # jak max_entries generate_data w app.py
+STAGING_MAX_AGE_S = 3600  # starszy katalog .tmp- to ślad po przerwanym publish()
+
+
+def shared_path(key: tuple, root: Path = SHARED_ROOT) -> Path:
+    """Katalog zbioru dla klucza (np. ("gen", n_rows, seed))."""
+    digest = hashlib.blake2b(repr((SHARED_VERSION, key)).encode("utf-8"), digest_size=12).hexdigest()
+    return root / digest
+
+
+def _column_payload(s: pd.Series) -> tuple[np.ndarray, list | None]:
+    """(tablica do zapisu, słownik kategorii albo None)."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(), [str(c) for c in s.cat.categories]
+    if pd.api.types.is_string_dtype(s.dtype):
+        # str (pandas 3) i object z napisami -> kody; obiekty date -> datetime64
+        if pd.api.types.infer_dtype(s, skipna=False) == "string":
+            cat = pd.Categorical(s)
+            return cat.codes, cat.categories.tolist()
+        # np. kolumna date z obiektami datetime.date
+        return pd.to_datetime(s).to_numpy(), None
+    return s.to_numpy(), None
+
+
+def publish(df: pd.DataFrame, key: tuple, root: Path = SHARED_ROOT) -> Path:
+    """
+    Zapisuje ramkę jako kolumny .npy (jeśli jeszcze jej nie ma) i zwraca katalog.
+    Zapis idzie do katalogu tymczasowego zamienianego na docelowy na końcu,
+    więc inny proces nigdy nie zobaczy połowy zbioru.
+    """
+    path = shared_path(key, root)
+    if (path / "meta.json").exists():
+        _touch(path)
+        return path
+
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f"{path.name}.tmp-", dir=root))
+    columns = {}
+    for name in df.columns:
+        data, categories = _column_payload(df[name])
+        np.save(staging / f"{len(columns)}.npy", data)
+        columns[name] = {"file": f"{len(columns)}.npy", "categories": categories}
+
+    meta = {"version": SHARED_VERSION, "key": repr(key), "n_rows": len(df), "columns": columns}
+    (staging / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    try:
+        staging.rename(path)
+    except OSError:
+        # inny proces zdążył opublikować ten sam zbiór - zostaje jego wersja
+        shutil.rmtree(staging, ignore_errors=True)
+    prune(root, keep=SHARED_MAX_DATASETS, protect=path)
+    return path
+
+
+def _touch(path: Path) -> None:
+    """Czas użycia zbioru = mtime katalogu (do wyboru najstarszych w prune())."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune(root: Path = SHARED_ROOT, keep: int = SHARED_MAX_DATASETS, protect: Path | None = None) -> list[Path]:
+    """
+    Usuwa zbiory poza `keep` ostatnio używanymi (protect zostaje zawsze)
+    i katalogi tymczasowe starsze niż STAGING_MAX_AGE_S. Zwraca usunięte katalogi.
+    """
+    try:
+        entries = [(p, p.stat().st_mtime) for p in root.iterdir() if p.is_dir()]
+    except OSError:
+        return []
+
+    now = time.time()
+    removed = [p for p, mtime in entries if ".tmp-" in p.name and now - mtime > STAGING_MAX_AGE_S]
+    datasets = sorted(
+        ((p, mtime) for p, mtime in entries if ".tmp-" not in p.name and p != protect),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    removed += [p for p, _mtime in datasets[max(keep - (protect is not None), 0):]]
+    for p in removed:
+        shutil.rmtree(p, ignore_errors=True)
+    return removed
+
+
+class SharedDataset:
+    """Zbiór z publish() otwarty przez memory-map tylko do odczytu."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.n_rows: int = self.meta["n_rows"]
+        self.arrays = {
+            name: np.load(self.path / spec["file"], mmap_mode="r")
+            for name, spec in self.meta["columns"].items()
+        }
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def frame(self) -> pd.DataFrame:
+        """Ramka, której kolumny są widokami na memmap (tylko do odczytu, bez kopii)."""
+        data = {}
+        for name, spec in self.meta["columns"].items():
+            arr = self.arrays[name]
+            if spec["categories"] is not None:
+                data[name] = pd.Categorical.from_codes(arr, spec["categories"])
+            else:
+                data[name] = arr
+        return pd.DataFrame(data, copy=False)
+
+
+def attach(key: tuple, root: Path = SHARED_ROOT) -> SharedDataset | None:
+    """Otwiera opublikowany zbiór albo zwraca None, jeśli go jeszcze nie ma."""
+    path = shared_path(key, root)
+    if not (path / "meta.json").exists():
+        return None
+    _touch(path)
+    return SharedDataset(path)
+
+
+def share(df: pd.DataFrame, key: tuple, root: Path = SHARED_ROOT) -> SharedDataset:
+    return SharedDataset(publish(df, key, root))
+
+
+def _benchmark(n_rows: int, sessions: int) -> None:
+    from demo_data import generate_demo_data
+    from filter_index import FilterIndex
+
+    df = generate_demo_data(n_rows, 42)
+    frame_mb = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"Dane: {n_rows:,} wierszy, ramka {frame_mb:.1f} MB, sesje: {sessions}")
+
+    # przed: każda sesja dostaje własną kopię (cache_data = pickle/unpickle)
+    blob = pickle.dumps(df)
+    tracemalloc.start()
+    copies = [pickle.loads(blob) for _ in range(sessions)]
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copies, blob
+
+    # po: zbiór opublikowany raz, sesja = widok na memmap + numery wierszy po filtrze
+    root = Path(tempfile.mkdtemp(prefix="shared-bench-", dir=SHARED_ROOT.parent))
+    try:
+        shared = share(df, ("bench", n_rows), root).frame()
+        fidx = FilterIndex(shared)
+        tracemalloc.start()
+        states = []
+        for _ in range(sessions):
+            view = SharedDataset(shared_path(("bench", n_rows), root)).frame()
+            states.append((view, fidx.rows(category="food", flag_only=True)))
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        try:
+            states[0][0]["amount"].to_numpy()[0] = 0.0
+            read_only = "NIE"
+        except ValueError:
+            read_only = "tak"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"kopie per sesja:        {before / 1024**2:9.1f} MB ({before / sessions / 1024**2:.2f} MB / sesję)")
+    print(f"wspólny zbiór + indeksy: {after / 1024**2:9.1f} MB ({after / sessions / 1024**2:.3f} MB / sesję)")
+    print(f"kolumny tylko do odczytu: {read_only}")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    n_sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    _benchmark(rows, n_sessions)